@@ -0,0 +1,133 @@
+'''
+Bitset-based representation of the relations between traceable items
+'''
+
+
+def _ints_to_bits(indices):
+    ''' Builds an integer that has a bit set for every given index
+
+    Args:
+        indices (list): Non-negative integers
+
+    Returns:
+        int: Bitset with bit ``i`` set for every ``i`` in the given indices
+    '''
+    if not indices:
+        return 0
+    buffer = bytearray((max(indices) >> 3) + 1)
+    for index in indices:
+        buffer[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class AdjacencyMatrix:
+    '''
+    Relations between the non-placeholder items of a collection, as one bitset per source item and relation
+
+    Every item gets a dense integer index, in natural order of the item IDs. A bitset is a Python integer with bit
+    ``i`` set for the item with index ``i``. Checking which of a list of targets are related to a source item boils
+    down to a single bitwise AND. Bitsets are computed on first use.
+
+    The matrix reflects the collection at the moment of creation; use ``TraceableCollection.get_adjacency_matrix`` to
+    get an up-to-date instance.
+    '''
+
+    def __init__(self, collection):
+        ''' Initializes the matrix for the given collection
+
+        Args:
+            collection (TraceableCollection): Collection of traceable items
+        '''
+        self._items = collection.items
+        self._all_relations = list(collection.relations)
+        self.item_ids = [itemid for itemid in collection.iter_items() if not self._items[itemid].is_placeholder]
+        self.indices = {itemid: index for index, itemid in enumerate(self.item_ids)}
+        self._rows = {}
+        self._masks = {}
+
+    def mask(self, item_ids):
+        ''' Gets the bitset of the given item IDs; unknown IDs and placeholders are ignored
+
+        Args:
+            item_ids (iterable): Item IDs
+
+        Returns:
+            int: Bitset of the given items
+        '''
+        item_ids = tuple(item_ids)
+        bits = self._masks.get(item_ids)
+        if bits is None:
+            indices = self.indices
+            bits = _ints_to_bits([indices[itemid] for itemid in item_ids if itemid in indices])
+            self._masks[item_ids] = bits
+        return bits
+
+    def related_mask(self, source_id, relations):
+        ''' Gets the bitset of all items that the source item is related to through any of the given relationships
+
+        Args:
+            source_id (str): ID of the source item
+            relations (iterable): Relationships, empty for all relationships of the collection
+
+        Returns:
+            int: Bitset of the target items; 0 when the source item is unknown or a placeholder
+        '''
+        if source_id not in self.indices:
+            return 0
+        bits = 0
+        for relation in relations or self._all_relations:
+            key = (source_id, relation)
+            row = self._rows.get(key)
+            if row is None:
+                indices = self.indices
+                row = _ints_to_bits([indices[target] for target in self._items[source_id].yield_targets(relation)
+                                     if target in indices])
+                self._rows[key] = row
+            bits |= row
+        return bits
+
+    def iter_ids(self, bits):
+        ''' Iterates over the IDs of the items in the given bitset, in natural order
+
+        Args:
+            bits (int): Bitset of items
+
+        Returns:
+            generator: Item IDs
+        '''
+        binary = bin(bits)[:1:-1]  # least significant bit first, without the '0b' prefix
+        index = binary.find('1')
+        while index != -1:
+            yield self.item_ids[index]
+            index = binary.find('1', index + 1)
+
+    def related_ids(self, source_id, relations, target_ids):
+        ''' Gets the IDs of the given targets that the source item is related to
+
+        Args:
+            source_id (str): ID of the source item
+            relations (iterable): Relationships, empty for all relationships of the collection
+            target_ids (iterable): IDs of the target items to consider
+
+        Returns:
+            list: IDs of the related target items, in natural order
+        '''
+        bits = self.related_mask(source_id, relations)
+        if bits:
+            bits &= self.mask(target_ids)
+        return list(self.iter_ids(bits))
+
+    def are_related(self, source_id, relations, target_id):
+        ''' Checks if two items are related, like ``TraceableCollection.are_related`` does
+
+        Args:
+            source_id (str): ID of the source item
+            relations (iterable): Relationships, empty for all relationships of the collection
+            target_id (str): ID of the target item
+
+        Returns:
+            bool: True if both items are related through the given relationships, False otherwise
+        '''
+        if target_id not in self.indices:
+            return False
+        return bool(self.related_mask(source_id, relations) >> self.indices[target_id] & 1)
@@ -1,4 +1,9 @@
 // jQuery is included via the sphinxcontrib-jquery extension that we depend on
+// URL of the _static folder, which contains this script and the data of virtual item-matrices
+const staticRoot = new URL('.', document.currentScript ? document.currentScript.src : document.baseURI);
+// virtual item-matrices by the path of their data file, relative to the _static folder
+const virtualMatrices = {};
+
 // item-tree
 jQuery(function () {
     $('ul.bonsai').bonsai();
@@ -12,88 +17,18 @@ $(document).ready(function () {
     });
 
     // show an item's hidden caption on hover
-    $('em.has_hidden_caption').each(function (i) {
-        var caption = $(this).children('.popup_caption').first();
-        var tableCell = caption.parents('td').first();
-        // get background color of table cell, body, or white (no transparency allowed)
-        var backgroundColor = tableCell.css('background-color');
-        if ((typeof backgroundColor == 'undefined') || (backgroundColor == 'rgba(0, 0, 0, 0)')) {
-            backgroundColor = $('body').css('background-color');
-            if (typeof backgroundColor == 'undefined') {
-                backgroundColor = 'white';
-            }
-        }
-        caption.hide();  // hide on page load
-        caption.css({
-            'position': 'absolute',  // prevents allocation of space for caption
-            'color': 'black',
-            'background-color': backgroundColor,
-            'padding': '3px',
-            'font-weight': 'normal',  // prevents bold font in table header
-            'z-index': '100',  // ensures that caption is on foreground
-            'white-space': 'pre'  // prevents adding newlines
-        });
-        $(this).hover(
-            function () {
-                // entering hover state
-                caption.show();
-                var captionRight = caption.offset().left + caption.outerWidth();
-                var container = $('div.rst-content')
-                var maxRight = container.offset().left + container.innerWidth();
-                if (captionRight > maxRight) {
-                    // prevents overflow of container
-                    var overflow = maxRight - captionRight;
-                    caption.css('transform', 'translate(' + overflow + 'px, ' + '-1.5rem)');
-                } else {
-                    // lines up the caption behind the item ID
-                    caption.css('transform', 'translate(0.3rem, -3px)');
-                }
-            }, function () {
-                // leaving hover state
-                caption.css('transform', 'none');  // resets the transformations
-                caption.hide();
-            }
-        );
-    });
+    $('em.has_hidden_caption').addHiddenCaption();
 
-    $('table > tbody > tr[class^=item-group-]').each(function (i) {
-        var row = $(this);
-        const titleOnHidden = 'Ctrl+RMB to expand';
-        const titleOnVisible = 'Ctrl+RMB to collapse';
-        row.attr('title', titleOnHidden);
-        $(this).on("contextmenu",
-            function (event) {
-                if (!event.ctrlKey) {
-                    return;
-                }
-                event.preventDefault()
-                var groupName = /item-group-\d+/.exec($(this).attr('class'))[0];
-                $(this).parent().find(`tr.${groupName} > td > p.item-link`).each(function (j) {
-                    const cell = $(this).parent();
-                    const maxWidth = Math.max(cell.width(), ($("div.rst-content").width() / 2));
-                    cell.css("maxWidth", maxWidth);
-                    const content = $(this).children('div.content').first();
-                    if (content.length) {
-                        if (content.is(":visible")) {
-                            content.hide();
-                            row.attr('title', titleOnHidden);
-                        } else {
-                            row.attr('title', titleOnVisible);
-                            content.show();
-                        }
-                    } else {
-                        var link = $(this).children('a').first();
-                        var container = $('<div>', { class: 'content' });
-                        var paragraph = $(this)
-                        container.load(link.attr('href').replace('#', ' #content-'), function () {
-                            container.find('*').css("width", "inherit");
-                            paragraph.append(container);
-                        });
-                        row.attr('title', titleOnVisible);
-                    }
-                });
-            }
-        );
+    $('table > tbody > tr[class^=item-group-]').addGroupToggle();
+
+    // item-matrix with :render: virtual
+    $('div.item-matrix-virtual > div.item-matrix-data').each(function (i) {
+        const dataSrc = $(this).attr('data-src');
+        virtualMatrices[dataSrc] = new VirtualMatrix($(this).parent());
+        // a script element, unlike an XMLHttpRequest, can load the data when the page is opened from the file system
+        const script = document.createElement('script');
+        script.src = new URL(dataSrc, staticRoot).href;
+        document.head.appendChild(script);
     });
 
     $('p.admonition-title').each(function (i) {
@@ -151,9 +86,230 @@ jQuery.fn.extend({
         $(this).css("color", admonition.css("color"));
         $(this).css("text-decoration", admonition.css("text-decoration"));
         $(this).children('em').first().css("font-style", admonition.css("font-style"));
+    },
+
+    // shows the hidden caption of each item on hover
+    addHiddenCaption: function () {
+        return this.each(function (i) {
+            var caption = $(this).children('.popup_caption').first();
+            var tableCell = caption.parents('td').first();
+            caption.hide();  // hide on page load
+            caption.css({
+                'position': 'absolute',  // prevents allocation of space for caption
+                'color': 'black',
+                'background-color': opaqueBackgroundColor(tableCell),
+                'padding': '3px',
+                'font-weight': 'normal',  // prevents bold font in table header
+                'z-index': '100',  // ensures that caption is on foreground
+                'white-space': 'pre'  // prevents adding newlines
+            });
+            $(this).hover(
+                function () {
+                    // entering hover state
+                    caption.show();
+                    var captionRight = caption.offset().left + caption.outerWidth();
+                    var container = $('div.rst-content')
+                    var maxRight = container.offset().left + container.innerWidth();
+                    if (captionRight > maxRight) {
+                        // prevents overflow of container
+                        var overflow = maxRight - captionRight;
+                        caption.css('transform', 'translate(' + overflow + 'px, ' + '-1.5rem)');
+                    } else {
+                        // lines up the caption behind the item ID
+                        caption.css('transform', 'translate(0.3rem, -3px)');
+                    }
+                }, function () {
+                    // leaving hover state
+                    caption.css('transform', 'none');  // resets the transformations
+                    caption.hide();
+                }
+            );
+        });
+    },
+
+    // toggles the content of the items in all rows of an item group on Ctrl+RMB
+    addGroupToggle: function () {
+        return this.each(function (i) {
+            var row = $(this);
+            const titleOnHidden = 'Ctrl+RMB to expand';
+            const titleOnVisible = 'Ctrl+RMB to collapse';
+            row.attr('title', titleOnHidden);
+            $(this).on("contextmenu",
+                function (event) {
+                    if (!event.ctrlKey) {
+                        return;
+                    }
+                    event.preventDefault()
+                    var groupName = /item-group-\d+/.exec($(this).attr('class'))[0];
+                    $(this).parent().find(`tr.${groupName} > td > p.item-link`).each(function (j) {
+                        const cell = $(this).parent();
+                        const maxWidth = Math.max(cell.width(), ($("div.rst-content").width() / 2));
+                        cell.css("maxWidth", maxWidth);
+                        const content = $(this).children('div.content').first();
+                        if (content.length) {
+                            if (content.is(":visible")) {
+                                content.hide();
+                                row.attr('title', titleOnHidden);
+                            } else {
+                                row.attr('title', titleOnVisible);
+                                content.show();
+                            }
+                        } else {
+                            var link = $(this).children('a').first();
+                            var container = $('<div>', { class: 'content' });
+                            var paragraph = $(this)
+                            container.load(link.attr('href').replace('#', ' #content-'), function () {
+                                container.find('*').css("width", "inherit");
+                                paragraph.append(container);
+                            });
+                            row.attr('title', titleOnVisible);
+                        }
+                    });
+                }
+            );
+        });
     }
 });
 
+// gets the background color of the element, the body, or white (no transparency allowed)
+function opaqueBackgroundColor(element) {
+    var backgroundColor = element.css('background-color');
+    if ((typeof backgroundColor == 'undefined') || (backgroundColor == 'rgba(0, 0, 0, 0)')) {
+        backgroundColor = $('body').css('background-color');
+        if (typeof backgroundColor == 'undefined') {
+            backgroundColor = 'white';
+        }
+    }
+    return backgroundColor;
+}
+
+// item-matrix with :render: virtual
+// Only the item groups that are scrolled into view are rendered; the other rows are replaced by spacer rows.
+const virtualBufferRows = 50;  // number of rows to render above and below the visible rows
+class VirtualMatrix {
+    constructor(container) {
+        this.container = container;
+        this.tbody = container.find('table > tbody').first();
+        this.numberOfColumns = container.find('table > thead > tr').first().children().length;
+        this.renderedGroups = null;
+        this.rowHeight = 0;
+    }
+
+    // called by the data file with the HTML of all unique paragraphs and the rows
+    setData(data) {
+        this.paragraphs = data.paragraphs;
+        this.rows = data.rows;
+        // index of the first row of every item group; rowspans never cross the boundary of an item group
+        this.groupStarts = [];
+        this.rows.forEach((row, i) => {
+            if ((i == 0) || (row[0] != this.rows[i - 1][0])) {
+                this.groupStarts.push(i);
+            }
+        });
+        this.groupStarts.push(this.rows.length);
+        this.container.css({ 'max-height': '80vh', 'overflow-y': 'auto' });
+        this.container.find('table > thead th').css({
+            'position': 'sticky',
+            'top': 0,
+            'z-index': 1,
+            'background-color': opaqueBackgroundColor(this.container.find('table > thead').first())
+        });
+        this.render();
+        // the height of a row is estimated from the first rendered rows
+        const renderedRows = this.tbody.children('tr[class^=item-group-]');
+        if (renderedRows.length) {
+            this.rowHeight = (renderedRows.last().position().top + renderedRows.last().outerHeight()
+                              - renderedRows.first().position().top) / renderedRows.length;
+            this.renderedGroups = null;
+            this.render();  // sizes the spacer rows
+        }
+        var scheduled = false;
+        this.container.on('scroll', () => {
+            if (!scheduled) {
+                scheduled = true;
+                window.requestAnimationFrame(() => {
+                    scheduled = false;
+                    this.render();
+                });
+            }
+        });
+    }
+
+    // gets the index of the item group that contains the row with the given index
+    groupOf(rowIndex) {
+        var low = 0;
+        var high = this.groupStarts.length - 2;
+        while (low < high) {
+            const middle = Math.ceil((low + high) / 2);
+            if (this.groupStarts[middle] <= rowIndex) {
+                low = middle;
+            } else {
+                high = middle - 1;
+            }
+        }
+        return low;
+    }
+
+    render() {
+        if (!this.rows.length) {
+            return;
+        }
+        var firstRow = 0;
+        var lastRow = virtualBufferRows;
+        if (this.rowHeight) {
+            const headerHeight = this.container.find('table > thead').outerHeight();
+            const top = Math.max(0, this.container.scrollTop() - headerHeight);
+            firstRow = Math.floor(top / this.rowHeight) - virtualBufferRows;
+            lastRow = Math.ceil((top + this.container.innerHeight()) / this.rowHeight) + virtualBufferRows;
+        }
+        const firstGroup = this.groupOf(Math.max(0, firstRow));
+        const lastGroup = this.groupOf(Math.min(this.rows.length - 1, lastRow));
+        if (this.renderedGroups && (this.renderedGroups[0] == firstGroup) && (this.renderedGroups[1] == lastGroup)) {
+            return;
+        }
+        this.renderedGroups = [firstGroup, lastGroup];
+        const start = this.groupStarts[firstGroup];
+        const end = this.groupStarts[lastGroup + 1];
+        var html = '';
+        if (start) {
+            // keeps the parity of the rows for themes that stripe rows with :nth-child
+            html += this.spacer(start * this.rowHeight);
+            if (start % 2 == 0) {
+                html += this.spacer(0);
+            }
+        }
+        for (var i = start; i < end; i++) {
+            const row = this.rows[i];
+            html += `<tr class="item-group-${row[0]} ${i % 2 ? 'row-odd' : 'row-even'}">`;
+            for (var j = 1; j < row.length; j++) {
+                const cell = row[j];
+                html += (cell[0] > 1) ? `<td rowspan="${cell[0]}">` : '<td>';
+                for (var k = 1; k < cell.length; k++) {
+                    html += this.paragraphs[cell[k]];
+                }
+                html += '</td>';
+            }
+            html += '</tr>';
+        }
+        if (end < this.rows.length) {
+            html += this.spacer((this.rows.length - end) * this.rowHeight);
+        }
+        this.tbody[0].innerHTML = html;
+        this.tbody.find('em.has_hidden_caption').addHiddenCaption();
+        this.tbody.children('tr[class^=item-group-]').addGroupToggle();
+    }
+
+    spacer(height) {
+        return `<tr class="item-matrix-spacer"><td colspan="${this.numberOfColumns}" `
+            + `style="height: ${height}px; padding: 0; border: none;"></td></tr>`;
+    }
+}
+
+// called by the data file of a virtual item-matrix
+window.traceabilityMatrixData = function (dataSrc, data) {
+    virtualMatrices[dataSrc].setData(data);
+};
+
 window.addEventListener(
     "hashchange",
     () => {
@@ -3,7 +3,7 @@ from docutils.parsers.rst import directives
 
 from ..traceability_exception import TraceabilityException, report_warning
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import NO_DEPENDENCIES, TraceableBaseNode
 
 
 class AttributeLink(TraceableBaseNode):
@@ -19,6 +19,10 @@ class AttributeLink(TraceableBaseNode):
         """
         self.replace_self([])
 
+    def get_dependencies(self, collection):
+        """ The node has no output, so it does not depend on any item. Its effect is part of the items themselves. """
+        return NO_DEPENDENCIES
+
     def apply_effect(self, collection):
         """ Processes the attribute-link items, which shall be done before converting anything to docutils.
 
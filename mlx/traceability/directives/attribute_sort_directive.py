@@ -3,7 +3,7 @@ from docutils.parsers.rst import directives
 
 from ..traceability_exception import report_warning
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 
 
 class AttributeSort(TraceableBaseNode):
@@ -21,9 +21,21 @@ class AttributeSort(TraceableBaseNode):
         ignored_items = collection.add_attribute_sorting_rule(self['filter'], self['sort'])
         for item in ignored_items:
             report_warning("The sorting of the attributes of item {} has already been configured by {}; ignoring {}"
-                           .format(item.identifier, item.attribute_order, self['sort']), self['document'], self['line'])
+                           .format(item.identifier, item.attribute_order, self['sort']), self['document'], self['line'],
+                           item.identifier)
         self.replace_self([])
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the sorting rule applies to.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: Regular expression of the items to sort the attributes of
+        """
+        return Dependencies(frozenset(), frozenset(), (self['filter'],))
+
 
 class AttributeSortDirective(TraceableBaseDirective):
     """
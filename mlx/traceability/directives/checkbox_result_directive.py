@@ -2,9 +2,41 @@
 from re import match
 
 from ..traceable_base_directive import TraceableBaseDirective
+from ..traceable_base_node import NO_DEPENDENCIES, TraceableBaseNode
 from ..traceability_exception import report_warning, TraceabilityException
 
 
+class CheckboxResult(TraceableBaseNode):
+    """Node that sets the value of the checklist attribute of a checklist-item."""
+    order = 0  # before the other intermediate nodes, as if it were applied while reading
+
+    def perform_replacement(self, app, collection):
+        """ The CheckboxResult node has no final representation, so it is removed from the tree.
+
+        Args:
+            app: Sphinx application object to use.
+            collection (TraceableCollection): Collection for which to generate the nodes.
+        """
+        self.replace_self([])
+
+    def get_dependencies(self, collection):
+        """ The node has no output, so it does not depend on any item. Its effect is part of the items themselves. """
+        return NO_DEPENDENCIES
+
+    def apply_effect(self, collection):
+        """ Sets the checklist attribute, which shall be done when all documents have been read.
+
+        Args:
+            collection (TraceableCollection): Collection for which to generate the nodes.
+        """
+        checklist_item = collection.get_item(self['target'])
+        if not checklist_item:
+            report_warning("Could not find item ID {!r}".format(self['target']), self['document'], self['line'],
+                           self['target'])
+            return
+        checklist_item.add_attribute(self['attribute'], self['value'], overwrite=True)
+
+
 class CheckboxResultDirective(TraceableBaseDirective):
     """
     Directive to set value of the checklist attribute for a checklist-item.
@@ -23,11 +55,6 @@ class CheckboxResultDirective(TraceableBaseDirective):
 
         target_id = self.arguments[0]
         attribute_value = self.arguments[1]
-        checklist_item = env.traceability_collection.get_item(target_id)
-        if not checklist_item:
-            report_warning("Could not find item ID {!r}".format(target_id), env.docname, self.lineno)
-            return []
-
         if not env.traceability_checklist.get('configured'):
             raise TraceabilityException("The checklist attribute in 'traceability_checklist' is not configured "
                                         "properly. See documentation for more details.")
@@ -35,7 +62,14 @@ class CheckboxResultDirective(TraceableBaseDirective):
         checklist_attribute_name = env.traceability_checklist['attribute_name']
         regexp = env.traceability_attributes[checklist_attribute_name]
         if match(regexp, attribute_value):
-            checklist_item.add_attribute(checklist_attribute_name, attribute_value, overwrite=True)
+            # the checklist-item can be defined in any document, so its attribute is set once all have been read
+            node = CheckboxResult('')
+            node['document'] = env.docname
+            node['line'] = self.lineno
+            node['target'] = target_id
+            node['attribute'] = checklist_attribute_name
+            node['value'] = attribute_value
+            env.traceability_collection.add_intermediate_node(node)
         else:
             report_warning("Checkbox value invalid: {!r} does not match regex {}".format(attribute_value, regexp),
                            env.docname, self.lineno)
@@ -15,6 +15,7 @@ class ChecklistItemDirective(ItemDirective):
         """ Processes the contents of the directive. """
         env = self.state.document.settings.env
         env.traceability_checklist['has_checklist_items'] = True
+        env.traceability_checklist.setdefault('checklist_item_ids', set()).add(self.arguments[0])
 
         nodes = super().run()
         target_id = self.arguments[0]
@@ -3,7 +3,7 @@ from docutils import nodes
 from docutils.parsers.rst import directives
 
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 
 
 class Item2DMatrix(TraceableBaseNode):
@@ -34,6 +34,13 @@ class Item2DMatrix(TraceableBaseNode):
         tgroup += colspecs
         tgroup += nodes.thead('', hrow)
         tbody = nodes.tbody()
+        adjacency_matrix = collection.get_adjacency_matrix()
+        target_mask = adjacency_matrix.mask(target_ids)
+        related_target_ids = {
+            source_id: set(adjacency_matrix.iter_ids(adjacency_matrix.related_mask(source_id, self['type']) &
+                                                     target_mask))
+            for source_id in source_ids
+        }
         for target_id in target_ids:
             row = nodes.row()
             tgt_cell = nodes.entry()
@@ -42,7 +49,7 @@ class Item2DMatrix(TraceableBaseNode):
             for source_id in source_ids:
                 cell = nodes.entry()
                 p_node = nodes.paragraph()
-                if collection.are_related(source_id, self['type'], target_id):
+                if target_id in related_target_ids[source_id]:
                     txt = self['hit']
                 else:
                     txt = self['miss']
@@ -55,6 +62,17 @@ class Item2DMatrix(TraceableBaseNode):
         top_node += table
         self.replace_self(top_node)
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: Regular expressions of the source and target items
+        """
+        return Dependencies(frozenset(), frozenset(), (self['source'], self['target']))
+
     @staticmethod
     def get_source_and_target_ids(collection, source_regex, target_regex, filter_attributes, filter_target):
         """ Gets IDs of source and target items, filtered by source, target and attribute options.
@@ -4,7 +4,7 @@ from docutils import nodes
 from ..traceability_exception import report_warning
 from ..traceable_attribute import TraceableAttribute
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import NO_DEPENDENCIES, TraceableBaseNode
 from ..traceable_item import TraceableItem
 
 
@@ -28,6 +28,10 @@ class ItemAttribute(TraceableBaseNode):
         top_node = self.create_top_node(header)
         self.replace_self(top_node)
 
+    def get_dependencies(self, collection):
+        """ The output only depends on the definition of the attribute, not on any item. """
+        return NO_DEPENDENCIES
+
 
 class ItemAttributeDirective(TraceableBaseDirective):
     """
@@ -73,6 +77,8 @@ class ItemAttributeDirective(TraceableBaseDirective):
             attr.set_location(env.docname, lineno)
             attr.directive = self  # the directive is needed to parse any content
             attribute_node['id'] = attr.identifier
+            # keep track of the description in the environment, which gets merged after a parallel read
+            env.traceability_attribute_descriptions.setdefault(env.docname, {})[stored_id] = (attr.caption, lineno)
 
         attr.content = self.content
         return [target_node, attribute_node, attr.content_node]
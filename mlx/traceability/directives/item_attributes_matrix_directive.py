@@ -3,7 +3,7 @@ from docutils import nodes
 from docutils.parsers.rst import directives
 
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 from ..traceable_item import TraceableItem
 
 
@@ -59,6 +59,17 @@ class ItemAttributesMatrix(TraceableBaseNode):
         top_node += table
         self.replace_self(top_node)
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: Regular expression of the items in the matrix
+        """
+        return Dependencies(frozenset(), frozenset(), (self['filter'],))
+
     def fill_item_row(self, row, item):
         """ Fills the row for one item with the specified attributes.
 
@@ -4,7 +4,7 @@ from docutils.parsers.rst import directives
 
 from ..traceability_exception import report_warning, TraceabilityException
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 from ..traceable_item import TraceableItem
 from ..callback_utils import call_callback_function
 
@@ -39,6 +39,21 @@ class Item(TraceableBaseNode):
             app=app
         )
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: ID of the item itself and the IDs of the items it is related to
+        """
+        item = collection.get_item(self['id'])
+        if item is None:
+            return Dependencies(frozenset({self['id']}), frozenset(), ())
+        referenced_ids = frozenset(item.yield_targets(*item.iter_relations(sort=False)))
+        return Dependencies(frozenset({self['id']}), referenced_ids, ())
+
     def _process_attributes(self, dl_node, app):
         """ Processes all attributes for the given item and adds the list of attributes to the given definition list.
 
@@ -203,7 +218,7 @@ class ItemDirective(TraceableBaseDirective):
         try:
             env.traceability_collection.add_item(item)
         except TraceabilityException as err:
-            report_warning(err, env.docname, self.lineno)
+            report_warning(err, env.docname, self.lineno, target_id)
             return None
 
         self._add_attributes(item, env.docname)
@@ -232,7 +247,7 @@ class ItemDirective(TraceableBaseDirective):
             try:
                 env.traceability_collection.add_relation(source_id, relation, related_id)
             except TraceabilityException as err:
-                report_warning(err, env.docname, self.lineno)
+                report_warning(err, env.docname, self.lineno, source_id)
 
     def _add_attributes(self, item, docname):
         """ Adds all specified attributes to the item. Attribute data is a single string.
@@ -247,4 +262,4 @@ class ItemDirective(TraceableBaseDirective):
             try:
                 item.add_attribute(attribute, self.options[attribute])
             except TraceabilityException as err:
-                report_warning(err, docname, self.lineno)
+                report_warning(err, docname, self.lineno, item.identifier)
@@ -3,7 +3,7 @@ from docutils import nodes
 from docutils.parsers.rst import directives
 
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 
 
 class ItemList(TraceableBaseNode):
@@ -29,6 +29,17 @@ class ItemList(TraceableBaseNode):
             top_node += ul_node
         self.replace_self(top_node)
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: Regular expression of the items to list
+        """
+        return Dependencies(frozenset(), frozenset(), (self['filter'],))
+
 
 class ItemListDirective(TraceableBaseDirective):
     """
@@ -1,18 +1,30 @@
 """Module for the item-matrix directive"""
+import json
 import re
+import shutil
 from collections import namedtuple
-from copy import copy, deepcopy
+from html import escape
+from itertools import chain
+from os import listdir, path, remove
 
 from docutils import nodes
 from docutils.parsers.rst import directives
+from docutils.utils import new_document
 from natsort import natsorted, natsort_keygen
+from sphinx.util.osutil import ensuredir
 
 from ..traceability_exception import TraceabilityException, report_warning
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 from ..traceable_item import TraceableItem
 
-natsort_key = natsort_keygen(key=lambda item: getattr(item, 'identifier', ''))
+natsort_key = natsort_keygen(key=lambda ref: ref if isinstance(ref, str) else '')
+
+# Reference to an external item, e.g. in a cell of a matrix row; an internal item is referenced by its ID
+ExternalRef = namedtuple('ExternalRef', 'relation target')
+# Plain data of a row of an item-matrix: the reference to the source, the IDs of the intermediate items (None without
+# intermediate column), the references per target column and the reference to the item for the target columns
+MatrixRow = namedtuple('MatrixRow', 'source intermediates targets target_column_ref')
 
 
 def group_choice(argument):
@@ -20,10 +32,46 @@ def group_choice(argument):
     return directives.choice(argument, ('top', 'bottom'))
 
 
+def render_choice(argument):
+    """Conversion function for the "render" option."""
+    return directives.choice(argument, ('table', 'virtual'))
+
+
+def create_html_translator(app):
+    """ Creates a translator of the HTML builder to render the nodes of item-matrix cells with
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object with an HTML builder that is writing
+
+    Returns:
+        nodes.NodeVisitor: Translator of the builder, with the settings of the builder
+    """
+    document = new_document('<item-matrix>', app.builder.docsettings)
+    return app.builder.create_translator(document, app.builder)
+
+
+def node_to_html(translator, node):
+    """ Renders a node of an item-matrix cell to HTML the way the HTML writer does
+
+    The node shall still be part of its table, since the HTML writer renders a paragraph depending on its siblings.
+
+    Args:
+        translator (nodes.NodeVisitor): Translator of the HTML builder, see ``create_html_translator``
+        node (nodes.Node): Node to render
+
+    Returns:
+        str: HTML of the node
+    """
+    translator.body = []
+    node.walkabout(translator)
+    return ''.join(translator.body)
+
+
 class ItemMatrix(TraceableBaseNode):
     '''Matrix for cross referencing documentation items'''
 
     COVERAGE_REGEX = re.compile(r'([><]=?|==|!=)\s*[\d\./]+')
+    VIRTUAL_DATA_DIR = 'traceability-matrices'
 
     def perform_replacement(self, app, collection):
         """
@@ -43,7 +91,8 @@ class ItemMatrix(TraceableBaseNode):
         source_ids = collection.get_items(self['source'], attributes=filters['source'])
         targets_with_ids = []
         for target_regex in self['target']:
-            targets_with_ids.append(collection.get_items(target_regex, attributes=filters['target']))
+            target_ids = collection.get_items(target_regex, attributes=filters['target'])
+            targets_with_ids.append({target_id: index for index, target_id in enumerate(target_ids)})
         top_node = self.create_top_node(self['title'], hide_title=self['hidetitle'])
         table = nodes.table()
         if self.get('classes'):
@@ -90,6 +139,12 @@ class ItemMatrix(TraceableBaseNode):
             if ' | ' in self['type']:
                 mapping_via_intermediate = self.linking_via_intermediate(source_ids, targets_with_ids, collection)
 
+        # without a table, only the number of covered and uncovered source items needs to be known
+        tableless = self['tableless'] or not number_of_columns
+        if tableless:
+            adjacency_matrix = collection.get_adjacency_matrix()
+            target_mask = adjacency_matrix.mask(dict.fromkeys(chain.from_iterable(targets_with_ids)))
+
         duplicate_count_total = 0
         duplicate_count_covered = 0
         rows = Rows([], [], [], [0, 0])
@@ -97,12 +152,17 @@ class ItemMatrix(TraceableBaseNode):
             source_item = collection.get_item(source_id)
             if self['sourcetype'] and not source_item.has_relations(self['sourcetype']):
                 continue
+            if tableless:
+                covered = self._is_covered(source_item, mapping_via_intermediate, relationships,
+                                           external_relationships, adjacency_matrix, target_mask)
+                rows.counters[0 if covered else 1] += 1
+                continue
             covered = False
             rights = [[] for _ in range(int(bool(self['intermediate'])) + len(self['target']))]
             if mapping_via_intermediate:
                 intermediates = mapping_via_intermediate[source_id]
                 if not intermediates:
-                    self._store_data(rows, source_item, rights, False, app)
+                    self._store_data(rows, source_id, rights, False)
                     continue
                 covered_intermediates = {intermediate: any(target_set for target_set in target_sets)
                                          for intermediate, target_sets in intermediates.items()}
@@ -115,7 +175,7 @@ class ItemMatrix(TraceableBaseNode):
                 if self['splitintermediates']:
                     for intermediate, target_sets in intermediates.items():
                         self._store_row_with_intermediate({intermediate: target_sets},
-                                                          rows, source_item, rights, covered, app)
+                                                          rows, source_id, rights, covered)
                     duplicate_count_for_source = len(intermediates) - 1
                     duplicate_count_total += duplicate_count_for_source
                     duplicate_count_covered += duplicate_count_for_source if covered else 0
@@ -123,13 +183,13 @@ class ItemMatrix(TraceableBaseNode):
                     self._store_row_with_intermediate({intermediate: target_sets for intermediate, target_sets
                                                        in intermediates.items()
                                                        if covered and covered_intermediates[intermediate]},
-                                                      rows, source_item, rights, covered, app)
+                                                      rows, source_id, rights, covered)
             else:
-                has_external_target = self.add_external_targets(rights, source_item, external_relationships, app)
+                has_external_target = self.add_external_targets(rights, source_item, external_relationships)
                 has_internal_target = self.add_internal_targets(rights, source_id, targets_with_ids, relationships,
                                                                 collection)
                 covered = has_external_target or has_internal_target
-                self._store_data(rows, source_item, rights, covered, app)
+                self._store_data(rows, source_id, rights, covered)
 
         if not source_ids:
             # try to use external targets as source
@@ -137,14 +197,17 @@ class ItemMatrix(TraceableBaseNode):
                 external_targets = collection.get_external_targets(self['source'], ext_rel)
                 # natural sorting on source
                 for ext_source, target_ids in natsorted(external_targets.items()):
-                    covered = False
-                    source_link = self.make_external_item_ref(app, ext_source, ext_rel)
                     rights = [[] for _ in range(len(self['target']))]
-                    target_items = [collection.get_item(id_) for id_ in target_ids]
-                    covered = self._add_target_items(rights, target_items)
-                    self._store_data(rows, source_link, rights, covered, app)
+                    covered = self._add_target_items(rights, target_ids)
+                    if tableless:
+                        rows.counters[0 if covered else 1] += 1
+                    else:
+                        self._store_data(rows, ExternalRef(ext_rel, ext_source), rights, covered)
 
-        tgroup += self._build_table_body(rows, self['group'], self['onlycovered'], self['onlyuncovered'])
+        if not tableless:
+            tbody = self._build_table_body(rows, self['group'], self['onlycovered'], self['onlyuncovered'], app,
+                                           collection)
+            tgroup += tbody
 
         count_total = rows.counters[0] + rows.counters[1] - duplicate_count_total
         count_covered = rows.counters[0] - duplicate_count_covered
@@ -167,48 +230,95 @@ class ItemMatrix(TraceableBaseNode):
             p_node += txt
             top_node += p_node
 
-        if number_of_columns:
-            top_node += table
+        if not tableless:
+            if self['render'] == 'virtual' and app.builder.format == 'html':
+                top_node += self._virtualize_table(table, tbody, app)
+            else:
+                top_node += table
         self.replace_self(top_node)
 
-    def _build_table_body(self, rows, group, onlycovered, onlyuncovered):
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: Items in the relation columns, and regular expressions of the source, target and
+                intermediate items
+        """
+        patterns = [self['source'], *self['target']]
+        if self['intermediate']:
+            patterns.append(self['intermediate'])
+        referenced_ids = set()
+        for regex, columns in ((self['source'], self['sourcecolumns']), (self['target'][0], self['targetcolumns'])):
+            relations = [value for value in columns
+                         if value not in TraceableItem.defined_attributes and not self.is_relation_external(value)]
+            if relations:
+                for item in collection.get_item_objects(regex):
+                    referenced_ids.update(item.yield_targets(*relations))
+        return Dependencies(frozenset(), frozenset(referenced_ids), tuple(patterns))
+
+    def _build_table_body(self, rows, group, onlycovered, onlyuncovered, app, collection):
         """ Creates the table body and fills it with rows, grouping and excluding uncovered source items when desired
 
+        The docutils nodes are only created for the rows that end up in the table body.
+
         Args:
-            rows (Rows): Rows namedtuple object
+            rows (Rows): Rows namedtuple object with MatrixRow objects
             group (str): Group option, falsy to disable grouping, 'top' or 'bottom' otherwise
             onlycovered (bool): True to only include source items that are covered; False otherwise
             onlyuncovered (bool): True to only include source items that are uncovered; False otherwise
+            app (sphinx.application.Sphinx): Sphinx application object
+            collection (TraceableCollection): Collection of TraceableItems
 
         Returns:
             nodes.tbody: Filled table body
         """
-        tbody = nodes.tbody()
         if onlycovered:
-            tbody += rows.covered
+            selected_rows = rows.covered
         elif onlyuncovered:
-            tbody += rows.uncovered
+            selected_rows = rows.uncovered
         elif not group:
-            tbody += rows.sorted
+            selected_rows = rows.sorted
         elif group == 'top':
-            tbody += rows.uncovered
-            tbody += rows.covered
+            selected_rows = rows.uncovered + rows.covered
         elif group == 'bottom':
-            tbody += rows.covered
-            tbody += rows.uncovered
+            selected_rows = rows.covered + rows.uncovered
+        else:
+            selected_rows = []
+        tbody = nodes.tbody()
+        tbody += [self._create_row(row, app, collection) for row in selected_rows]
 
-        self._postprocess_tbody(tbody)
+        self._postprocess_tbody(tbody, [self._grouping_key(row) for row in selected_rows])
 
         return tbody
 
-    def _postprocess_tbody(self, tbody):
+    def _grouping_key(self, row):
+        """ Gets the key that decides which cells of the row can be merged with the cells of the previous row
+
+        The cells of the source columns only depend on the source item, so the source reference serves as their key.
+
+        Args:
+            row (MatrixRow): Plain data of the row
+
+        Returns:
+            tuple: Key per column that can be merged: the source, each source column and the intermediate column
+        """
+        key = (row.source,) * (1 + len(self['sourcecolumns']))
+        if self['intermediate']:
+            key += (row.intermediates,)
+        return key
+
+    def _postprocess_tbody(self, tbody, keys):
         """ Merges cells where appropriate to avoid duplication and removes certain columns depending on configuration
 
         Args:
             tbody (nodes.tbody): Table body to modify
+            keys (list): Grouping key per row of the table body, see ``_grouping_key``
         """
         indexes_to_merge = range(1 + len(self['sourcecolumns']) + int(bool(self['intermediate'])))
-        cells_to_remove = self._set_rowspan(tbody, indexes_to_merge)
+        cells_to_remove = self._set_rowspan(tbody, keys)
 
         intermediate_idx = indexes_to_merge[-1] if self['intermediate'] else None
         target_idxes = []
@@ -228,75 +338,76 @@ class ItemMatrix(TraceableBaseNode):
                     row.pop(idx)
 
     @staticmethod
-    def _set_rowspan(tbody, indexes):
+    def _set_rowspan(tbody, keys):
         """ Sets the 'rowspan' attribute of cells that should span multiple rows to avoid duplication
 
         Also groups all rows that belong to a single source item by assigning them to the same CSS class.
 
         Args:
             tbody (nodes.tbody): Table body
-            indexes (iterable): Range object with indexes of columns to take into account
+            keys (list): Grouping key per row, a tuple with an element per column to take into account; cells are
+                merged when the element for their column equals the one of the previous row
 
         Returns:
             dict: Mapping of row indices to list of column indices, of cells that shall be removed from the table body
         """
         prev_row = None
+        prev_key = None
         cells_to_remove = {}
-        original_cells = {idx: None for idx in indexes}
+        original_cells = {}
         group_class_nr = 0
-        for row_idx, row in enumerate(tbody):
+        for row_idx, (row, key) in enumerate(zip(tbody, keys)):
             cells_to_remove[row_idx] = []
             if prev_row is None:
-                prev_row = row
+                prev_row, prev_key = row, key
+                original_cells = {idx: None for idx in range(len(key))}
                 row['classes'].append(f'item-group-{group_class_nr}')
                 continue
 
             for col_idx, cell in original_cells.items():
-                if str(row[col_idx]) == str(prev_row[col_idx]):
+                if key[col_idx] == prev_key[col_idx]:
                     if cell is None:
                         original_cells[col_idx] = prev_row[col_idx]  # do not set `cell`
                     original_cells[col_idx]['morerows'] = 1 + original_cells[col_idx].get('morerows', 0)
                     cells_to_remove[row_idx].append(col_idx)
                 elif col_idx == 0:  # new source so reset and move on to next row
-                    original_cells = {idx: None for idx in indexes}
+                    original_cells = {idx: None for idx in range(len(key))}
                     group_class_nr += 1
                     break
                 else:
                     original_cells[col_idx] = None
 
-            prev_row = row
+            prev_row, prev_key = row, key
             row['classes'].append(f'item-group-{group_class_nr}')
         return cells_to_remove
 
     @staticmethod
     def add_all_targets(right_cells, linked_items):
-        """ Adds intermediate items followed by internal target items
+        """ Adds IDs of intermediate items followed by IDs of internal target items, in natural order
 
         Args:
-            right_cells (list): List of empty lists to fill with intermediates items followed by target items
-            linked_items (dict): Mapping of intermediate items to the list of sets of target items per target
+            right_cells (list): List of empty lists to fill with intermediate IDs followed by target IDs
+            linked_items (dict): Mapping of intermediate IDs to the list of sets of target IDs per target
         """
         # avoid duplicate target IDs in the same cell due to multiple intermediates with the same target item
-        added_items_per_column = {}
-        for intermediate_item, targets in linked_items.items():
-            right_cells[0].append(intermediate_item)
-            for idx, target_items in enumerate(targets, start=1):
-                if idx not in added_items_per_column:
-                    added_items_per_column[idx] = set()
-                for target_item in target_items.difference(added_items_per_column[idx]):
-                    right_cells[idx].append(target_item)
-                    added_items_per_column[idx].add(target_item)
-                right_cells[idx].sort(key=natsort_key)
-        right_cells[0].sort(key=natsort_key)
-
-    def add_external_targets(self, right_cells, source_item, external_relationships, app):
-        """ Adds links to external targets for given source to the list of data per column
+        added_ids_per_column = {}
+        for intermediate_id, targets in linked_items.items():
+            right_cells[0].append(intermediate_id)
+            for idx, target_ids in enumerate(targets, start=1):
+                added_ids = added_ids_per_column.setdefault(idx, set())
+                right_cells[idx].extend(target_ids.difference(added_ids))
+                added_ids.update(target_ids)
+        for cell in right_cells:
+            cell.sort(key=natsort_key)
+
+    @staticmethod
+    def add_external_targets(right_cells, source_item, external_relationships):
+        """ Adds references to external targets for given source to the list of data per column
 
         Args:
-            right_cells (list): List of lists to add external target link(s) to when covered
+            right_cells (list): List of lists to add external target reference(s) to when covered
             source_item (TraceableItem): Source item
             external_relationships (list): List of all valid external relationships between source and target(s)
-            app (sphinx.application.Sphinx): Sphinx application object
 
         Returns:
             bool: True if one or more external targets have been found for the given source item, False otherwise
@@ -304,7 +415,7 @@ class ItemMatrix(TraceableBaseNode):
         has_external_target = False
         for external_relationship in external_relationships:
             for target_id in source_item.yield_targets_sorted(external_relationship):
-                ext_item_ref = self.make_external_item_ref(app, target_id, external_relationship)
+                ext_item_ref = ExternalRef(external_relationship, target_id)
                 for cell in right_cells:
                     cell.append(ext_item_ref)
                 has_external_target = True
@@ -314,22 +425,28 @@ class ItemMatrix(TraceableBaseNode):
     def add_internal_targets(right_cells, source_id, targets_with_ids, relationships, collection):
         """ Adds internal target items for given source to the list of data per column
 
+        The targets of the source item are intersected with the target IDs per column, so the cost depends on the
+        number of relations of the source item instead of the number of target IDs.
+
         Args:
-            right_cells (list): List of lists to add target items to when covered
+            right_cells (list): List of lists to add target IDs to when covered
             source_id (str): Item ID of source item
-            targets_with_ids (list): List of lists per target, listing target IDs to take into consideration
+            targets_with_ids (list): List of dicts per target, mapping the target IDs to take into consideration to
+                their position in natural order; the related targets are added in this order
             relationships (list): List of all valid relationships between source and target(s)
             collection (TraceableCollection): Collection of TraceableItems
 
         Returns:
             bool: True if one or more internal targets have been found for the given source item, False otherwise
         """
+        related_ids = set(collection.get_item(source_id).yield_targets(*relationships))
+        if not related_ids:
+            return False
         has_internal_target = False
-        for idx, target_ids in enumerate(targets_with_ids):
-            for target_id in target_ids:
-                if collection.are_related(source_id, relationships, target_id):
-                    right_cells[idx].append(collection.get_item(target_id))
-                    has_internal_target = True
+        for idx, positions in enumerate(targets_with_ids):
+            for target_id in sorted((id_ for id_ in related_ids if id_ in positions), key=positions.__getitem__):
+                right_cells[idx].append(target_id)
+                has_internal_target = True
         return has_internal_target
 
     def linking_via_intermediate(self, source_ids, targets_with_ids, collection):
@@ -337,12 +454,12 @@ class ItemMatrix(TraceableBaseNode):
 
         Args:
             source_ids (list): List of item IDs of source items
-            targets_with_ids (list): List of lists, which contain target IDs to take into consideration, per target
+            targets_with_ids (list): List of dicts, which contain target IDs to take into consideration, per target
             collection (TraceableCollection): Collection of TraceableItems
 
         Returns:
-            dict: Mapping of source IDs as key with as value a mapping of intermediate items to
-                the list of sets of target items per target
+            dict: Mapping of source IDs as key with as value a mapping of intermediate IDs to
+                the list of sets of target IDs per target
         """
         links_with_relations = []
         for relationships_str in self['type'].split(' | '):
@@ -356,136 +473,121 @@ class ItemMatrix(TraceableBaseNode):
             links_with_relations[0][idx] = collection.get_reverse_relation(rel)
 
         source_to_links_map = {source_id: {} for source_id in source_ids}
+        source_index = collection.get_path_index(links_with_relations[0])
+        target_index = collection.get_path_index(links_with_relations[1],
+                                                 recursive_relation=self['recursiveintermediates'],
+                                                 intermediate_regex=self['intermediate'])
         for intermediate_id in collection.get_items(self['intermediate'], sort=bool(self['intermediatetitle'])):
-            intermediate_item = collection.get_item(intermediate_id)
-            potential_source_ids = set()
-            for reverse_rel in links_with_relations[0]:
-                potential_source_ids.update(intermediate_item.yield_targets(reverse_rel))
             # apply :source: filter
-            potential_source_ids = potential_source_ids.intersection(source_ids)
+            potential_source_ids = {source_id for _, source_id in source_index.links(intermediate_id)
+                                    if source_id in source_to_links_map}
             if not potential_source_ids:  # move to the next intermediate candidate to save resources
                 continue
 
-            potential_target_ids = set()
-            target_ids, uncovered_items = self._determine_targets(intermediate_item, links_with_relations[1],
-                                                                  collection)
-            potential_target_ids.update(target_ids)
+            potential_target_ids = target_index.reachable(intermediate_id)
             # apply :target: filter
             actual_targets = []
             for target_ids in targets_with_ids:
-                linked_target_ids = potential_target_ids.intersection(target_ids)
-                actual_targets.append(set(collection.get_item(id_) for id_ in linked_target_ids))
+                actual_targets.append({id_ for id_ in potential_target_ids if id_ in target_ids})
 
-            self._store_targets(source_to_links_map, potential_source_ids, actual_targets, intermediate_item)
-            for item in uncovered_items:
-                self._store_targets(source_to_links_map, potential_source_ids, [], item)
+            self._store_targets(source_to_links_map, potential_source_ids, actual_targets, intermediate_id)
+            for uncovered_id in target_index.uncovered_ids(intermediate_id):
+                self._store_targets(source_to_links_map, potential_source_ids, [], uncovered_id)
         return source_to_links_map
 
-    def _determine_targets(self, item, relations, collection):
-        """ Determines all potential targets of a given intermediate item and forward relations.
-
-        Note: This function is recursively called when the option 'recursiveintermediates' is used and a suitable
-        nested intermediate item was found via the specified relation for recursion.
-        """
-        all_uncovered_items = set()
-        potential_target_ids = set(item.yield_targets(*relations))
-        if self['recursiveintermediates']:
-            for nested_item_id in item.yield_targets(self['recursiveintermediates']):
-                nested_item = collection.items[nested_item_id]
-                if nested_item.is_match(self['intermediate']):
-                    new_target_ids, _ = self._determine_targets(nested_item, relations, collection)
-                    potential_target_ids.update(new_target_ids)
-                    if not new_target_ids:
-                        all_uncovered_items.add(nested_item)
-        return potential_target_ids, all_uncovered_items
-
     @staticmethod
-    def _store_targets(source_to_links_map, source_ids, targets, intermediate_item):
+    def _store_targets(source_to_links_map, source_ids, targets, intermediate_id):
         """ Extends given mapping with target IDs per target as value for each source ID as key
 
         Args:
-            source_to_links_map (dict): Mapping of source IDs as key with as value a mapping of intermediate items to
+            source_to_links_map (dict): Mapping of source IDs as key with as value a mapping of intermediate IDs to
                 the list of sets of target IDs per target
             source_ids (set): Source IDs to store targets for
-            targets (list): List of linked target items (set) per target
-            intermediate_item (TraceableItem): Intermediate item that links the given source items to the given target
+            targets (list): List of linked target IDs (set) per target
+            intermediate_id (str): ID of the intermediate item that links the given source items to the given target
                 items
         """
         for source_id in source_ids:
             if source_id not in source_to_links_map:
                 source_to_links_map[source_id] = {}
-            source_to_links_map[source_id][intermediate_item] = targets
+            source_to_links_map[source_id][intermediate_id] = targets
+
+    def _is_covered(self, source_item, mapping_via_intermediate, relationships, external_relationships,
+                    adjacency_matrix, target_mask):
+        """ Checks if a source item is covered, without collecting its targets
 
-    def _store_row_with_intermediate(self, linked_items, rows, source, empty_right_cells, *args):
+        Args:
+            source_item (TraceableItem): Source item
+            mapping_via_intermediate (dict): Mapping of source IDs to the intermediate IDs and the sets of target IDs
+                per target that they link to; empty when not linking via intermediates
+            relationships (list): List of all valid relationships between source and target(s)
+            external_relationships (list): List of all valid external relationships between source and target(s)
+            adjacency_matrix (AdjacencyMatrix): Bitset representation of the relations of the collection
+            target_mask (int): Bitset of the IDs of the target items of all targets
+
+        Returns:
+            bool: True if the source item is covered, False otherwise
+        """
+        if mapping_via_intermediate:
+            covered_intermediates = [any(target_sets) for target_sets
+                                     in mapping_via_intermediate[source_item.identifier].values()]
+            if not covered_intermediates:
+                return False
+            if self['coveredintermediates']:
+                return all(covered_intermediates)
+            return any(covered_intermediates)
+        for external_relationship in external_relationships:
+            if next(source_item.yield_targets(external_relationship), None) is not None:
+                return True
+        if not relationships:
+            return False
+        return bool(adjacency_matrix.related_mask(source_item.identifier, relationships) & target_mask)
+
+    def _store_row_with_intermediate(self, linked_items, rows, source, empty_right_cells, covered):
         """ Stores a row for a source, linking targets via one or all intermediates
 
         Args:
-            linked_items (dict): Mapping of one or all intermediate IDs to the list of sets of target items per target
+            linked_items (dict): Mapping of one or all intermediate IDs to the list of sets of target IDs per target
             rows (Rows): Rows namedtuple object to extend
-            source (TraceableItem): Source item
-            empty_right_cells (list): List of empty lists to fill with intermediates items, followed by target items
+            source (str): ID of the source item
+            empty_right_cells (list): List of empty lists, one for the intermediates and one per target
+            covered (bool): True if the row shall be stored in the covered attribute, False for uncovered attribute
         """
-        right_cells = deepcopy(empty_right_cells)
+        right_cells = [[] for _ in empty_right_cells]
         self.add_all_targets(right_cells, linked_items)
-        self._store_data(rows, source, right_cells, *args)
+        self._store_data(rows, source, right_cells, covered)
 
-    def _store_data(self, rows, source, right_cells, covered, app):
-        """ Stores the data in one or more rows in the given Rows object.
+    def _store_data(self, rows, source, right_cells, covered):
+        """ Stores the plain data of one or more rows in the given Rows object.
 
-        Note that merging and removing cells happens in a later stage.
+        Note that creating the docutils nodes, merging and removing cells happens in a later stage.
 
         Args:
             rows (Rows): Rows namedtuple object to extend
-            source (TraceableItem|nodes.paragraph): Traceable source item or paragraph with link to it
-            right_cells (list): List of lists with intermediate or target items or paragraphs with a link to them
+            source (str|ExternalRef): ID of the source item or reference to the external source
+            right_cells (list): List of lists with intermediate IDs or references to target items
             covered (bool): True if the row shall be stored in the covered attribute, False for uncovered attribute
-            app (sphinx.application.Sphinx): Sphinx application object
         """
-        source_attribute_cells = self._create_cells_for_info_cols(source, self['sourcecolumns'], app)
-        has_intermediate = bool(self['intermediate'])
-        intermediate_items = []
-        if has_intermediate:
-            intermediate_items = right_cells.pop(0)
+        intermediates = None
+        if self['intermediate']:
+            intermediates = tuple(right_cells.pop(0))
         targets_per_target = right_cells
 
-        new_rows = []
         number_of_rows = 1
         if self['splittargets']:
             number_of_rows = max([1] + [len(targets) for targets in targets_per_target])
-        for row_idx in range(number_of_rows):
-            row = nodes.row()
-
-            # source
-            row += self._create_cell_for_items([source], app)
-            # source columns: attributes and extra relations
-            for cell in source_attribute_cells:
-                row += copy(cell)
-            # intermediate
-            if has_intermediate:
-                if intermediate_items:
-                    row += self._create_cell_for_items(intermediate_items, app)
-                else:
-                    row += nodes.entry('')
-            # targets
-            for target_items in targets_per_target:
-                items = [nodes.paragraph('')]
-                if number_of_rows == 1 and target_items:
-                    items = target_items
-                elif row_idx < len(target_items):
-                    items = [target_items[row_idx]]
-                items.sort(key=natsort_key)
-                row += self._create_cell_for_items(items, app)
-            # target columns: attributes and extra relations
-            target_attribute_cells = []
-            if self['targetcolumns']:
-                if targets_per_target[-1]:
-                    target_item = targets_per_target[-1][row_idx]
-                else:
-                    target_item = nodes.paragraph('')
-                target_attribute_cells = self._create_cells_for_info_cols(target_item, self['targetcolumns'], app)
-            row += target_attribute_cells
+        if number_of_rows == 1:
+            targets_per_target = [sorted(targets, key=natsort_key) for targets in targets_per_target]
+        last_targets = targets_per_target[-1] if self['targetcolumns'] and targets_per_target else []
 
-            new_rows.append(row)
+        new_rows = []
+        for row_idx in range(number_of_rows):
+            if number_of_rows == 1:
+                targets = tuple(tuple(target_refs) for target_refs in targets_per_target)
+            else:
+                targets = tuple(tuple(target_refs[row_idx:row_idx + 1]) for target_refs in targets_per_target)
+            target_column_ref = last_targets[row_idx] if row_idx < len(last_targets) else None
+            new_rows.append(MatrixRow(source, intermediates, targets, target_column_ref))
 
         if covered:
             rows.counters[0] += 1
@@ -496,37 +598,90 @@ class ItemMatrix(TraceableBaseNode):
             rows.uncovered.extend(new_rows)
             rows.sorted.extend(new_rows)
 
-    def _add_target_items(self, target_cells, target_items):
-        """ Stores target items after filtering by target option.
+    def _create_row(self, row, app, collection):
+        """ Creates the docutils row for the plain data of a matrix row
+
+        Args:
+            row (MatrixRow): Plain data of the row
+            app (sphinx.application.Sphinx): Sphinx application object
+            collection (TraceableCollection): Collection of TraceableItems
+
+        Returns:
+            nodes.row: Row with a cell per column, before merging and removing cells
+        """
+        row_node = nodes.row()
+        # source
+        row_node += self._create_cell_for_refs([row.source], app)
+        # source columns: attributes and extra relations
+        row_node += self._create_cells_for_info_cols(row.source, self['sourcecolumns'], app, collection)
+        # intermediate
+        if row.intermediates is not None:
+            if row.intermediates:
+                row_node += self._create_cell_for_refs(row.intermediates, app)
+            else:
+                row_node += nodes.entry('')
+        # targets
+        for target_refs in row.targets:
+            row_node += self._create_cell_for_refs(target_refs, app)
+        # target columns: attributes and extra relations
+        if self['targetcolumns']:
+            row_node += self._create_cells_for_info_cols(row.target_column_ref, self['targetcolumns'], app,
+                                                         collection)
+        return row_node
+
+    def _create_cell_for_refs(self, refs, app):
+        """ Creates a cell with a link per reference, or with an empty paragraph when there are no references
+
+        Args:
+            refs (iterable): IDs of internal items and/or ExternalRef objects
+            app (sphinx.application.Sphinx): Sphinx application object
+
+        Returns:
+            nodes.entry: Cell filled with one or more links to items
+        """
+        ref_nodes = []
+        for ref in refs:
+            if isinstance(ref, ExternalRef):
+                ref_nodes.append(self.make_external_item_ref(app, ref.target, ref.relation))
+            else:
+                ref_nodes.append(self.make_internal_item_ref(app, ref))
+        return self._create_cell_for_items(ref_nodes or [nodes.paragraph('')], app)
+
+    def _add_target_items(self, target_cells, target_ids):
+        """ Stores target IDs after filtering by target option.
 
         Returns whether the source has been covered or not.
 
         Args:
             target_cells (list): List of empty lists to fill
-            target_items (list): List of potential target items
+            target_ids (list): List of IDs of potential target items
 
         Returns:
-            bool: True if a target item has been stored, False otherwise
+            bool: True if a target ID has been stored, False otherwise
         """
         covered = False
         for idx, target_regex in enumerate(self['target']):
-            for target in target_items:
-                if target_regex and target_regex.match(target.identifier):
-                    target_cells[idx].append(target)
+            for target_id in target_ids:
+                if target_regex and target_regex.match(target_id):
+                    target_cells[idx].append(target_id)
                     covered = True
         return covered
 
-    def _create_cells_for_info_cols(self, item, values, app):
+    def _create_cells_for_info_cols(self, ref, values, app, collection):
         """ Creates a cell with the item's attribute value for each attribute in the given list.
 
         Args:
-            item (TraceableItem): TraceableItem instance
+            ref (str|ExternalRef|None): ID of the item; the cells are empty for an external or missing item
             values (list): List of attributes and/or relationships (str)
             app: Sphinx' application object to use.
+            collection (TraceableCollection): Collection of TraceableItems
 
         Returns:
             list[nodes.entry]: Cells filled with attribute values for the given item
         """
+        item = collection.get_item(ref) if isinstance(ref, str) else None
+        if item is None:
+            return [nodes.entry('') for _ in values]
         cells = []
         for value in values:
             if value in TraceableItem.defined_attributes:
@@ -547,14 +702,76 @@ class ItemMatrix(TraceableBaseNode):
             nodes.entry: Cell filled with attribute value for the given item
         """
         cell = nodes.entry('')
-        if not isinstance(item, nodes.paragraph):
-            for linked_item in item.yield_targets_sorted(relation):
-                if self.is_relation_external(relation):
-                    cell += self.make_external_item_ref(app, linked_item, relation)
-                else:
-                    cell += self.make_internal_item_ref(app, linked_item)
+        for linked_item in item.yield_targets_sorted(relation):
+            if self.is_relation_external(relation):
+                cell += self.make_external_item_ref(app, linked_item, relation)
+            else:
+                cell += self.make_internal_item_ref(app, linked_item)
         return cell
 
+    def _virtualize_table(self, table, tbody, app):
+        """ Moves the rows of the table body to a data file in the static folder, to be rendered by traceability.js
+
+        Only the rows that are scrolled into view get rendered by the browser. The data file holds the HTML of every
+        unique paragraph once; every row holds the number of its item group, followed by a list per cell with the
+        number of rows that the cell spans and the indexes of its paragraphs. The JSON data is wrapped in a function
+        call, like Sphinx' search index, so that it can be loaded without a web server.
+
+        Args:
+            table (nodes.table): Table with merged cells
+            tbody (nodes.tbody): Table body of the table; gets emptied
+            app (sphinx.application.Sphinx): Sphinx application object
+
+        Returns:
+            nodes.container: Container with the table and a reference to the data file
+        """
+        translator = create_html_translator(app)
+        paragraphs = {}
+        rows = []
+        for row in tbody:
+            group = next(cls for cls in row['classes'] if cls.startswith('item-group-'))
+            cells = [[entry.get('morerows', 0) + 1,
+                      *(paragraphs.setdefault(node_to_html(translator, paragraph), len(paragraphs))
+                        for paragraph in entry)]
+                     for entry in row]
+            rows.append([int(group[len('item-group-'):]), *cells])
+        del tbody[:]
+
+        data_name = '{}/{}-{}.js'.format(self.VIRTUAL_DATA_DIR, self['document'], self['line'])
+        data_path = path.join(app.outdir, '_static', *data_name.split('/'))
+        ensuredir(path.dirname(data_path))
+        data = {'paragraphs': list(paragraphs), 'rows': rows}
+        with open(data_path, 'w', encoding='utf-8') as data_file:
+            data_file.write('traceabilityMatrixData({}, {});'.format(json.dumps(data_name),
+                                                                     json.dumps(data, separators=(',', ':'))))
+
+        container = nodes.container()
+        container['classes'].append('item-matrix-virtual')
+        container += table
+        container += nodes.raw('', f'<div class="item-matrix-data" data-src="{escape(data_name)}" hidden></div>',
+                               format='html')
+        return container
+
+    @classmethod
+    def remove_data_files(cls, app, docname=None):
+        """ Removes the data files of virtual item-matrices from the static folder, see ``_virtualize_table``
+
+        Args:
+            app (sphinx.application.Sphinx): Sphinx application object
+            docname (str): Name of the document to remove the data files of; None to remove all data files
+        """
+        data_dir = path.join(app.outdir, '_static', cls.VIRTUAL_DATA_DIR)
+        if docname is None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+            return
+        doc_dir, basename = path.split(path.join(data_dir, *docname.split('/')))
+        if not path.isdir(doc_dir):
+            return
+        data_name_regex = re.compile(re.escape(basename) + r'-\d+\.js')
+        for fname in listdir(doc_dir):
+            if data_name_regex.fullmatch(fname):
+                remove(path.join(doc_dir, fname))
+
     def _check_coverage(self, percentage):
         """ Checks the coverage percentage using the configured expression
 
@@ -611,6 +828,8 @@ class ItemMatrixDirective(TraceableBaseDirective):
          :onlycaptions:
          :hidetitle:
          :filtertarget:
+         :render: table | virtual
+         :tableless:
     """
     # Optional argument: title (whitespace allowed)
     optional_arguments = 1
@@ -642,6 +861,8 @@ class ItemMatrixDirective(TraceableBaseDirective):
         'onlycaptions': directives.flag,
         'hidetitle': directives.flag,
         'filtertarget': directives.flag,
+        'render': render_choice,
+        'tableless': directives.flag,
     }
     # Content disallowed
     has_content = False
@@ -674,6 +895,7 @@ class ItemMatrixDirective(TraceableBaseDirective):
                 'sourcetype':        {'default': []},
                 'recursiveintermediates': {'default': ''},
                 'coverage':          {'default': ''},
+                'render':            {'default': 'table'},
             },
         )
 
@@ -720,6 +942,7 @@ class ItemMatrixDirective(TraceableBaseDirective):
         self.check_option_presence(node, 'stats')
         self.check_option_presence(node, 'hidetitle')
         self.check_option_presence(node, 'filtertarget')
+        self.check_option_presence(node, 'tableless')
 
         if node['onlycovered'] and node['onlyuncovered']:
             raise TraceabilityException(
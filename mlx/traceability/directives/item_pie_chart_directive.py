@@ -16,7 +16,7 @@ from sphinx.builders.latex import LaTeXBuilder
 
 from ..traceability_exception import report_warning
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 from ..traceable_item import TraceableItem
 
 
@@ -123,6 +123,17 @@ class ItemPieChart(TraceableBaseNode):
             top_node += self.build_table(app)
         self.replace_self(top_node)
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: Regular expressions of the id_set option
+        """
+        return Dependencies(frozenset(), frozenset(), tuple(self['id_set']))
+
     def _relationships_to_labels(self, relationships):
         """ Converts the list of relationships to a list to the corresponding labels.
 
@@ -199,22 +210,21 @@ class ItemPieChart(TraceableBaseNode):
         """
         has_valid_target = False
         consider_nested_targets = True
-        for relationship in relationships:
-            for target_id in source_item.yield_targets(relationship):
-                target_item = self["collection"].get_item(target_id)
-                # placeholders don't end up in any item-piechart (less duplicate warnings for missing items)
-                if not target_item or target_item.is_placeholder:
-                    continue
-                if regex.match(target_id):
-                    has_valid_target = True
-                    if source_item.identifier == top_source_id:
-                        self["matches"][top_source_id].add_target(target_item)
-                    else:
-                        self["matches"][top_source_id].add_nested_target(source_item, target_item)
-                    if consider_nested_targets is False:  # at least one target doesn't have a nested target
-                        _ = match_function(top_source_id, target_item, relationship, consider_nested_targets=False)
-                    else:
-                        consider_nested_targets = match_function(top_source_id, target_item, relationship)
+        path_index = self["collection"].get_path_index(relationships, regex)
+        for relationship, target_id in path_index.links(source_item.identifier):
+            target_item = self["collection"].get_item(target_id)
+            # placeholders don't end up in any item-piechart (less duplicate warnings for missing items)
+            if not target_item or target_item.is_placeholder:
+                continue
+            has_valid_target = True
+            if source_item.identifier == top_source_id:
+                self["matches"][top_source_id].add_target(target_item)
+            else:
+                self["matches"][top_source_id].add_nested_target(source_item, target_item)
+            if consider_nested_targets is False:  # at least one target doesn't have a nested target
+                _ = match_function(top_source_id, target_item, relationship, consider_nested_targets=False)
+            else:
+                consider_nested_targets = match_function(top_source_id, target_item, relationship)
         return has_valid_target and consider_nested_targets
 
     def _match_covered(self, top_source_id, nested_source_item, relationship, consider_nested_targets=True):
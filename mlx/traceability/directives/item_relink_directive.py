@@ -3,13 +3,12 @@ from docutils.parsers.rst import directives
 
 from ..traceability_exception import TraceabilityException, report_warning
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import NO_DEPENDENCIES, TraceableBaseNode
 
 
 class ItemRelink(TraceableBaseNode):
     """Relinking of documentation items"""
     order = 2  # after ItemLink
-    source_ids = set()
 
     def perform_replacement(self, app, collection):
         """ The ItemRelink node has no final representation, so is removed from the tree.
@@ -20,6 +19,10 @@ class ItemRelink(TraceableBaseNode):
         """
         self.replace_self([])
 
+    def get_dependencies(self, collection):
+        """ The node has no output, so it does not depend on any item. Its effect is part of the items themselves. """
+        return NO_DEPENDENCIES
+
     def apply_effect(self, collection):
         """ Processes the item-relink items, which shall be done before converting anything to docutils.
 
@@ -34,7 +37,7 @@ class ItemRelink(TraceableBaseNode):
 
         if source is None:
             report_warning("Could not find item {!r} with type {!r} specified in item-relink directive"
-                           .format(source_id, forward_type), self['document'], self['line'])
+                           .format(source_id, forward_type), self['document'], self['line'], source_id)
             return
         if not reverse_type:
             report_warning(("Could not find reverse relationship type for type {!r} specified in "
@@ -56,8 +59,6 @@ class ItemRelink(TraceableBaseNode):
                     if not self['nooverwrite']:
                         report_warning(err, self['document'], self['line'])
 
-        self.source_ids.add(source_id)
-
     @staticmethod
     def remove_placeholders(collection):
         """Removes items that are no longer needed to avoid a warning about them being undefined.
@@ -68,10 +69,14 @@ class ItemRelink(TraceableBaseNode):
         Args:
             collection (TraceableCollection): Collection for which to generate the nodes.
         """
-        for source_id in ItemRelink.source_ids:
+        source_ids = {node['remap'] for node in collection.iter_intermediate_nodes()
+                      if isinstance(node, ItemRelink)}
+        for source_id in source_ids:
             source = collection.get_item(source_id)
-            if source.is_placeholder and not [targets for _, targets in source.all_relations if targets]:
-                collection.items.pop(source_id)
+            if source is None or not source.is_placeholder:
+                continue
+            if not [targets for _, targets in source.all_relations if targets]:
+                collection.remove_item(source_id)
 
 
 class ItemRelinkDirective(TraceableBaseDirective):
@@ -6,7 +6,7 @@ from sphinx.builders.latex import LaTeXBuilder
 
 from ..traceability_exception import report_warning, TraceabilityException
 from ..traceable_base_directive import TraceableBaseDirective
-from ..traceable_base_node import TraceableBaseNode
+from ..traceable_base_node import Dependencies, TraceableBaseNode
 
 natsort_key = natsort_keygen()
 
@@ -42,6 +42,27 @@ class ItemTree(TraceableBaseNode):
             top_node += ul_node
         self.replace_self(top_node)
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: IDs of the items that can be reached from the top level items and the regular expression of
+                the top level items
+        """
+        item_ids = set()
+        pending = list(collection.get_items(self['top'], sort=False))
+        while pending:
+            item_id = pending.pop()
+            item = collection.get_item(item_id)
+            if item_id in item_ids or item is None:
+                continue
+            item_ids.add(item_id)
+            pending.extend(item.yield_targets(*self['type']))
+        return Dependencies(frozenset(item_ids), frozenset(), (self['top'],))
+
     def _fill_container(self, collection, item, container):
         """ Fills the container with the ID of every valid target of the given item, recursively
 
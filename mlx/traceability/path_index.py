@@ -0,0 +1,161 @@
+'''
+Memoized index of the items that can be reached from traceable items through a chain of relations
+'''
+import re
+
+
+class PathIndex:
+    '''
+    Targets that can be reached from the items of a collection through the given relationships, computed once per item
+
+    The direct links of an item are its targets through the given relationships that match the target regex. When a
+    recursive relationship is given, an item also reaches the targets of its nested items: the items it relates to
+    through the recursive relationship that match the intermediate regex, recursively. All items of a cycle of nested
+    items reach the same targets.
+
+    The index reflects the collection at the moment of creation; use ``TraceableCollection.get_path_index`` to get an
+    up-to-date instance, which is shared by all callers that use the same relationships and regexes.
+    '''
+
+    def __init__(self, collection, relations, target_regex='', recursive_relation='', intermediate_regex=''):
+        ''' Initializes the index for the given collection
+
+        Args:
+            collection (TraceableCollection): Collection of traceable items
+            relations (iterable): Relationships to follow from an item to its targets
+            target_regex (str/re.Pattern): Regular expression that the IDs of the targets of the direct links shall
+                match
+            recursive_relation (str): Relationship to follow from an item to its nested items; empty for none
+            intermediate_regex (str/re.Pattern): Regular expression that the IDs of the nested items shall match
+        '''
+        self._items = collection.items
+        self.relations = tuple(relations)
+        self._target_match = re.compile(target_regex).match
+        self.recursive_relation = recursive_relation
+        self._intermediate_regex = intermediate_regex
+        self._links = {}
+        self._nested_ids = {}
+        self._reachable = {}
+
+    def links(self, item_id):
+        ''' Gets the direct links of an item
+
+        Args:
+            item_id (str): ID of the item
+
+        Returns:
+            tuple: Pairs of relationship and target ID, in order of the relationships; empty when the item is unknown
+        '''
+        links = self._links.get(item_id)
+        if links is None:
+            item = self._items.get(item_id)
+            links = ()
+            if item is not None:
+                links = tuple((relation, target_id) for relation in self.relations
+                              for target_id in item.yield_targets(relation) if self._target_match(target_id))
+            self._links[item_id] = links
+        return links
+
+    def nested_ids(self, item_id):
+        ''' Gets the IDs of the nested items of an item; unknown items are ignored
+
+        Args:
+            item_id (str): ID of the item
+
+        Returns:
+            list: IDs of the items that the item relates to through the recursive relationship and that match the
+            intermediate regex, without duplicates
+        '''
+        nested_ids = self._nested_ids.get(item_id)
+        if nested_ids is None:
+            item = self._items.get(item_id)
+            nested_ids = []
+            if item is not None and self.recursive_relation:
+                nested_ids = [nested_id for nested_id in dict.fromkeys(item.yield_targets(self.recursive_relation))
+                              if nested_id in self._items and self._items[nested_id].is_match(self._intermediate_regex)]
+            self._nested_ids[item_id] = nested_ids
+        return nested_ids
+
+    def reachable(self, item_id):
+        ''' Gets the IDs of the targets of the direct links of an item and of all of its nested items
+
+        Args:
+            item_id (str): ID of the item
+
+        Returns:
+            frozenset: IDs of the reachable targets
+        '''
+        if item_id not in self._reachable:
+            self._compute_reachable(item_id)
+        return self._reachable[item_id]
+
+    def uncovered_ids(self, item_id):
+        ''' Gets the IDs of the nested items of an item that don't reach any target
+
+        Args:
+            item_id (str): ID of the item
+
+        Returns:
+            list: IDs of the nested items without reachable targets
+        '''
+        return [nested_id for nested_id in self.nested_ids(item_id) if not self.reachable(nested_id)]
+
+    def _compute_reachable(self, start_id):
+        ''' Computes the reachable targets of the given item and of all nested items that have not been computed yet
+
+        The nested items are visited iteratively, with Tarjan's algorithm: the items of a strongly connected component
+        get the same targets, which are stored once the whole component has been visited.
+
+        Args:
+            start_id (str): ID of the item to start from
+        '''
+        index = {start_id: 0}
+        lowlink = {start_id: 0}
+        stack = [start_id]
+        on_stack = {start_id}
+        work = [(start_id, iter(self.nested_ids(start_id)))]
+        while work:
+            item_id, nested_ids = work[-1]
+            for nested_id in nested_ids:
+                if nested_id in self._reachable:
+                    continue
+                if nested_id not in index:
+                    index[nested_id] = lowlink[nested_id] = len(index)
+                    stack.append(nested_id)
+                    on_stack.add(nested_id)
+                    work.append((nested_id, iter(self.nested_ids(nested_id))))
+                    break
+                if nested_id in on_stack:
+                    lowlink[item_id] = min(lowlink[item_id], index[nested_id])
+            else:
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    lowlink[parent_id] = min(lowlink[parent_id], lowlink[item_id])
+                if lowlink[item_id] == index[item_id]:
+                    self._store_component(stack, on_stack, item_id)
+
+    def _store_component(self, stack, on_stack, root_id):
+        ''' Pops a strongly connected component from the stack and stores the targets that its items reach
+
+        Every nested item outside the component belongs to a component that has been stored before.
+
+        Args:
+            stack (list): Stack of visited item IDs of Tarjan's algorithm
+            on_stack (set): IDs of the items on the stack
+            root_id (str): ID of the first visited item of the component
+        '''
+        component = set()
+        while root_id not in component:
+            member_id = stack.pop()
+            on_stack.discard(member_id)
+            component.add(member_id)
+        targets = set()
+        for member_id in component:
+            targets.update(target_id for _, target_id in self.links(member_id))
+            for nested_id in self.nested_ids(member_id):
+                if nested_id not in component:
+                    targets.update(self._reachable[nested_id])
+        targets = frozenset(targets)
+        for member_id in component:
+            self._reachable[member_id] = targets
@@ -9,7 +9,9 @@ See readme for more details.
 from collections import namedtuple
 from os import path
 from re import fullmatch, match
+from uuid import uuid4
 
+import pickle
 import shutil
 from docutils import nodes
 from docutils.parsers.rst import directives
@@ -17,16 +19,18 @@ from requests import Session
 from sphinx import version_info as sphinx_version
 from sphinx.errors import NoUri
 from sphinx.roles import XRefRole
+from sphinx.util.logging import getLogger
 from sphinx.util.nodes import make_refnode
 from sphinx.util.osutil import ensuredir
 from importlib import import_module
 
 from .__traceability_version__ import __version__ as version
 from .traceable_attribute import TraceableAttribute
-from .traceable_base_node import TraceableBaseNode
+from .traceable_base_node import Dependencies, TraceableBaseNode
 from .traceable_item import TraceableItem
 from .traceable_collection import TraceableCollection
-from .traceability_exception import TraceabilityException, MultipleTraceabilityExceptions, report_warning
+from .traceability_exception import TraceabilityException, MultipleTraceabilityExceptions, report_warning, \
+    warning_collector
 from .directives.attribute_link_directive import AttributeLink, AttributeLinkDirective
 from .directives.attribute_sort_directive import AttributeSort, AttributeSortDirective
 from .directives.checkbox_result_directive import CheckboxResultDirective
@@ -44,6 +48,9 @@ from .directives.item_tree_directive import ItemTree, ItemTreeDirective
 
 ItemInfo = namedtuple('ItemInfo', 'attr_val mr_id')
 
+# Name of the file in the doctree directory that holds the state of the previous build, see save_build_state
+BUILD_STATE_FILENAME = 'traceability-state.pickle'
+
 
 def generate_color_css(class_names, hyperlink_colors, css_path):
     """ Generates CSS file that defines the colors for each hyperlink state for each configured regex.
@@ -146,9 +153,21 @@ class PendingItemXref(TraceableBaseNode):
                 if node is not None:
                     new_node = node
         else:
-            report_warning('Traceability: item %s not found' % self['reftarget'], self['document'], self['line'])
+            report_warning('Traceability: item %s not found' % self['reftarget'], self['document'], self['line'],
+                           self['reftarget'])
         self.replace_self(new_node)
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: ID of the item that is referred to
+        """
+        return Dependencies(frozenset(), frozenset({self['reftarget']}), ())
+
     def _redirect_undefined_reference(self, app, notification_item_id):
         """ Uses the configured item ID to create the reference if the item exists.
 
@@ -194,6 +213,101 @@ class PendingItemXref(TraceableBaseNode):
 
 # -----------------------------------------------------------------------------
 # Event handlers
+def apply_intermediate_nodes(collection, digest=None):
+    """Applies the effects of the item-link, item-relink, attribute-link and checkbox-result directives.
+
+    When a snapshot has been loaded for the collection as it has been read, the snapshot gets applied instead and the
+    warnings that have been reported while deriving it get reported again.
+
+    Args:
+        collection (TraceableCollection): Collection of the items as they have been read
+        digest (str): Digest of the collection, if already known
+    """
+    warnings = collection.apply_loaded_snapshot(digest)
+    if warnings is not None:
+        for warning in warnings:
+            report_warning(*warning)
+        return
+    collection.process_intermediate_nodes()
+    ItemRelink.remove_placeholders(collection)
+
+
+def update_collection_as_read(app, env):
+    """Called upon the ``env-updated`` event, once all outdated documents have been read.
+
+    Sphinx stores the environment before the consistency check. The implicit relations of the collection as it has been
+    read get updated here, so that the stored collection holds valid ones and the next incremental build only has to
+    update them for the items of the documents that it reads again.
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object
+        env (sphinx.environment.BuildEnvironment): Build environment
+    """
+    env.traceability_collection.apply_read_order()
+    env.traceability_collection.update_implicit_relations()
+
+
+def get_updated_documents(app, env):
+    """Called upon the ``env-get-updated`` event, once all outdated documents have been read.
+
+    Gets the documents that have not been read again but that need to be written again, because an item that one of
+    their traceability nodes depends on has changed. The items are compared to those of the previous build through
+    their digests, which are computed with the effects of the intermediate nodes applied. Since Sphinx stores the
+    environment before the consistency check, these effects are applied to a copy of the collection, which the
+    consistency check reuses. Only the items that have been read again or that the intermediate nodes modify, in this
+    build or the previous one, can have changed.
+
+    On a clean build, or when the state of the previous build is unavailable, all documents with traceability nodes
+    need to be written and nothing gets compared. When no document has been read, nothing has changed and Sphinx skips
+    the consistency check. The effects are then applied to the collection of the environment once a document gets
+    written anyway, see ``process_item_nodes``.
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object
+        env (sphinx.environment.BuildEnvironment): Build environment
+
+    Returns:
+        list: Names of the documents to write again
+    """
+    if not env.traceability_documents_read:
+        env.traceability_effects_pending = True
+        return []
+    previous_digests = env.traceability_item_digests
+    if previous_digests is None:
+        return sorted(env.traceability_documents)
+    digest = env.traceability_collection.get_digest() if get_snapshot_path(app) else None
+    collection = env.traceability_collection.copy()
+    with warning_collector.recording() as effect_warnings:
+        apply_intermediate_nodes(collection, digest)
+    env.traceability_collection.processed_copy = collection, digest, effect_warnings
+    digests = dict(previous_digests)
+    changed_ids = set()
+    changed_content_ids = set()
+    for itemid in collection.get_changed_ids() | env.traceability_effect_ids:
+        item = collection.items.get(itemid)
+        item_digests = item.get_digests() if item is not None else None
+        previous_item_digests = digests.pop(itemid, None)
+        if item_digests is not None:
+            digests[itemid] = item_digests
+        if item_digests != previous_item_digests:
+            changed_ids.add(itemid)
+            if (item_digests or (None,))[0] != (previous_item_digests or (None,))[0]:
+                changed_content_ids.add(itemid)
+    env.traceability_item_digests = digests
+    if not changed_ids:
+        return []
+    updated_docnames = []
+    for docname, traceability_nodes in env.traceability_documents.items():
+        for node in traceability_nodes:
+            dependencies = node.get_dependencies(collection)
+            if not changed_ids.isdisjoint(dependencies.item_ids) or \
+                    not changed_content_ids.isdisjoint(dependencies.referenced_ids) or \
+                    any(match(pattern, itemid) for pattern in dependencies.patterns for itemid in changed_ids):
+                updated_docnames.append(docname)
+                break
+    return updated_docnames
+
+
 def perform_consistency_check(app, env):
     """Called once in between Sphinx' read stage and write stage.
 
@@ -202,13 +316,22 @@ def perform_consistency_check(app, env):
     If the ``checklist_item_regex`` is configured, a warning is reported
     for each item ID that matches it and is not defined as a checklist-item.
     """
-    env.traceability_collection.process_intermediate_nodes()
-    # Restore implicit reverse relations on every consistency check to handle incremental builds
-    if hasattr(env, 'traceability_collection'):
-        env.traceability_collection.rebuild_implicit_relations()
-    ItemRelink.remove_placeholders(env.traceability_collection)
+    collection = env.traceability_collection
+    collection.apply_read_order()
+    snapshot_path = get_snapshot_path(app)
+    if collection.processed_copy is not None:
+        # the effects have been applied already to find the updated documents
+        collection, digest, effect_warnings = collection.processed_copy
+        env.traceability_collection = collection
+    else:
+        digest = collection.get_digest() if snapshot_path else None
+        with warning_collector.recording() as effect_warnings:
+            apply_intermediate_nodes(collection, digest)
+    if env.traceability_item_digests is None:
+        env.traceability_item_digests = {itemid: item.get_digests() for itemid, item in collection.items.items()}
     try:
-        env.traceability_collection.self_test(app.config.traceability_notifications.get('undefined-reference'))
+        env.traceability_collection.self_test(app.config.traceability_notifications.get('undefined-reference'),
+                                              workers=app.config.traceability_self_test_workers)
     except TraceabilityException as err:
         report_warning(str(err), err.docname)
     except MultipleTraceabilityExceptions as errors:
@@ -231,6 +354,110 @@ def perform_consistency_check(app, env):
     regex = env.traceability_checklist.get('checklist_item_regex')
     if regex is not None and env.traceability_checklist.get('has_checklist_items'):
         warn_missing_checklist_items(regex)
+    warning_collector.flush()
+
+    if snapshot_path:
+        collection.save_snapshot(snapshot_path, digest, effect_warnings)
+    save_build_state(app, env)
+
+
+def load_build_state(app, env):
+    """Loads the state that the previous build has saved with ``save_build_state`` and gives the current build a new
+    identification.
+
+    The state is only valid for the environment that the same build has stored. It is discarded when the stored
+    environment comes from another build, e.g. because that build has been interrupted after storing it.
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object
+        env (sphinx.environment.BuildEnvironment): Build environment
+
+    Returns:
+        dict: State of the previous build; empty if it is unavailable
+    """
+    previous_build_id = getattr(env, 'traceability_build_id', None)
+    env.traceability_build_id = uuid4().hex
+    if previous_build_id is None:
+        return {}
+    try:
+        with open(path.join(app.doctreedir, BUILD_STATE_FILENAME), 'rb') as infile:
+            state = pickle.load(infile)
+    except Exception:  # missing, truncated or written by an incompatible version
+        return {}
+    if not isinstance(state, dict) or state.get('build') != previous_build_id:
+        return {}
+    return state
+
+
+def save_build_state(app, env):
+    """Saves the state of the traceability information that is derived after Sphinx has stored the environment, to be
+    reused by the next build, see ``load_build_state``.
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object
+        env (sphinx.environment.BuildEnvironment): Build environment
+    """
+    state = {
+        'build': env.traceability_build_id,
+        'self-test': env.traceability_collection.get_self_test_results(),
+        'digests': env.traceability_item_digests,
+        'effects': env.traceability_collection.get_effect_ids(),
+    }
+    ensuredir(app.doctreedir)
+    with open(path.join(app.doctreedir, BUILD_STATE_FILENAME), 'wb') as outfile:
+        pickle.dump(state, outfile, pickle.HIGHEST_PROTOCOL)
+
+
+def get_snapshot_path(app):
+    """Gets the path to the snapshot of the collection, see ``traceability_snapshot_path``.
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object
+
+    Returns:
+        str: Path to the JSON file, or None when the snapshot is disabled
+    """
+    snapshot_path = app.config.traceability_snapshot_path
+    if snapshot_path is True:
+        return path.join(app.doctreedir, 'traceability-snapshot.json')
+    return snapshot_path or None
+
+
+def remember_documents_to_read(app, env, docnames):
+    """Called upon the ``env-before-read-docs`` event to remember if any document gets read in this build."""
+    env.traceability_documents_read = bool(docnames)
+
+
+# Order of replacement is important: e.g. AttributeSort before Item, item cross-references last
+NODE_CLASSES = (
+    AttributeLink,
+    AttributeSort,
+    ItemLink,
+    ItemRelink,
+    ItemMatrix,
+    ItemPieChart,
+    ItemAttributesMatrix,
+    Item2DMatrix,
+    ItemList,
+    ItemTree,
+    ItemAttribute,
+    Item,
+    PendingItemXref,
+)
+NODE_ORDER = {node_class: index for index, node_class in enumerate(NODE_CLASSES)}
+
+
+def mark_traceable_document(app, doctree):
+    """
+    This function should be triggered upon ``doctree-read`` event
+
+    Stores a copy of the traceability nodes of the document, without their children. Their dependencies are used to
+    find the documents to write again in incremental builds, and ``process_item_nodes`` skips documents without them.
+    """
+    env = app.builder.env
+    traceability_nodes = [node.copy() for node in doctree.findall(TraceableBaseNode)]
+    if traceability_nodes:
+        env.traceability_documents[env.docname] = traceability_nodes
 
 
 def process_item_nodes(app, doctree, fromdocname):
@@ -241,28 +468,25 @@ def process_item_nodes(app, doctree, fromdocname):
     Augment each item with a backlink to the original location.
     """
     env = app.builder.env
-    node_classes = (
-        AttributeLink,
-        AttributeSort,
-        ItemLink,
-        ItemRelink,
-        ItemMatrix,
-        ItemPieChart,
-        ItemAttributesMatrix,
-        Item2DMatrix,
-        ItemList,
-        ItemTree,
-        ItemAttribute,
-        Item,
-    )
-    for node_class in node_classes:  # order is important: e.g. AttributeSort before Item
-        for node in doctree.traverse(node_class):
-            node.perform_replacement(app, env.traceability_collection)
-
-    for node in doctree.traverse(PendingItemXref):
+    # the doctree of a builder like latex or singlehtml combines the documents, under the name of the master document
+    if fromdocname not in env.traceability_documents and next(doctree.findall(TraceableBaseNode), None) is None:
+        return
+    if env.traceability_effects_pending:
+        env.traceability_effects_pending = False
+        with warning_collector.muted():  # reported by the build that has read the documents
+            apply_intermediate_nodes(env.traceability_collection)
+    buckets = [[] for _ in NODE_CLASSES]
+    for node in doctree.findall(TraceableBaseNode):  # a single traversal, sorted into buckets
+        index = next((NODE_ORDER[cls] for cls in type(node).__mro__ if cls in NODE_ORDER), None)
+        if index is not None:
+            buckets[index].append(node)
+
+    for node in buckets[-1]:
         node['document'] = fromdocname
         node['line'] = node.line
-        node.perform_replacement(app, env.traceability_collection)
+    for bucket in buckets:
+        for node in bucket:
+            node.perform_replacement(app, env.traceability_collection)
 
 
 def init_available_relationships(app):
@@ -317,6 +541,7 @@ def init_available_relationships(app):
 
 def initialize_environment(app):
     """Perform initializations needed before the build process starts."""
+    warning_collector.start(app.config.traceability_warnings_max_repeats)
     env = app.builder.env
     # Preserve cached environment data across incremental builds
     # Only initialize when missing to avoid losing items/refs from unchanged docs
@@ -332,6 +557,8 @@ def initialize_environment(app):
             processed_sort_config[attr] = sorted
     if not hasattr(env, 'traceability_collection') or env.traceability_collection is None:
         env.traceability_collection = TraceableCollection()
+        # all documents get read: forget the data of virtual item-matrices that no document may write again
+        ItemMatrix.remove_data_files(app)
     # Always update sort config on the existing collection
     env.traceability_collection.attributes_sort = processed_sort_config
     # Copy configuration dictionaries to environment to avoid modifying app.config,
@@ -346,6 +573,19 @@ def initialize_environment(app):
         env.traceability_attributes = dict(app.config.traceability_attributes)
     if not hasattr(env, 'traceability_attribute_to_string') or env.traceability_attribute_to_string is None:
         env.traceability_attribute_to_string = dict(app.config.traceability_attribute_to_string)
+    if not hasattr(env, 'traceability_attribute_descriptions'):
+        env.traceability_attribute_descriptions = {}
+    if not hasattr(env, 'traceability_documents'):
+        env.traceability_documents = {}
+    env.traceability_documents_read = True
+    env.traceability_effects_pending = False
+    state = load_build_state(app, env)
+    env.traceability_collection.set_self_test_results(state.get('self-test'))
+    env.traceability_item_digests = state.get('digests')
+    env.traceability_effect_ids = state.get('effects', set())
+    snapshot_path = get_snapshot_path(app)
+    if snapshot_path:
+        env.traceability_collection.load_snapshot(snapshot_path)
 
     all_relationships = set(app.config.traceability_relationships).union(app.config.traceability_relationships.values())
     all_relationships.discard('')
@@ -360,6 +600,8 @@ def initialize_environment(app):
                             env.traceability_attribute_to_string)
 
     init_available_relationships(app)
+    # the attributes have just been defined anew: restore the descriptions of documents that won't be read again
+    apply_attribute_descriptions(env.traceability_attribute_descriptions)
 
     # LaTeX-support: since we generate empty tags, we need to relax the verbosity of that error
     if 'preamble' not in app.config.latex_elements:
@@ -375,11 +617,81 @@ def _purge(app, env, docname):
     """Ensure we purge items and relations when a document is updated in incremental builds."""
     if hasattr(env, 'traceability_collection'):
         env.traceability_collection.remove_items_from_document(docname)
+        env.traceability_collection.remove_intermediate_nodes(docname)
+    # the document gets written again if it still has virtual item-matrices
+    ItemMatrix.remove_data_files(app, docname)
     # Purge attribute descriptions defined in this document to avoid stale captions/content
-    to_delete = [attr_id for attr_id, attr in TraceableItem.defined_attributes.items()
-                 if getattr(attr, 'docname', None) == docname]
-    for attr_id in to_delete:
-        del TraceableItem.defined_attributes[attr_id]
+    env.traceability_attribute_descriptions.pop(docname, None)
+    purged_ids = set()
+    for attr_id in TraceableAttribute.pop_ids_of_document(docname):
+        attr = TraceableItem.defined_attributes.get(attr_id)
+        if attr is not None and attr.docname == docname:
+            attr.caption = None
+            attr.docname = None
+            attr.lineno = None
+            purged_ids.add(attr_id)
+    if purged_ids:
+        # fall back to a description of the attribute in another document, if any
+        apply_attribute_descriptions(env.traceability_attribute_descriptions, purged_ids)
+    env.traceability_documents.pop(docname, None)
+
+
+def merge_parallel_read(app, env, docnames, other):
+    """Merges the traceability information of documents that have been read by a parallel process.
+
+    Args:
+        app (sphinx.application.Sphinx): Sphinx application object
+        env (sphinx.environment.BuildEnvironment): Environment of the main process
+        docnames (set): Names of the documents that have been read by the parallel process
+        other (sphinx.environment.BuildEnvironment): Environment of the parallel process
+    """
+    warning_collector.merge(getattr(other, 'traceability_forked_warnings', None))
+    for err, item in env.traceability_collection.merge(other.traceability_collection, docnames):
+        report_warning(err, item.docname, item.lineno, item.identifier)
+    for docname in docnames:
+        if docname in other.traceability_documents:
+            env.traceability_documents[docname] = other.traceability_documents[docname]
+    # the attribute definitions are class-level: apply the descriptions found by the parallel process
+    descriptions = {docname: other.traceability_attribute_descriptions[docname] for docname in docnames
+                    if other.traceability_attribute_descriptions.get(docname)}
+    env.traceability_attribute_descriptions.update(descriptions)
+    apply_attribute_descriptions(descriptions)
+    if other.traceability_checklist.get('has_checklist_items'):
+        env.traceability_checklist['has_checklist_items'] = True
+    for item_id in other.traceability_checklist.get('checklist_item_ids', ()):
+        env.traceability_checklist.setdefault('checklist_item_ids', set()).add(item_id)
+        ChecklistItemDirective.query_results.pop(item_id, None)
+
+
+def flush_warnings(app, *args):
+    """Reports the warnings that have been collected before reading documents, or while reading or resolving a
+    document."""
+    warning_collector.flush()
+
+
+def store_forked_warnings(app, doctree):
+    """Called upon the ``doctree-read`` event. A process that reads documents in parallel stores the warnings that it
+    has collected in its environment, which gets merged by the main process, see ``merge_parallel_read``."""
+    state = warning_collector.get_state()
+    if state is not None:
+        app.builder.env.traceability_forked_warnings = state
+
+
+def finish_warnings(app, exception):
+    """Reports the remaining warnings and exports all of them if configured."""
+    warning_collector.stop()
+    if app.config.traceability_warnings_json_path and not exception:
+        warning_collector.export(app.config.traceability_warnings_json_path)
+
+
+def report_cache_info(app, exception):
+    """Logs the effectiveness of the caches of the collection and of the attribute validation in verbose mode."""
+    if exception or not hasattr(app.env, 'traceability_collection'):
+        return
+    logger = getLogger(__name__)
+    logger.verbose('traceability: get_items cache: %s', app.env.traceability_collection.query_cache_info())
+    for attr_id, attr in TraceableItem.defined_attributes.items():
+        logger.verbose('traceability: validation cache of attribute %r: %s', attr_id, attr.validation_cache_info())
 
 
 # ----------------------------------------------------------------------------
@@ -401,6 +713,7 @@ def add_checklist_attribute(checklist_config, attributes_config, attribute_to_st
         return
     checklist_config['configured'] = True
     checklist_config['has_checklist_items'] = False
+    checklist_config['checklist_item_ids'] = set()
     checklist_config['checklist_item_regex'] = checklist_config.get('checklist_item_regex', r"\S+")
 
     attr_values = checklist_config['attribute_values'].split(',')
@@ -420,6 +733,26 @@ def add_checklist_attribute(checklist_config, attributes_config, attribute_to_st
         ChecklistItemDirective.query_results = query_checklist(checklist_config, attr_values)
 
 
+def apply_attribute_descriptions(descriptions, attr_ids=None):
+    """Applies the captions and locations of ``item-attribute`` descriptions to the defined attributes.
+
+    When an attribute is described in multiple documents, the description in the document that sorts last wins, as
+    it would for a serial read.
+
+    Args:
+        descriptions (dict): Per document name, a dictionary of attribute IDs to tuples of caption and line number
+        attr_ids (set): IDs of the attributes to apply the descriptions of; None for all attributes
+    """
+    for docname in sorted(descriptions):
+        for attr_id, (caption, lineno) in descriptions[docname].items():
+            if attr_ids is not None and attr_id not in attr_ids:
+                continue
+            attr = TraceableItem.defined_attributes.get(attr_id)
+            if attr is not None and (attr.docname is None or attr.docname <= docname):
+                attr.caption = caption
+                attr.set_location(docname, lineno)
+
+
 def define_attribute(attr, env):
     """ Defines a new attribute. """
     attrobject = TraceableAttribute(attr, env.traceability_attributes[attr])
@@ -573,6 +906,18 @@ def setup(app):
     # Configuration for exporting collection to json
     app.add_config_value('traceability_json_export_path', None, 'env')
 
+    # Configuration for checking the items in multiple processes during the self test
+    app.add_config_value('traceability_self_test_workers', 1, '')
+
+    # Configuration for exporting the warnings of the plugin to json
+    app.add_config_value('traceability_warnings_json_path', None, '')
+
+    # Configuration for limiting the number of locations at which the same warning is reported
+    app.add_config_value('traceability_warnings_max_repeats', 0, '')
+
+    # Configuration for reusing the collection of a previous build or builder
+    app.add_config_value('traceability_snapshot_path', False, '', types=(bool, str))
+
     # Configuration for adapting items through a callback while processing the ``item`` directives
     app.add_config_value('traceability_callback_per_item', None, 'env')
 
@@ -729,8 +1074,19 @@ def setup(app):
 
     app.connect('builder-inited', initialize_environment)
     app.connect('env-purge-doc', _purge)
+    app.connect('env-merge-info', merge_parallel_read)
+    app.connect('env-updated', update_collection_as_read)
+    app.connect('env-get-updated', get_updated_documents)
     app.connect('env-check-consistency', perform_consistency_check)
     app.connect('doctree-resolved', process_item_nodes)
+    app.connect('doctree-resolved', flush_warnings)
+    app.connect('env-before-read-docs', remember_documents_to_read)
+    app.connect('env-before-read-docs', flush_warnings)
+    app.connect('doctree-read', mark_traceable_document)
+    app.connect('doctree-read', flush_warnings)
+    app.connect('doctree-read', store_forked_warnings)
+    app.connect('build-finished', finish_warnings)
+    app.connect('build-finished', report_cache_info)
 
     app.add_role('item', XRefRole(nodeclass=PendingItemXref,
                                   innernodeclass=nodes.emphasis,
@@ -738,6 +1094,7 @@ def setup(app):
 
     return {
         'version': version,
-        'parallel_read_safe': False,
+        'env_version': 7,
+        'parallel_read_safe': True,
         'parallel_write_safe': True,
     }
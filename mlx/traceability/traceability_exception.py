@@ -1,23 +1,210 @@
 '''
 Exception classes for traceability
 '''
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
 from sphinx.util.logging import getLogger
 
 
-def report_warning(msg, docname=None, lineno=None):
+class WarningCollector:
+    '''
+    Collects the warnings of the traceability plugin to report them in bulk
+
+    While collecting, a warning is only reported once per location and the number of locations at which the same
+    message about the same item gets reported can be capped. Warnings are reported immediately when not collecting.
+
+    A process that gets forked while collecting, e.g. to read documents in parallel, collects its own warnings without
+    reporting them. The process that has started collecting reports them once it has merged them, see ``get_state``
+    and ``merge``.
+    '''
+
+    def __init__(self):
+        ''' Initializes a collector that reports warnings immediately '''
+        self.max_repeats = 0
+        self._collecting = False
+        self._pending = []  # keys and item IDs of the warnings that have not been reported yet
+        self._counts = {}  # (message, docname, lineno) -> number of times the warning has been reported
+        self._locations_per_item = {}  # (item ID, message) -> number of locations it has been reported at
+        self.suppressed = 0
+        self._muted = False
+        self._recorded = None
+        self._pid = os.getpid()  # ID of the process that reports the collected warnings
+        self._forked = False
+
+    def start(self, max_repeats=0):
+        ''' Starts collecting warnings, forgetting all warnings that have been collected before
+
+        Args:
+            max_repeats (int): Maximum number of locations to report the same message about the same item at; 0 for
+                no maximum
+        '''
+        self.__init__()
+        self.max_repeats = max_repeats
+        self._collecting = True
+
+    def stop(self):
+        ''' Reports all pending warnings and stops collecting '''
+        self.flush()
+        self._collecting = False
+        if self.suppressed:
+            getLogger(__name__).info('traceability: %d repeated warning(s) have been suppressed', self.suppressed)
+
+    def report(self, msg, docname=None, lineno=None, item_id=None):
+        ''' Reports a warning, or adds it to the pending warnings when collecting
+
+        Args:
+            msg (any __str__): Message of the warning, gets converted to str.
+            docname (str): Relative path to the document on which the error occurred, without extension.
+            lineno (int): Line number in the document on which the error occurred.
+            item_id (str): ID of the item that the warning is about, if any
+        '''
+        if self._muted:
+            return
+        self._check_process()
+        msg = str(msg)
+        if self._recorded is not None:
+            self._recorded.append((msg, docname, lineno, item_id))
+        if not self._collecting:
+            self._emit(msg, docname, lineno)
+            return
+        key = (msg, docname, lineno)
+        if key in self._counts:
+            self._counts[key] += 1
+        else:
+            self._counts[key] = 1
+            self._pending.append((key, item_id))
+
+    @contextmanager
+    def muted(self):
+        ''' Context manager that drops the warnings that get reported within it '''
+        muted, self._muted = self._muted, True
+        try:
+            yield
+        finally:
+            self._muted = muted
+
+    @contextmanager
+    def recording(self):
+        ''' Context manager that keeps a copy of the warnings that get reported within it, e.g. to report them again
+        in a later build
+
+        Returns:
+            list: Tuples of message, document name, line number and item ID, in the order in which they have been
+            reported
+        '''
+        recorded, self._recorded = self._recorded, []
+        try:
+            yield self._recorded
+        finally:
+            if recorded is not None:
+                recorded.extend(self._recorded)
+            self._recorded = recorded
+
+    def flush(self):
+        ''' Reports the pending warnings, in the order in which they have been collected
+
+        A forked process keeps them pending, to be merged by the process that has started collecting.
+        '''
+        self._check_process()
+        if self._forked:
+            return
+        pending, self._pending = self._pending, []
+        for (msg, docname, lineno), item_id in pending:
+            if self.max_repeats:
+                reported = self._locations_per_item.get((item_id, msg), 0)
+                if reported >= self.max_repeats:
+                    self.suppressed += 1
+                    continue
+                self._locations_per_item[item_id, msg] = reported + 1
+            self._emit(msg, docname, lineno)
+
+    def _check_process(self):
+        ''' Starts collecting anew when the current process has been forked from the one that has started collecting,
+        so that only the warnings of the forked process get merged back '''
+        if self._collecting and not self._forked and os.getpid() != self._pid:
+            self.start(self.max_repeats)
+            self._forked = True
+
+    def get_state(self):
+        ''' Gets the warnings that are pending in a forked process, to be merged by the process that has started
+        collecting, see ``merge``
+
+        Returns:
+            tuple: Pending warnings and the number of times each of them has been reported; None if the current process
+            has not been forked while collecting
+        '''
+        self._check_process()
+        if not self._forked:
+            return None
+        return self._pending, self._counts
+
+    def merge(self, state):
+        ''' Merges the warnings that a forked process has collected, see ``get_state``. The pending ones get reported
+        on the next flush.
+
+        Args:
+            state (tuple): State of the forked process; None if unavailable
+        '''
+        if state is None:
+            return
+        pending, counts = state
+        if not self._collecting:
+            for (msg, docname, lineno), _ in pending:
+                self._emit(msg, docname, lineno)
+            return
+        for key, item_id in pending:
+            if key in self._counts:
+                self._counts[key] += counts[key]
+            else:
+                self._counts[key] = counts[key]
+                self._pending.append((key, item_id))
+
+    def export(self, fname):
+        ''' Exports all collected warnings to a JSON file. The target location gets created if it doesn't exist yet.
+
+        Args:
+            fname (str): Path to the JSON file to write
+        '''
+        Path(fname).parent.mkdir(parents=True, exist_ok=True)
+        warnings = [{'message': msg, 'document': docname, 'line': lineno, 'count': count}
+                    for (msg, docname, lineno), count in self._counts.items()]
+        with open(fname, 'w') as outfile:
+            json.dump(warnings, outfile, indent=4, sort_keys=True)
+
+    @staticmethod
+    def _emit(msg, docname, lineno):
+        ''' Logs a warning
+
+        Args:
+            msg (str): Message of the warning
+            docname (str): Relative path to the document on which the error occurred, without extension.
+            lineno (int): Line number in the document on which the error occurred.
+        '''
+        logger = getLogger(__name__)
+        if lineno is not None:
+            logger.warning(msg, location=(docname, str(lineno)))
+        else:
+            logger.warning(msg, location=docname)
+
+
+warning_collector = WarningCollector()
+
+
+def report_warning(msg, docname=None, lineno=None, item_id=None):
     '''Convenience function for logging a warning
 
+    The warning is reported through the ``warning_collector``.
+
     Args:
         msg (any __str__): Message of the warning, gets converted to str.
         docname (str): Relative path to the document on which the error occurred, without extension.
         lineno (int): Line number in the document on which the error occurred.
+        item_id (str): ID of the item that the warning is about, if any; used to cap repeated warnings per item
     '''
-    msg = str(msg)
-    logger = getLogger(__name__)
-    if lineno is not None:
-        logger.warning(msg, location=(docname, str(lineno)))
-    else:
-        logger.warning(msg, location=docname)
+    warning_collector.report(msg, docname, lineno, item_id)
 
 
 class MultipleTraceabilityExceptions(Exception):
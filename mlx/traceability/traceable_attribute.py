@@ -3,14 +3,20 @@ Storage class for traceable item attribute
 '''
 
 import re
-from .traceable_base_class import TraceableBaseClass
+from .traceable_base_class import CacheInfo, TraceableBaseClass
 
 
 class TraceableAttribute(TraceableBaseClass):
     '''
     Storage for an attribute to a traceable documentation item
     '''
-    regex = None
+
+    __slots__ = ('_value', 'regex', '_accepted_values', '_cache_hits', '_cache_misses')
+
+    # document name -> set of identifiers of attributes that have been located in that document
+    _ids_per_docname = {}
+    # maximum number of attribute values for which the result of ``can_accept`` is remembered
+    VALIDATION_CACHE_SIZE = 4096
 
     def __init__(self, attrid, value, **kwargs):
         '''
@@ -21,6 +27,8 @@ class TraceableAttribute(TraceableBaseClass):
             value (str): Pattern string to which the attribute values should match
         '''
         super(TraceableAttribute, self).__init__(attrid, **kwargs)
+        self._cache_hits = 0
+        self._cache_misses = 0
         self.value = value
 
     @staticmethod
@@ -35,6 +43,28 @@ class TraceableAttribute(TraceableBaseClass):
         '''
         return identifier.lower()
 
+    def _docname_changed(self, previous_docname):
+        ''' Keeps track of the attributes that are described in each document '''
+        if previous_docname in self._ids_per_docname:
+            self._ids_per_docname[previous_docname].discard(self.identifier)
+        if self.docname is not None:
+            self._ids_per_docname.setdefault(self.docname, set()).add(self.identifier)
+
+    @classmethod
+    def pop_ids_of_document(cls, docname):
+        ''' Gets and forgets the identifiers of all attributes that have been located in the given document
+
+        The identifiers are not guaranteed to belong to attributes that are still defined or still located in the
+        document; callers should verify this.
+
+        Args:
+            docname (str): Document name
+
+        Returns:
+            set: Identifiers of attributes
+        '''
+        return cls._ids_per_docname.pop(docname, set())
+
     def update(self, other):
         '''
         Update with new object
@@ -54,12 +84,35 @@ class TraceableAttribute(TraceableBaseClass):
     def value(self, new_value):
         self._value = new_value
         self.regex = re.compile(new_value)
+        self._accepted_values = {}
 
     def can_accept(self, value):
         '''
         Check whether a certain value can be accepted as attribute value
 
+        The result is remembered for the most recently checked values, since the same values recur on many items.
+
         Args:
             value (str): Value to check the validity of
+
+        Returns:
+            bool: True if the value matches the regex of the attribute, False otherwise
+        '''
+        accepted = self._accepted_values.get(value)
+        if accepted is not None:
+            self._cache_hits += 1
+            return accepted
+        self._cache_misses += 1
+        accepted = bool(self.regex.match(value))
+        if len(self._accepted_values) >= self.VALIDATION_CACHE_SIZE:
+            del self._accepted_values[next(iter(self._accepted_values))]  # forget the oldest value
+        self._accepted_values[value] = accepted
+        return accepted
+
+    def validation_cache_info(self):
+        ''' Reports the effectiveness of the cache for results of ``can_accept``
+
+        Returns:
+            CacheInfo: Named tuple with the number of cache hits, cache misses and the current number of cached values
         '''
-        return self.regex.match(value)
+        return CacheInfo(self._cache_hits, self._cache_misses, len(self._accepted_values))
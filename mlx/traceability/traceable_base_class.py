@@ -3,6 +3,7 @@ Base class for traceable stuff
 '''
 
 import hashlib
+from collections import namedtuple
 from pathlib import Path
 from docutils.statemachine import StringList, ViewList
 
@@ -10,12 +11,17 @@ from sphinx.util.docutils import nodes
 
 from .traceability_exception import TraceabilityException, report_warning
 
+CacheInfo = namedtuple('CacheInfo', 'hits misses currsize')
+
 
 class TraceableBaseClass:
     '''
     Storage for a traceable base class
     '''
 
+    __slots__ = ('identifier', 'name', 'caption', '_docname', 'lineno', 'node', '_content', '_content_node',
+                 'directive')
+
     def __init__(self, name, directive=None):
         '''
         Initialize a new base class
@@ -27,15 +33,48 @@ class TraceableBaseClass:
         self.identifier = self.to_id(name)
         self.name = name
         self.caption = None
-        self.docname = None
+        self._docname = None
         self.lineno = None
         self.node = None
         self._content = None
-        self.content_node = nodes.container()
-        self.content_node['ids'].append(f'content-{self.identifier}')
+        self._content_node = None
         self.directive = directive
-        if directive is not None:
-            directive.state.document.ids[f'content-{self.identifier}'] = self.content_node
+
+    @property
+    def docname(self):
+        ''' str: Name of the document that defines this object, without file extension; None if unknown '''
+        return self._docname
+
+    @docname.setter
+    def docname(self, docname):
+        previous_docname = self._docname
+        self._docname = docname
+        if docname != previous_docname:
+            self._docname_changed(previous_docname)
+
+    def _docname_changed(self, previous_docname):
+        ''' Hook called when the document name has changed
+
+        Args:
+            previous_docname (str): Previous document name, or None
+        '''
+
+    @property
+    def content_node(self):
+        ''' nodes.container: Node with the parsed content, created on first access
+
+        While the directive is available, the node gets registered in its document so that it can be referenced.
+        '''
+        if self._content_node is None:
+            self._content_node = nodes.container()
+            self._content_node['ids'].append(f'content-{self.identifier}')
+            if self.directive is not None:
+                self.directive.state.document.ids[f'content-{self.identifier}'] = self._content_node
+        return self._content_node
+
+    @content_node.setter
+    def content_node(self, node):
+        self._content_node = node
 
     @staticmethod
     def to_id(identifier):
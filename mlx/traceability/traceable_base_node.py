@@ -1,6 +1,7 @@
 """ Module for the base class for all Traceability node classes. """
 import re
 from abc import abstractmethod, ABC
+from collections import namedtuple
 
 from docutils import nodes
 from sphinx.errors import NoUri
@@ -12,6 +13,9 @@ from .traceable_item import TraceableItem
 
 EXTERNAL_LINK_FIELDNAME = 'field'
 
+Dependencies = namedtuple('Dependencies', 'item_ids referenced_ids patterns')
+NO_DEPENDENCIES = Dependencies(frozenset(), frozenset(), ())
+
 
 class TraceableBaseNode(nodes.General, nodes.Element, ABC):
     """ Base class for all Traceability node classes. """
@@ -51,6 +55,22 @@ class TraceableBaseNode(nodes.General, nodes.Element, ABC):
             collection (TraceableCollection): Collection for which to generate the nodes.
         """
 
+    def get_dependencies(self, collection):
+        """ Gets the items that the output of this node depends on.
+
+        The document that contains the node needs to be written again when one of these items changes. By default,
+        a node depends on all items.
+
+        Args:
+            collection (TraceableCollection): Collection of items, with the effects of all intermediate nodes applied
+
+        Returns:
+            Dependencies: IDs of the items that the output depends on, IDs of the items that are only referred to
+                (their caption and location matter) and regular expressions that match the IDs of other items that the
+                output depends on
+        """
+        return Dependencies(frozenset(), frozenset(), ('',))
+
     def make_internal_item_ref(self, app, item_id):
         """
         Creates a reference node for an item, embedded in a
@@ -270,6 +290,6 @@ class TraceableBaseNode(nodes.General, nodes.Element, ABC):
         """
         if item_info.is_placeholder:
             report_warning("Traceability: cannot link to '%s', item is not defined" % item_info.identifier,
-                           self['document'], self['line'])
+                           self['document'], self['line'], item_info.identifier)
             return True
         return False
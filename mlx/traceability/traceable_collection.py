@@ -1,15 +1,199 @@
 '''
 Storage classes for collection of traceable items
 '''
+import hashlib
 import json
+import pickle
 import re
-from operator import attrgetter
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import count
+from operator import attrgetter, itemgetter
 from pathlib import Path
 
 from natsort import natsorted
 
+try:
+    from re import _parser as sre_parse  # Python >= 3.11
+except ImportError:  # pragma: no cover
+    import sre_parse  # pylint: disable=deprecated-module
+
+from .adjacency_matrix import AdjacencyMatrix
+from .path_index import PathIndex
 from .traceability_exception import MultipleTraceabilityExceptions, TraceabilityException
-from .traceable_item import TraceableItem
+from .traceable_attribute import TraceableAttribute
+from .traceable_base_class import CacheInfo
+from .traceable_item import TraceableItem, natural_sort_key
+
+
+def _value_matches(regex, value):
+    ''' Checks if an attribute value matches a regular expression, the way ``TraceableItem.attributes_match`` does
+
+    Args:
+        regex (str/re.Pattern): Regular expression pattern or object
+        value (str): Attribute value
+
+    Returns:
+        bool: True if the regex matches the start of the value
+    '''
+    try:
+        return bool(regex.match(value))
+    except AttributeError:
+        return bool(re.match(regex, value))
+
+
+@lru_cache(maxsize=1024)
+def _literal_prefix(pattern, flags):
+    ''' Determines the literal prefix that every string matched by the given pattern (using ``re.match``) starts with
+
+    Args:
+        pattern (str): Regular expression pattern
+        flags (int): Flags to compile the pattern with
+
+    Returns:
+        str: Literal prefix; empty string if the pattern has no anchorable prefix
+    '''
+    if not isinstance(pattern, str) or flags & re.IGNORECASE:
+        return ''
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return ''
+    if parsed.state.flags & re.IGNORECASE:
+        return ''
+    prefix, _ = _collect_literals(parsed)
+    return prefix
+
+
+def _collect_literals(parsed):
+    ''' Collects the leading literal characters of a parsed (sub)pattern
+
+    Args:
+        parsed (sre_parse.SubPattern): Parsed regular expression
+
+    Returns:
+        str: Leading literal characters
+        bool: True if the (sub)pattern consists of literal characters only, False otherwise
+    '''
+    prefix = ''
+    for opcode, argument in parsed:
+        if opcode == sre_parse.AT and argument in (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING) \
+                and not prefix:
+            continue
+        if opcode == sre_parse.LITERAL:
+            prefix += chr(argument)
+            continue
+        if opcode == sre_parse.SUBPATTERN and not argument[1] and not argument[2]:
+            nested_prefix, is_complete = _collect_literals(argument[-1])
+            prefix += nested_prefix
+            if is_complete:
+                continue
+        return prefix, False
+    return prefix, True
+
+
+def _strongly_connected_components(successors):
+    ''' Finds the strongly connected components of a directed graph with an iterative version of Tarjan's algorithm
+
+    Args:
+        successors (dict): Mapping of each node to the list of nodes it has an edge to
+
+    Returns:
+        list: Lists of nodes of the strongly connected components that consist of more than one node
+    '''
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in successors:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, successors_iter = work[-1]
+            for successor in successors_iter:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(successors.get(successor, ()))))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        components.append(component)
+    return components
+
+
+def _shortest_cycle(node, successors, component):
+    ''' Finds the shortest cycle through a node with a breadth-first search within its strongly connected component
+
+    Args:
+        node (str): Node to start from
+        successors (dict): Mapping of each node to the list of nodes it has an edge to
+        component (set): Nodes of the strongly connected component of the given node
+
+    Returns:
+        list: Nodes of the cycle, starting and ending with the given node
+    '''
+    parents = {node: None}
+    queue = [node]
+    for current in queue:
+        for successor in successors.get(current, ()):
+            if successor == node:
+                path = [node]
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+            if successor in component and successor not in parents:
+                parents[successor] = current
+                queue.append(successor)
+    return []
+
+
+# collection that a worker process of the parallel self test operates on
+_worker_state = {}
+
+
+def _init_self_test_worker(snapshot):
+    ''' Initializes a worker process of the parallel self test
+
+    Args:
+        snapshot (tuple): Snapshot of the collection, see ``TraceableCollection.snapshot``
+    '''
+    _worker_state['collection'] = TraceableCollection.from_snapshot(snapshot)
+
+
+def _self_test_shard(item_ids):
+    ''' Performs the item-level and relation-level checks of the self test on a shard of items in a worker process
+
+    Args:
+        item_ids (list): IDs of the items to check
+
+    Returns:
+        list: List of TraceabilityException objects per item ID
+    '''
+    collection = _worker_state['collection']
+    return [collection._self_test_item(itemid, collection.items[itemid]) for itemid in item_ids]
 
 
 class TraceableCollection:
@@ -18,14 +202,128 @@ class TraceableCollection:
     '''
 
     NO_RELATION_STR = ''
+    # minimal number of items to check per worker process of the parallel self test
+    SELF_TEST_MIN_SHARD_SIZE = 500
+    # version of the format of the snapshot files, see save_snapshot
+    SNAPSHOT_FORMAT = 1
 
     def __init__(self):
         '''Initializer for container of traceable items'''
         self.relations = {}
         self.items = {}
         self.relations_sorted = {}
-        self._intermediate_nodes = []
+        self._intermediate_nodes = {}  # document name -> intermediate nodes in order of appearance
         self.attributes_sort = {}
+        self.generation = 0
+        # delta since the last update of the implicit relations: target ID -> IDs of sources to reconsider
+        self._dirty_relations = {}
+        # ID of removed item -> IDs of the sources it had implicit relations with, restored when it gets re-added
+        self._pending_sources = {}
+        self._implicit_relations_valid = False
+        self._known_item_count = 0  # number of items, as known through add_item and remove_item
+        # IDs of the items that have been added, removed or modified since the last self test
+        self._changed_ids = set()
+        self._self_test_cache = None
+        self._self_test_key = None
+        self._effect_ids = set()  # IDs of the items that have been modified by the intermediate nodes
+        self._loaded_snapshot = None
+        # copy with the effects of the intermediate nodes applied and the warnings they reported, to reuse in this build
+        self.processed_copy = None
+        self._init_indexes()
+
+    def bump_generation(self):
+        ''' Marks the content of the collection as modified, which invalidates all cached query results '''
+        self.generation += 1
+
+    def item_changed(self, item, attributes_changed=False, location_changed=False, explicit_target=None):
+        ''' Handles the notification of an item of this collection that it has been modified
+
+        Args:
+            item (TraceableItem): Item of this collection that has been modified
+            attributes_changed (bool): True if the attributes of the item have been modified
+            location_changed (bool): True if the document name of the item has been modified
+            explicit_target (str): Identification of the target of an explicit relation that has been added or
+                removed, if any
+        '''
+        if attributes_changed:
+            self.reindex_attributes(item)
+        if location_changed:
+            self.reindex_location(item)
+        if explicit_target is not None:
+            self.mark_relation_changed(item.identifier, explicit_target)
+        self._changed_ids.add(item.identifier)
+        self.bump_generation()
+
+    def query_cache_info(self):
+        ''' Reports the effectiveness of the cache for results of ``get_items``
+
+        Returns:
+            CacheInfo: Named tuple with the number of cache hits, cache misses and the current number of cached results
+        '''
+        return CacheInfo(self._query_cache_hits, self._query_cache_misses, len(self._query_cache))
+
+    def _init_indexes(self):
+        ''' Initializes the derived lookup structures, which get (re)built from ``items`` on first use '''
+        self._insertion_order = {}
+        self._insertion_counter = count()
+        self._natsort_keys = {}
+        self._sorted_ids = []
+        self._natsorted_ids = []
+        self._pending_ids = []
+        self._removed_ids = set()
+        self._query_cache = {}
+        self._query_cache_generation = None
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+        self._attribute_index = None
+        self._indexed_attributes = {}
+        self._adjacency_matrix = None
+        self._path_indexes = {}
+        self._path_indexes_generation = None
+        self._docname_index = None
+        self._indexed_docnames = {}
+        # per merged collection: first document name, item IDs in order
+        self._merged_reads = []
+
+    def __getstate__(self):
+        ''' Excludes derived lookup structures from pickling; they are rebuilt on first use '''
+        state = self.__dict__.copy()
+        for key in ('_insertion_order', '_insertion_counter', '_natsort_keys', '_sorted_ids', '_natsorted_ids',
+                    '_pending_ids', '_removed_ids', '_query_cache', '_query_cache_generation', '_query_cache_hits',
+                    '_query_cache_misses', '_attribute_index', '_indexed_attributes', '_adjacency_matrix',
+                    '_path_indexes', '_path_indexes_generation', '_docname_index', '_indexed_docnames',
+                    '_merged_reads', '_loaded_snapshot', '_changed_ids', '_self_test_cache', '_self_test_key',
+                    '_effect_ids', 'processed_copy'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        ''' Restores a pickled collection, which tracks the items that get modified from then on for the self test '''
+        self.__dict__.update(state)
+        self._loaded_snapshot = None
+        self._changed_ids = set()
+        self._self_test_cache = None
+        self._self_test_key = None
+        self._effect_ids = set()
+        self.processed_copy = None
+        self._init_indexes()
+
+    def copy(self):
+        ''' Gets a deep copy of the collection, e.g. to apply the effects of the intermediate nodes to
+
+        Returns:
+            TraceableCollection: Copy of the collection, which shares the snapshot loaded with ``load_snapshot`` and
+            keeps track of the same modifications for the self test
+        '''
+        duplicate = pickle.loads(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+        # pylint: disable=protected-access
+        duplicate._loaded_snapshot = self._loaded_snapshot
+        duplicate._changed_ids = set(self._changed_ids)
+        if self._self_test_cache is not None:
+            duplicate._self_test_cache = dict(self._self_test_cache)
+        duplicate._self_test_key = self._self_test_key
+        duplicate._effect_ids = set(self._effect_ids)
+        return duplicate
 
     def add_relation_pair(self, forward, reverse=NO_RELATION_STR):
         '''
@@ -35,6 +333,9 @@ class TraceableCollection:
             forward (str): Keyword for the forward relation
             reverse (str): Keyword for the reverse relation, or NO_RELATION_STR for external relations
         '''
+        if self.relations.get(forward) != reverse or (reverse != self.NO_RELATION_STR and
+                                                      self.relations.get(reverse) != forward):
+            self._implicit_relations_valid = False
         # Link forward to reverse relation
         self.relations[forward] = reverse
         # Link reverse to forward relation
@@ -80,8 +381,268 @@ class TraceableCollection:
                 raise TraceabilityException('duplicating {itemid}'.format(itemid=item.identifier), item.docname)
             # ... otherwise, update the item with new content
             item.update(olditem)
+            olditem._collection = None  # pylint: disable=protected-access
+        else:
+            self._index_item_id(item.identifier)
+            self._known_item_count += 1
         # add it
         self.items[item.identifier] = item
+        item._collection = self  # pylint: disable=protected-access
+        self.reindex_attributes(item)
+        self.reindex_location(item)
+        for target_id in item.yield_targets(*item.explicit_relations, implicit=False):
+            self.mark_relation_changed(item.identifier, target_id)
+        pending_sources = self._pending_sources.pop(item.identifier, None)
+        if pending_sources:
+            self._dirty_relations.setdefault(item.identifier, set()).update(pending_sources)
+        self._changed_ids.add(item.identifier)
+        self.bump_generation()
+
+    def remove_item(self, itemid):
+        '''
+        Remove a TraceableItem from the list
+
+        Note: this does NOT remove relations pointing to this item from other items.
+
+        Args:
+            itemid (str): Identification of traceable item to remove
+        Returns:
+            TraceableItem/None: Removed traceable item; None if the item was not found
+        '''
+        item = self.items.pop(itemid, None)
+        if item is not None:
+            self._known_item_count -= 1
+            self._unindex_item_id(itemid)
+            item._collection = None  # pylint: disable=protected-access
+            self._unindex_attributes(itemid)
+            self._unindex_location(itemid)
+            for target_id in item.yield_targets(*item.explicit_relations, implicit=False):
+                self.mark_relation_changed(itemid, target_id)
+            sources = set(item.yield_targets(*item.implicit_relations, explicit=False))
+            if sources:
+                self._pending_sources.setdefault(itemid, set()).update(sources)
+            # the items it relates to can no longer find it as neighbour
+            self._changed_ids.add(itemid)
+            self._changed_ids.update(item.yield_targets(*item.iter_relations(sort=False)))
+            self.bump_generation()
+        return item
+
+    def mark_relation_changed(self, source_id, target_id):
+        ''' Registers that an explicit relation from the source to the target item has been added or removed
+
+        The implicit relations of the target item get updated by the next call to ``update_implicit_relations``, and
+        so do the ones of the source item, as an implicit relation is omitted when it exists explicitly.
+
+        Args:
+            source_id (str): Identification of the source item
+            target_id (str): Identification of the target item
+        '''
+        self._dirty_relations.setdefault(target_id, set()).add(source_id)
+        self._dirty_relations.setdefault(source_id, set()).add(target_id)
+
+    def _index_item_id(self, itemid):
+        ''' Registers a new item ID in the sorted ID indexes
+
+        The ID gets merged into the sorted sequences on the next lookup, which keeps adding items cheap.
+
+        Args:
+            itemid (str): Identification of the item that is new to the collection
+        '''
+        self._insertion_order[itemid] = next(self._insertion_counter)
+        self._natsort_keys[itemid] = natural_sort_key(itemid)
+        self._pending_ids.append(itemid)
+
+    def _unindex_item_id(self, itemid):
+        ''' Unregisters an item ID from the sorted ID indexes
+
+        Args:
+            itemid (str): Identification of the item that has been removed from the collection
+        '''
+        self._insertion_order.pop(itemid, None)
+        self._natsort_keys.pop(itemid, None)
+        self._removed_ids.add(itemid)
+
+    def _sync_indexes(self):
+        ''' Merges pending additions and removals into the sorted ID sequences
+
+        Sorting a sorted sequence extended with a few new IDs takes linear time. The indexes are rebuilt from scratch
+        when ``items`` has been modified without using the API of this class.
+        '''
+        if len(self._natsort_keys) != len(self.items):
+            self._insertion_order = {itemid: next(self._insertion_counter) for itemid in self.items}
+            self._natsort_keys = {itemid: natural_sort_key(itemid) for itemid in self.items}
+            self._sorted_ids = []
+            self._natsorted_ids = []
+            self._pending_ids = list(self.items)
+            self._removed_ids = set()
+        if self._removed_ids:
+            removed = self._removed_ids
+            self._sorted_ids = [itemid for itemid in self._sorted_ids if itemid not in removed]
+            self._natsorted_ids = [itemid for itemid in self._natsorted_ids if itemid not in removed]
+            self._pending_ids = [itemid for itemid in self._pending_ids if itemid in self._natsort_keys]
+            self._removed_ids = set()
+        if self._pending_ids:
+            self._sorted_ids.extend(self._pending_ids)
+            self._sorted_ids.sort()
+            # stable sort: equal keys keep the order in which the items have been added, like natsorted does
+            self._natsorted_ids.extend(self._pending_ids)
+            self._natsorted_ids.sort(key=self._natsort_keys.__getitem__)
+            self._pending_ids = []
+
+    def reindex_attributes(self, item):
+        ''' Brings the attribute index up to date with the attributes of the given item
+
+        Args:
+            item (TraceableItem): Item of this collection of which the attributes may have changed
+        '''
+        if self._attribute_index is None:
+            return  # index gets built on first use
+        self._unindex_attributes(item.identifier)
+        for attr, value in item.attributes.items():
+            self._attribute_index.setdefault(attr, {}).setdefault(value, set()).add(item.identifier)
+        self._indexed_attributes[item.identifier] = dict(item.attributes)
+
+    def _unindex_attributes(self, itemid):
+        ''' Removes the attributes of the item with the given ID from the attribute index
+
+        Args:
+            itemid (str): Identification of the item
+        '''
+        if self._attribute_index is None:
+            return
+        for attr, value in self._indexed_attributes.pop(itemid, {}).items():
+            item_ids = self._attribute_index[attr][value]
+            item_ids.discard(itemid)
+            if not item_ids:
+                del self._attribute_index[attr][value]
+
+    def _get_attribute_index(self):
+        ''' Gets the index that maps each attribute to its values and each value to the IDs of the items that have it
+
+        The index is rebuilt from scratch when ``items`` has been modified without using the API of this class.
+
+        Returns:
+            dict: Dictionary mapping attribute names to dictionaries that map attribute values to sets of item IDs
+        '''
+        if self._attribute_index is None or len(self._indexed_attributes) != len(self.items):
+            self._attribute_index = {}
+            self._indexed_attributes = {}
+            for item in self.items.values():
+                self.reindex_attributes(item)
+        return self._attribute_index
+
+    def reindex_location(self, item):
+        ''' Brings the index of items per document up to date with the document name of the given item
+
+        Args:
+            item (TraceableItem): Item of this collection of which the document name may have changed
+        '''
+        if self._docname_index is None:
+            return  # index gets built on first use
+        self._unindex_location(item.identifier)
+        self._docname_index.setdefault(item.docname, set()).add(item.identifier)
+        self._indexed_docnames[item.identifier] = item.docname
+
+    def _unindex_location(self, itemid):
+        ''' Removes the item with the given ID from the index of items per document
+
+        Args:
+            itemid (str): Identification of the item
+        '''
+        if self._docname_index is None or itemid not in self._indexed_docnames:
+            return
+        docname = self._indexed_docnames.pop(itemid)
+        item_ids = self._docname_index[docname]
+        item_ids.discard(itemid)
+        if not item_ids:
+            del self._docname_index[docname]
+
+    def _get_docname_index(self):
+        ''' Gets the index that maps each document name to the IDs of the items that are defined in it
+
+        The index is rebuilt from scratch when ``items`` has been modified without using the API of this class.
+
+        Returns:
+            dict: Dictionary mapping document names to sets of item IDs
+        '''
+        if self._docname_index is None or len(self._indexed_docnames) != len(self.items):
+            self._docname_index = {}
+            self._indexed_docnames = {}
+            for item in self.items.values():
+                self.reindex_location(item)
+        return self._docname_index
+
+    def _get_ids_matching_attributes(self, attributes):
+        ''' Gets the IDs of all items that match a given set of attributes
+
+        Each regex is evaluated once per distinct attribute value instead of once per item.
+
+        Args:
+            attributes (dict): Dictionary with attribute-regex pairs to match the items in this collection against
+
+        Returns:
+            set: IDs of the items that match all attribute-regex pairs, like ``TraceableItem.attributes_match`` does
+        '''
+        index = self._get_attribute_index()
+        matching_ids = None
+        for attr, regex in attributes.items():
+            ids_for_attr = set()
+            for value, item_ids in index.get(attr, {}).items():
+                if regex == '' or _value_matches(regex, value):
+                    ids_for_attr.update(item_ids)
+            matching_ids = ids_for_attr if matching_ids is None else matching_ids & ids_for_attr
+            if not matching_ids:
+                break
+        return matching_ids
+
+    def _get_sorted_ids(self):
+        ''' Gets the lexicographically sorted list of item IDs
+
+        Returns:
+            list: Sorted item IDs
+        '''
+        self._sync_indexes()
+        return self._sorted_ids
+
+    def _get_natsorted_ids(self):
+        ''' Gets the naturally sorted list of item IDs
+
+        Returns:
+            list: Naturally sorted item IDs
+        '''
+        self._sync_indexes()
+        return self._natsorted_ids
+
+    def _iter_candidate_ids(self, regex, natural_order=False):
+        ''' Iterates over the IDs of the items that can match the given regular expression
+
+        The literal prefix of the pattern, if any, is used to bisect the sorted ID index to the candidate range.
+
+        Args:
+            regex (str/re.Pattern): Regex pattern or object to match the items in this collection against
+            natural_order (bool): True to yield the IDs naturally sorted, False to yield them in the order in which
+                the items have been added to the collection
+
+        Returns:
+            iterable: Candidate item IDs; all item IDs when the pattern has no anchorable prefix
+        '''
+        if isinstance(regex, str):
+            prefix = _literal_prefix(regex, 0)
+        else:
+            prefix = _literal_prefix(getattr(regex, 'pattern', None), getattr(regex, 'flags', 0))
+        if not prefix:
+            return self._get_natsorted_ids() if natural_order else self.items
+        sorted_ids = self._get_sorted_ids()
+        candidates = []
+        for idx in range(bisect_left(sorted_ids, prefix), len(sorted_ids)):
+            itemid = sorted_ids[idx]
+            if not itemid.startswith(prefix):
+                break
+            candidates.append(itemid)
+        candidates.sort(key=self._insertion_order.__getitem__)
+        if natural_order:
+            candidates.sort(key=self._natsort_keys.__getitem__)
+        return candidates
 
     def get_item(self, itemid):
         '''
@@ -101,7 +662,7 @@ class TraceableCollection:
         Returns:
             Sorted iterator over identification of the items in the collection
         '''
-        return natsorted(self.items)
+        return list(self._get_natsorted_ids())
 
     def has_item(self, itemid):
         '''
@@ -118,20 +679,95 @@ class TraceableCollection:
         '''Remove all items that originate from the given document.
 
         Note: this does NOT remove relations pointing to these items from other items.
-        Implicit reverse relations are rebuilt by ``rebuild_implicit_relations`` later
+        Implicit reverse relations are updated by ``update_implicit_relations`` later
         in the build process (incremental builds). Stale explicit relations pointing to
         permanently removed items are reported as errors by ``self_test``.
 
         Args:
             docname (str): Document name (without extension) to purge items for
         '''
-        to_remove = [identifier for identifier, item in self.items.items()
-                     if getattr(item, 'docname', None) == docname]
-        if not to_remove:
+        for identifier in list(self._get_docname_index().get(docname, ())):
+            self.remove_item(identifier)
+
+    def merge(self, other, docnames):
+        '''
+        Merge the items and intermediate nodes that another collection holds for the given documents
+
+        This gathers the results of documents that have been read in parallel processes. When both collections define
+        an item with the same ID, the definition that a serial read would encounter first, i.e. the one in the document
+        that sorts first or on the lowest line of the same document, is kept. Call ``apply_read_order`` once all
+        collections have been merged.
+
+        Args:
+            other (TraceableCollection): Collection of a process that has read the given documents
+            docnames (iterable): Names of the documents that the other process has read
+
+        Returns:
+            list: Tuples of a TraceabilityException for every duplicate definition and the duplicate item
+        '''
+        docnames = set(docnames)
+        duplicates = []
+        merged_items = [item for item in other.items.values() if item.docname in docnames and not item.is_placeholder]
+        for item in sorted(merged_items, key=lambda item: (item.docname, item.lineno or 0)):
+            existing = self.items.get(item.identifier)
+            if existing is not None and not existing.is_placeholder and \
+                    (item.docname, item.lineno or 0) < (existing.docname, existing.lineno or 0):
+                # a serial read would have encountered this definition first
+                self.remove_item(existing.identifier)
+                self._merge_item(item)
+                item = existing
+            try:
+                self._merge_item(item)
+            except TraceabilityException as err:
+                duplicates.append((err, item))
+        for docname in docnames:
+            nodes = other._intermediate_nodes.get(docname)  # pylint: disable=protected-access
+            if nodes:
+                self._intermediate_nodes[docname] = nodes
+        self._merged_reads.append((min(docnames), list(other.items)))
+        # like a serial read, keep the automatic reverse relations up to date for the intermediate nodes
+        self.update_implicit_relations()
+        return duplicates
+
+    def apply_read_order(self):
+        '''
+        Order the items of merged collections as if all documents had been read serially
+
+        The documents are read in sorted order, and every process reads a contiguous range of them. Ordering the merged
+        collections by their first document thus restores the order in which a serial read adds items, which is the
+        order that queries without sorting return.
+        '''
+        if not self._merged_reads:
             return
-        # Remove the items themselves
-        for identifier in to_remove:
-            del self.items[identifier]
+        merged_reads, self._merged_reads = sorted(self._merged_reads, key=itemgetter(0)), []
+        items = {}
+        for _, item_ids in merged_reads:
+            for itemid in item_ids:
+                if itemid in self.items and itemid not in items:
+                    items[itemid] = self.items[itemid]
+        for itemid, item in self.items.items():
+            items.setdefault(itemid, item)
+        self.items = items
+        self._init_indexes()
+        self.bump_generation()
+
+    def _merge_item(self, item):
+        '''
+        Add an item of another collection, with placeholders for the targets of its explicit relations
+
+        Args:
+            item (TraceableItem): Item to add
+
+        Raises:
+            TraceabilityException: An item with the same ID is defined already
+        '''
+        self.add_item(item)
+        for relation in item.explicit_relations:
+            if not self.get_reverse_relation(relation):
+                continue
+            for target_id in item.explicit_relations[relation]:
+                if target_id not in self.items:
+                    self.add_item(TraceableItem(target_id, True))
 
     def add_relation(self, source_id, relation, target_id):
         '''
@@ -189,33 +825,106 @@ class TraceableCollection:
 
     def add_intermediate_node(self, node):
         """ Adds an intermediate node """
-        self._intermediate_nodes.append(node)
+        self._intermediate_nodes.setdefault(node['document'], []).append(node)
+
+    def remove_intermediate_nodes(self, docname):
+        """ Removes the intermediate nodes of the given document
+
+        Args:
+            docname (str): Name of the document
+        """
+        self._intermediate_nodes.pop(docname, None)
+
+    def iter_intermediate_nodes(self):
+        """ Iterates over the intermediate nodes in the order of a serial read, i.e. sorted by document name
+
+        Returns:
+            generator: Intermediate nodes
+        """
+        for docname in sorted(self._intermediate_nodes):
+            yield from self._intermediate_nodes[docname]
 
     def process_intermediate_nodes(self):
-        """ Processes all intermediate nodes in order by calling its ``apply_effect`` """
-        for node in sorted(self._intermediate_nodes, key=attrgetter('order')):
+        """ Processes all intermediate nodes in order by calling its ``apply_effect`` and updates the implicit relations
+        accordingly
+
+        The IDs of the items that get modified are remembered, see ``get_self_test_results``.
+        """
+        changed_ids, self._changed_ids = self._changed_ids, set()
+        for node in sorted(self.iter_intermediate_nodes(), key=attrgetter('order')):
             node.apply_effect(self)
+        self.update_implicit_relations()
+        self._effect_ids = self._changed_ids
+        self._changed_ids = changed_ids | self._effect_ids
+
+    def update_implicit_relations(self):
+        """Update the implicit (reverse) relations with the explicit ones added or removed since the last update.
+
+        Only the items that are the target of such a changed relation get their implicit relations recomputed.
+        All implicit relations are rebuilt instead when no earlier update is known, when the relation pairs have
+        changed or when ``items`` has been modified without using the API of this class.
+        """
+        if not self._implicit_relations_valid or self._known_item_count != len(self.items):
+            self.rebuild_implicit_relations()
+            return
+        if not self._dirty_relations:
+            return
+        self._sync_indexes()
+        position = self._insertion_order.__getitem__
+        for target_id, sources in self._dirty_relations.items():
+            target = self.items.get(target_id)
+            if target is None:
+                self._pending_sources.setdefault(target_id, set()).update(sources)
+                continue
+            sources.update(target.yield_targets(*target.implicit_relations, explicit=False))
+            target.implicit_relations = {}
+            self._changed_ids.add(target_id)
+            # sources in the order of the collection, like rebuild_implicit_relations adds them
+            for source_id in sorted((source_id for source_id in sources if source_id in self.items), key=position):
+                for relation, targets in self.items[source_id].explicit_relations.items():
+                    if target_id in targets:
+                        self._add_implicit_relation(target, relation, source_id)
+        self._dirty_relations = {}
+        self.bump_generation()
 
     def rebuild_implicit_relations(self):
         """Rebuild all implicit (reverse) relations from explicit ones.
 
-        This is needed on incremental builds when some documents are re-read and others come from cache,
-        so implicit reverse links on re-read items are restored based on the existing explicit links.
+        This is the fallback of ``update_implicit_relations``, needed on incremental builds when some documents are
+        re-read and others come from cache, so implicit reverse links on re-read items are restored based on the
+        existing explicit links.
         """
         # Clear all current implicit relations
         for item in self.items.values():
             item.implicit_relations = {}
+        self.bump_generation()
 
         # Recreate implicit relations from explicit relations
         for source_id, source in self.items.items():
             for relation, targets in source.explicit_relations.items():
-                reverse_relation = self.get_reverse_relation(relation)
-                if not reverse_relation:
-                    continue
                 for target_item in (self.items.get(target_id) for target_id in targets):
                     if not target_item:
                         continue
-                    target_item.add_target(reverse_relation, source_id, implicit=True)
+                    self._add_implicit_relation(target_item, relation, source_id)
+        self._dirty_relations = {}
+        self._pending_sources = {}
+        self._implicit_relations_valid = True
+        self._known_item_count = len(self.items)
+        self._self_test_cache = None
+        self._changed_ids.update(self.items)
+
+    def _add_implicit_relation(self, target_item, relation, source_id):
+        """Adds the reverse of the given explicit relation to the target item, unless it is explicit there already
+
+        Args:
+            target_item (TraceableItem): Target of the explicit relation
+            relation (str): Explicit relation from the source to the target item
+            source_id (str): Identification of the source item
+        """
+        reverse_relation = self.get_reverse_relation(relation)
+        if not reverse_relation or source_id in target_item.explicit_relations.get(reverse_relation, ()):
+            return
+        target_item.add_target(reverse_relation, source_id, implicit=True)
 
     def export(self, fname):
         '''
@@ -234,20 +943,28 @@ class TraceableCollection:
                     data.append(entry)
             json.dump(data, outfile, indent=4, sort_keys=True)
 
-    def self_test(self, notification_item_id, docname=None):
+    def self_test(self, notification_item_id, docname=None, workers=1):
         '''
         Perform self test on collection content
 
+        The errors of items that are unchanged since the previous self test, and that have no changed neighbours, are
+        reused from that self test instead of being recomputed. Circular relationships are detected over the whole
+        collection every time.
+
         Args:
             notification_item_id (str/None): ID of the configured notification item, None if not configured.
             docname (str): Document on which to run the self test, None for all.
+            workers (int): Maximum number of worker processes to check the items with; the items are checked in the
+                current process if this is lower than 2 or if there are too few items to check.
         '''
         errors = []
         notification_item = self.get_item(notification_item_id)
         # Having no valid relations, is invalid
         if not self.relations:
             raise TraceabilityException('No relations configured', 'configuration')
-        # Validate each item
+        cache = self._get_self_test_cache()
+        cycles = self._find_cycles()
+        selected_items = []
         for itemid, item in self.items.items():
             # Only for relevant items, filtered on document name
             if docname is not None and item.docname != docname and item.docname is not None:
@@ -255,43 +972,373 @@ class TraceableCollection:
             # Check if docname of notification item will be used
             if item.docname is None and notification_item:
                 continue
-            # On item level
-            try:
-                item.self_test()
-            except TraceabilityException as err:
-                errors.append(err)
-            # targetted items shall exist, with automatic reverse relation
+            selected_items.append((itemid, item))
+        untested_ids = [itemid for itemid, _ in selected_items if itemid not in cache]
+        workers = min(workers, len(untested_ids) // self.SELF_TEST_MIN_SHARD_SIZE)
+        if workers > 1:
+            cache.update(self._self_test_in_parallel(untested_ids, workers))
+        # Validate each item
+        for itemid, item in selected_items:
+            if itemid not in cache:
+                cache[itemid] = self._self_test_item(itemid, item)
+            errors.extend(cache[itemid])
+            # Circular relation exists?
             for relation in self.relations:
-                # Exception: no reverse relation (external links)
-                rev_relation = self.get_reverse_relation(relation)
-                if rev_relation == self.NO_RELATION_STR:
+                if (itemid, relation) in cycles:
+                    cycle = ' {} '.format(relation).join(cycles[itemid, relation])
+                    errors.append(TraceabilityException("Circular relationship found: {}".format(cycle),
+                                                        item.docname))
+        if errors:
+            raise MultipleTraceabilityExceptions(errors)
+
+    def _self_test_in_parallel(self, item_ids, workers):
+        '''
+        Perform the item-level and relation-level checks of the self test in worker processes
+
+        Every worker process gets a snapshot of the collection and checks a shard of the given items.
+
+        Args:
+            item_ids (list): IDs of the items to check
+            workers (int): Number of worker processes
+
+        Returns:
+            dict: Mapping of item IDs to their list of TraceabilityException objects
+        '''
+        shards = [item_ids[index::workers] for index in range(workers)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_self_test_worker,
+                                 initargs=(self.snapshot(),)) as executor:
+            for shard, shard_errors in zip(shards, executor.map(_self_test_shard, shards)):
+                results.update(zip(shard, shard_errors))
+        return results
+
+    def snapshot(self):
+        '''
+        Get a compact, picklable copy of the data that the self test relies on
+
+        The snapshot holds no docutils nodes or directives, only plain data.
+
+        Returns:
+            tuple: Relationship pairs, regex per defined attribute and, per item, a tuple of its ID, document name,
+            placeholder flag, attributes, attribute order, explicit relations and implicit relations
+        '''
+        defined_attributes = {attr_id: attr.value for attr_id, attr in TraceableItem.defined_attributes.items()}
+        items = [(itemid, item.docname, item.is_placeholder, item.attributes, item.attribute_order,
+                  item.explicit_relations, item.implicit_relations) for itemid, item in self.items.items()]
+        return self.relations, defined_attributes, items
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        '''
+        Create a collection from a snapshot
+
+        Attributes of the snapshot that are not defined in the current process get defined.
+
+        Args:
+            snapshot (tuple): Snapshot, see ``snapshot``
+
+        Returns:
+            TraceableCollection: New collection with items that hold the data of the snapshot
+        '''
+        relations, defined_attributes, items = snapshot
+        for attr_id, regex in defined_attributes.items():
+            if attr_id not in TraceableItem.defined_attributes:
+                TraceableItem.define_attribute(TraceableAttribute(attr_id, regex))
+        collection = cls()
+        collection.relations = dict(relations)
+        for itemid, docname, is_placeholder, attributes, attribute_order, explicit, implicit in items:
+            item = TraceableItem(itemid, placeholder=is_placeholder)
+            item.docname = docname
+            item.attributes = attributes
+            item.attribute_order = attribute_order
+            item.explicit_relations = explicit
+            item.implicit_relations = implicit
+            collection.items[itemid] = item
+        return collection
+
+    def get_digest(self):
+        '''
+        Get a digest of the collection as it has been read: its relationship pairs, its items and its intermediate
+        nodes. The digest is stable across Python processes.
+
+        Returns:
+            str: Hexadecimal digest
+        '''
+        digest = hashlib.sha1()
+        defined_attributes = {attr_id: attr.value for attr_id, attr in TraceableItem.defined_attributes.items()}
+        digest.update(json.dumps([self.relations, defined_attributes], sort_keys=True).encode('utf-8'))
+        for itemid, item in self.items.items():
+            digest.update(json.dumps([itemid, item.lineno, item.get_digests()]).encode('utf-8'))
+        for node in self.iter_intermediate_nodes():
+            digest.update(json.dumps([type(node).__name__, node.attributes], sort_keys=True,
+                                     default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def save_snapshot(self, fname, digest, warnings=()):
+        '''
+        Save a standalone snapshot of the items to a JSON file, to be reused by a later build, see
+        ``load_snapshot``. The target location gets created if it doesn't exist yet.
+
+        The snapshot holds per item its ID, location, caption, attributes, relations and content hash, but no docutils
+        nodes.
+
+        Args:
+            fname (str): Path to the JSON file to write
+            digest (str): Digest of the collection from which the current state has been derived, see ``get_digest``
+            warnings (iterable): Tuples of message, document name, line number and item ID of the warnings that have
+                been reported while deriving the current state
+        '''
+        items = []
+        for itemid, item in self.items.items():
+            entry = item.to_dict() if not item.is_placeholder else {'id': itemid}
+            entry['placeholder'] = item.is_placeholder
+            entry['attributes'] = item.attributes
+            entry['attribute-order'] = item.attribute_order
+            entry['explicit'] = {relation: list(targets) for relation, targets in item.explicit_relations.items()}
+            entry['implicit'] = {relation: list(targets) for relation, targets in item.implicit_relations.items()}
+            entry.pop('targets', None)
+            items.append(entry)
+        data = {
+            'format': self.SNAPSHOT_FORMAT,
+            'digest': digest,
+            'warnings': list(warnings),
+            'items': items,
+        }
+        Path(fname).parent.mkdir(parents=True, exist_ok=True)
+        with open(fname, 'w') as outfile:
+            json.dump(data, outfile, separators=(',', ':'))
+
+    def load_snapshot(self, fname):
+        '''
+        Load a snapshot that has been saved with ``save_snapshot``, to be applied with ``apply_loaded_snapshot``
+
+        Args:
+            fname (str): Path to the JSON file to read
+
+        Returns:
+            bool: True if the snapshot has been loaded, False if the file is missing, unreadable or has another format
+        '''
+        self._loaded_snapshot = None
+        try:
+            with open(fname, 'r') as infile:
+                data = json.load(infile)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != self.SNAPSHOT_FORMAT:
+            return False
+        self._loaded_snapshot = data
+        return True
+
+    def apply_loaded_snapshot(self, digest=None):
+        '''
+        Apply the snapshot loaded with ``load_snapshot`` if it has been derived from a collection with the same
+        digest as this collection, see ``get_digest``
+
+        The attributes and relations of the items get replaced by the ones of the snapshot. Placeholders get added
+        and removed to match the snapshot.
+
+        Args:
+            digest (str): Digest of this collection, if already known
+
+        Returns:
+            list: Tuples of message, document name, line number and item ID of the warnings that have been reported
+            while deriving the snapshot, or None if the snapshot has not been applied
+        '''
+        snapshot = self._loaded_snapshot
+        if snapshot is None:
+            return None
+        if digest is None:
+            digest = self.get_digest()
+        if snapshot['digest'] != digest:
+            return None
+        items = {}
+        for entry in snapshot['items']:
+            item = self.items.get(entry['id'])
+            if item is None:
+                item = TraceableItem(entry['id'], placeholder=True)
+                item._collection = self  # pylint: disable=protected-access
+            item.attributes = entry['attributes']
+            item.attribute_order = entry['attribute-order']
+            item.explicit_relations = {relation: dict.fromkeys(targets)
+                                       for relation, targets in entry['explicit'].items()}
+            item.implicit_relations = {relation: dict.fromkeys(targets)
+                                       for relation, targets in entry['implicit'].items()}
+            items[entry['id']] = item
+        for itemid, item in self.items.items():
+            if itemid not in items:
+                item._collection = None  # pylint: disable=protected-access
+        self.items = items
+        self._init_indexes()
+        self._dirty_relations = {}
+        self._pending_sources = {}
+        self._implicit_relations_valid = True
+        self._known_item_count = len(items)
+        self._self_test_cache = None
+        self._effect_ids = set(items)  # not known per item
+        self.bump_generation()
+        return [tuple(warning) for warning in snapshot['warnings']]
+
+    def _get_self_test_cache(self):
+        '''
+        Get the errors per item ID of the previous self test, without the items that have to be tested again
+
+        The items to test again are the ones that have been added, removed or modified since the previous self test
+        and the items they relate to.
+
+        Returns:
+            dict: Mapping of item IDs to their list of TraceabilityException objects
+        '''
+        key = tuple(self.relations.items())
+        if self._self_test_cache is None or self._self_test_key != key or self._known_item_count != len(self.items):
+            self._self_test_cache = {}
+            self._self_test_key = key
+        else:
+            for itemid in self._get_neighbourhood(self._changed_ids):
+                self._self_test_cache.pop(itemid, None)
+        self._changed_ids = set()
+        return self._self_test_cache
+
+    def _get_neighbourhood(self, item_ids):
+        '''
+        Get the given item IDs together with the IDs of the items they relate to
+
+        Args:
+            item_ids (iterable): IDs of items, which don't need to exist in the collection
+
+        Returns:
+            set: The given item IDs and the targets of the relations of the existing items among them
+        '''
+        neighbourhood = set(item_ids)
+        for itemid in item_ids:
+            item = self.items.get(itemid)
+            if item is not None:
+                neighbourhood.update(item.yield_targets(*item.iter_relations(sort=False)))
+        return neighbourhood
+
+    def get_changed_ids(self):
+        '''
+        Get the IDs of the items that have been added, removed or modified since the collection has been restored or
+        since the last self test, including the ones that the intermediate nodes have modified
+
+        Returns:
+            set: IDs of the items, which don't need to exist in the collection anymore
+        '''
+        return set(self._changed_ids)
+
+    def get_effect_ids(self):
+        '''
+        Get the IDs of the items that the intermediate nodes have modified, either by ``process_intermediate_nodes`` or
+        by ``apply_loaded_snapshot``
+
+        Returns:
+            set: IDs of the items
+        '''
+        return set(self._effect_ids)
+
+    def get_self_test_results(self):
+        '''
+        Get the results of the last self test that remain valid for the collection as it has been read, to be reused by
+        the self test of a later build, see ``set_self_test_results``
+
+        The results of the items that the intermediate nodes have modified, and of the items they relate to, are left
+        out: the intermediate nodes get processed again in the later build.
+
+        Returns:
+            tuple: Relationship pairs and mapping of item IDs to their list of TraceabilityException objects; None if no
+            self test has been performed
+        '''
+        if self._self_test_cache is None:
+            return None
+        affected_ids = self._get_neighbourhood(self._effect_ids)
+        errors = {itemid: item_errors for itemid, item_errors in self._self_test_cache.items()
+                  if itemid not in affected_ids}
+        return self._self_test_key, errors
+
+    def set_self_test_results(self, results):
+        '''
+        Set the results of the self test of a previous build, see ``get_self_test_results``
+
+        This collection shall be the one as it has been read by that build, e.g. unpickled from the stored environment.
+        The next self test only checks the items that have been modified since, and the items they relate to.
+
+        Args:
+            results (tuple): Results of the self test of the previous build; None if unavailable
+        '''
+        if results is not None:
+            self._self_test_key, self._self_test_cache = results
+
+    def _self_test_item(self, itemid, item):
+        '''
+        Perform the item-level and relation-level checks of the self test on a single item
+
+        Args:
+            itemid (str): ID of the item
+            item (TraceableItem): Item to check
+
+        Returns:
+            list: TraceabilityException objects for the issues found
+        '''
+        errors = []
+        # On item level
+        try:
+            item.self_test()
+        except TraceabilityException as err:
+            errors.append(err)
+        # targetted items shall exist, with automatic reverse relation
+        for relation in self.relations:
+            # Exception: no reverse relation (external links)
+            rev_relation = self.get_reverse_relation(relation)
+            if rev_relation == self.NO_RELATION_STR:
+                continue
+            for tgt in item.yield_targets(relation):
+                # Target item exists?
+                if tgt not in self.items:
+                    errors.append(TraceabilityException("{source} {relation} {target}, but {target} is not known"
+                                                        .format(source=itemid,
+                                                                relation=relation,
+                                                                target=tgt),
+                                                        item.docname))
                     continue
-                for tgt in item.yield_targets(relation):
-                    # Target item exists?
+                # Reverse relation exists?
+                target = self.get_item(tgt)
+                if itemid not in target.yield_targets(rev_relation):
+                    errors.append(TraceabilityException("No automatic reverse relation: {source} {relation} "
+                                                        "{target}".format(source=tgt,
+                                                                          relation=rev_relation,
+                                                                          target=itemid),
+                                                        item.docname))
+        return errors
+
+    def _find_cycles(self):
+        '''
+        Find circular relationships of any length, for each relation that has a reverse relation other than itself
+
+        The graphs are built from the explicit relations only: an explicit relation from A to B is an edge from A to B
+        for the relation and an edge from B to A for its reverse relation. A relation that is its own reverse links
+        every pair of related items both ways, so it is skipped.
+
+        Returns:
+            dict: Mapping of (item ID, relation) tuples to the shortest cycle through the item via that relation, as a
+            list of item IDs that starts and ends with the item ID
+        '''
+        graphs = {}  # relation -> item ID -> IDs of its targets, as keys of a dict to keep their order
+        for itemid, item in self.items.items():
+            for relation, targets in item.explicit_relations.items():
+                reverse_relation = self.get_reverse_relation(relation)
+                if not reverse_relation or reverse_relation == relation:
+                    continue
+                for tgt in targets:
                     if tgt not in self.items:
-                        errors.append(TraceabilityException("{source} {relation} {target}, but {target} is not known"
-                                                            .format(source=itemid,
-                                                                    relation=relation,
-                                                                    target=tgt),
-                                                            item.docname))
                         continue
-                    # Reverse relation exists?
-                    target = self.get_item(tgt)
-                    if itemid not in target.yield_targets(rev_relation):
-                        errors.append(TraceabilityException("No automatic reverse relation: {source} {relation} "
-                                                            "{target}".format(source=tgt,
-                                                                              relation=rev_relation,
-                                                                              target=itemid),
-                                                            item.docname))
-                    # Circular relation exists?
-                    for target_of_target in target.yield_targets(relation):
-                        if target_of_target in item.yield_targets(rev_relation):
-                            errors.append(TraceabilityException(
-                                "Circular relationship found: {src} {rel} {tgt} {rel} {nested} {rel} {src}"
-                                .format(src=itemid, rel=relation, tgt=tgt, nested=target_of_target),
-                                item.docname))
-        if errors:
-            raise MultipleTraceabilityExceptions(errors)
+                    graphs.setdefault(relation, {}).setdefault(itemid, {})[tgt] = None
+                    graphs.setdefault(reverse_relation, {}).setdefault(tgt, {})[itemid] = None
+        cycles = {}
+        for relation, successors in graphs.items():
+            for component in _strongly_connected_components(successors):
+                members = set(component)
+                for itemid in component:
+                    cycles[itemid, relation] = _shortest_cycle(itemid, successors, members)
+        return cycles
 
     def __str__(self):
         '''
@@ -332,6 +1379,47 @@ class TraceableCollection:
             relations = self.relations
         return self.items[source_id].is_related(relations, target_id)
 
+    def get_adjacency_matrix(self):
+        '''
+        Get the bitset representation of the relations between the items, for bulk checks of ``are_related``
+
+        The matrix is reused as long as the collection and its items are not modified.
+
+        Returns:
+            AdjacencyMatrix: Adjacency matrix of the current content of the collection
+        '''
+        generation = (self.generation, len(self.items))
+        if self._adjacency_matrix is None or self._adjacency_matrix[0] != generation:
+            self._adjacency_matrix = (generation, AdjacencyMatrix(self))
+        return self._adjacency_matrix[1]
+
+    def get_path_index(self, relations, target_regex='', recursive_relation='', intermediate_regex=''):
+        '''
+        Get the index of the targets that can be reached from the items through the given relationships
+
+        The index is shared by all callers that pass the same arguments, as long as the collection and its items are
+        not modified.
+
+        Args:
+            relations (iterable): Relationships to follow from an item to its targets
+            target_regex (str/re.Pattern): Regular expression that the IDs of the targets shall match
+            recursive_relation (str): Relationship to follow from an item to its nested items; empty for none
+            intermediate_regex (str/re.Pattern): Regular expression that the IDs of the nested items shall match
+
+        Returns:
+            PathIndex: Path index of the current content of the collection
+        '''
+        generation = (self.generation, len(self.items))
+        if self._path_indexes_generation != generation:
+            self._path_indexes = {}
+            self._path_indexes_generation = generation
+        key = (tuple(relations), target_regex, recursive_relation, intermediate_regex)
+        path_index = self._path_indexes.get(key)
+        if path_index is None:
+            path_index = PathIndex(self, *key)
+            self._path_indexes[key] = path_index
+        return path_index
+
     def get_items(self, regex, attributes=None, sortattributes=None, reverse=False, sort=True):
         '''
         Get all items that match a given regular expression
@@ -350,12 +1438,7 @@ class TraceableCollection:
             list: A sorted list of item-id's matching the given regex. Sorting is done naturally when sortattributes is
             unused.
         '''
-        matches = []
-        for itemid, item in self.items.items():
-            if item.is_placeholder:
-                continue
-            if item.is_match(regex) and (not attributes or item.attributes_match(attributes)):
-                matches.append(itemid)
+        sorted_func = None
         if sortattributes:
             for attr in sortattributes:
                 if attr in self.attributes_sort:
@@ -363,10 +1446,56 @@ class TraceableCollection:
                     break
             else:
                 sorted_func = sorted
+        generation = (self.generation, len(self.items))  # the length catches direct modifications of self.items
+        if self._query_cache_generation != generation:
+            self._query_cache.clear()
+            self._query_cache_generation = generation
+        attributes_key = tuple(sorted(attributes.items(), key=itemgetter(0))) if attributes else None
+        sortattributes_key = tuple(sortattributes) if sortattributes else None
+        cache_key = (regex, attributes_key, sortattributes_key, sorted_func, reverse, sort)
+        try:
+            matches = self._query_cache[cache_key]
+        except KeyError:
+            self._query_cache_misses += 1
+            matches = self._get_items(regex, attributes, sortattributes, sorted_func, reverse, sort)
+            self._query_cache[cache_key] = matches
+        except TypeError:  # unhashable argument
+            self._query_cache_misses += 1
+            return self._get_items(regex, attributes, sortattributes, sorted_func, reverse, sort)
+        else:
+            self._query_cache_hits += 1
+        return list(matches)
+
+    def _get_items(self, regex, attributes, sortattributes, sorted_func, reverse, sort):
+        ''' Gets all items that match a given regular expression, bypassing the cache of ``get_items``
+
+        Args:
+            regex (str/re.Pattern): Regex pattern or object to match the items in this collection against
+            attributes (dict): Dictionary with attribute-regex pairs to match the items in this collection against
+            sortattributes (list): List of attributes on which to sort the items
+            sorted_func (callable): Function to sort the items on the given attributes with, None when unused
+            reverse (bool): True for reverse sorting
+            sort (bool): When sortattributes is falsy: True to enable natural sorting, False to disable sorting
+
+        Returns:
+            list: A sorted list of item-id's matching the given regex
+        '''
+        natural_order = sort and not sortattributes
+        matching_ids = self._get_ids_matching_attributes(attributes) if attributes else None
+        matches = []
+        for itemid in self._iter_candidate_ids(regex, natural_order=natural_order):
+            if matching_ids is not None and itemid not in matching_ids:
+                continue
+            item = self.items[itemid]
+            if item.is_placeholder:
+                continue
+            if item.is_match(regex):
+                matches.append(itemid)
+        if sortattributes:
             return sorted_func(matches, key=lambda itemid: self.get_item(itemid).get_attributes(sortattributes),
                                reverse=reverse)
-        if sort:
-            return natsorted(matches, reverse=reverse)
+        if natural_order and reverse:
+            return sorted(matches, key=self._natsort_keys.__getitem__, reverse=True)
         return matches
 
     def get_item_objects(self, regex, attributes=None):
@@ -381,10 +1510,14 @@ class TraceableCollection:
         Returns:
             generator: An iterable of items matching the given regex.
         '''
-        for item in self.items.values():
+        matching_ids = self._get_ids_matching_attributes(attributes) if attributes else None
+        for itemid in self._iter_candidate_ids(regex):
+            if matching_ids is not None and itemid not in matching_ids:
+                continue
+            item = self.items[itemid]
             if item.is_placeholder:
                 continue
-            if item.is_match(regex) and (not attributes or item.attributes_match(attributes)):
+            if item.is_match(regex):
                 yield item
 
     def get_external_targets(self, regex, relation):
@@ -2,19 +2,28 @@
 Storage classes for traceable item
 '''
 
+import hashlib
+import json
 import re
+from functools import lru_cache
 
-from natsort import natsorted
+from natsort import natsort_keygen
 
 from .traceability_exception import TraceabilityException
 from .traceable_base_class import TraceableBaseClass
 
+# Natural sort key per item ID; cached as the same IDs get sorted over and over again while building
+natural_sort_key = lru_cache(maxsize=1 << 16)(natsort_keygen())
+
 
 class TraceableItem(TraceableBaseClass):
     '''
     Storage for a traceable documentation item
     '''
 
+    __slots__ = ('explicit_relations', 'implicit_relations', 'attributes', 'attribute_order', '_is_placeholder',
+                 '_collection')
+
     STRING_TEMPLATE = 'Item {identification}\n'
 
     defined_attributes = {}
@@ -27,11 +36,13 @@ class TraceableItem(TraceableBaseClass):
             placeholder (bool): Internal use only.
         '''
         super().__init__(item_id, **kwargs)
+        # relation name -> dict of target IDs, used as insertion-ordered set (values are unused)
         self.explicit_relations = {}
         self.implicit_relations = {}
         self.attributes = {}
         self.attribute_order = []
         self._is_placeholder = placeholder
+        self._collection = None
 
     def update(self, other):
         ''' Updates item with other object. Stores the sum of both objects.
@@ -47,6 +58,23 @@ class TraceableItem(TraceableBaseClass):
             self.add_attribute(attr, other.attributes[attr], False)
         if not other.is_placeholder:
             self._is_placeholder = False
+        self._notify_collection()
+
+    def _notify_collection(self, attributes_changed=False, explicit_target=None):
+        ''' Notifies the collection that holds this item, if any, that the item has been modified.
+
+        Args:
+            attributes_changed (bool): True if the attributes of the item have been modified
+            explicit_target (str): Identification of the target of an explicit relation that has been added or
+                removed, if any
+        '''
+        if self._collection is not None:
+            self._collection.item_changed(self, attributes_changed=attributes_changed, explicit_target=explicit_target)
+
+    def _docname_changed(self, previous_docname):
+        ''' Lets the collection that holds this item, if any, update its index of items per document '''
+        if self._collection is not None:
+            self._collection.item_changed(self, location_changed=True)
 
     @property
     def is_placeholder(self):
@@ -56,14 +84,14 @@ class TraceableItem(TraceableBaseClass):
     @property
     def all_relations(self):
         ''' generator: Yields a relationship and the corresponding targets, both naturally sorted. '''
-        for relation in natsorted({**self.explicit_relations, **self.implicit_relations}):
+        for relation in sorted({**self.explicit_relations, **self.implicit_relations}, key=natural_sort_key):
             targets = set()
             if relation in self.explicit_relations:
                 targets.update(self.explicit_relations[relation])
             if relation in self.implicit_relations:
                 targets.update(self.implicit_relations[relation])
             if targets:
-                yield relation, natsorted(targets)
+                yield relation, sorted(targets, key=natural_sort_key)
 
     @staticmethod
     def _add_relations(relations_of_self, relations_of_other):
@@ -75,8 +103,8 @@ class TraceableItem(TraceableBaseClass):
         '''
         for relation in relations_of_other:
             if relation not in relations_of_self:
-                relations_of_self[relation] = []
-            relations_of_self[relation].extend(relations_of_other[relation])
+                relations_of_self[relation] = {}
+            relations_of_self[relation].update(dict.fromkeys(relations_of_other[relation]))
 
     def is_linked(self, relationships, target_regex):
         ''' Checks if item is linked with any of the forwards relationships to a target matching the regex pattern
@@ -133,6 +161,7 @@ class TraceableItem(TraceableBaseClass):
         else:
             database = self.implicit_relations if implicit else self.explicit_relations
             self._add_target(database, relation, target)
+        self._notify_collection(explicit_target=None if implicit else target)
 
     @staticmethod
     def _add_target(database, relation, target):
@@ -144,9 +173,8 @@ class TraceableItem(TraceableBaseClass):
             target (str): Item identification of the targeted traceable item.
         '''
         if relation not in database:
-            database[relation] = []
-        if target not in database[relation]:
-            database[relation].append(target)
+            database[relation] = {}
+        database[relation][target] = None
 
     @staticmethod
     def _remove_target(database, relation, target):
@@ -158,8 +186,7 @@ class TraceableItem(TraceableBaseClass):
             database (dict): Dictionary to remove the relation from.
         '''
         if relation in database:
-            if target in database[relation]:
-                database[relation].remove(target)
+            database[relation].pop(target, None)
 
     def remove_targets(self, target_id, explicit=False, implicit=True, relations=set()):
         ''' Removes any relation to given target item.
@@ -175,10 +202,13 @@ class TraceableItem(TraceableBaseClass):
             source_databases.append(self.explicit_relations)
         if implicit:
             source_databases.append(self.implicit_relations)
+        explicit_removed = False
         for database in source_databases:
             for relation in database:
                 if target_id in database[relation] and (not relations or relation in relations):
-                    database[relation].remove(target_id)
+                    del database[relation][target_id]
+                    explicit_removed = explicit_removed or database is self.explicit_relations
+        self._notify_collection(explicit_target=target_id if explicit_removed else None)
 
     def iter_targets(self, relation, explicit=True, implicit=True, sort=True):
         ''' Gets a list of targets to other traceable item(s), naturally sorted by default.
@@ -198,7 +228,7 @@ class TraceableItem(TraceableBaseClass):
         if implicit and relation in self.implicit_relations:
             targets.extend(self.implicit_relations[relation])
         if sort:
-            return natsorted(targets)
+            return sorted(targets, key=natural_sort_key)
         return targets
 
     def yield_targets(self, *relations, explicit=True, implicit=True):
@@ -223,7 +253,7 @@ class TraceableItem(TraceableBaseClass):
     def yield_targets_sorted(self, *args, **kwargs):
         ''' Gets an iterable of targets to other traceable items, with natural sorting applied. '''
         gen = self.yield_targets(*args, **kwargs)
-        return natsorted(gen)
+        return sorted(gen, key=natural_sort_key)
 
     def iter_relations(self, sort=True):
         ''' Iterates over available relations: naturally sorted by default.
@@ -236,7 +266,7 @@ class TraceableItem(TraceableBaseClass):
         '''
         relations = list(self.explicit_relations) + list(self.implicit_relations)
         if sort:
-            return natsorted(relations)
+            return sorted(relations, key=natural_sort_key)
         return relations
 
     @staticmethod
@@ -270,6 +300,7 @@ class TraceableItem(TraceableBaseClass):
                                         self.docname)
         if overwrite or attr not in self.attributes:
             self.attributes[attr] = value
+            self._notify_collection(attributes_changed=True)
 
     def remove_attribute(self, attr):
         ''' Removes an attribute key-value pair from the traceable item.
@@ -282,6 +313,7 @@ class TraceableItem(TraceableBaseClass):
                                         .format(item=self.identifier, attr=attr),
                                         self.docname)
         del self.attributes[attr]
+        self._notify_collection(attributes_changed=True)
 
     def get_attribute(self, attr):
         ''' Gets the value of an attribute from the traceable item.
@@ -312,7 +344,8 @@ class TraceableItem(TraceableBaseClass):
             list: Sorted list containing available attributes in the item.
         '''
         sorted_attributes = [attr for attr in self.attribute_order if attr in self.attributes]
-        sorted_attributes.extend(natsorted(set(self.attributes).difference(set(self.attribute_order))))
+        sorted_attributes.extend(sorted(set(self.attributes).difference(set(self.attribute_order)),
+                                        key=natural_sort_key))
         return sorted_attributes
 
     def __str__(self, explicit=True, implicit=True):
@@ -400,7 +433,8 @@ class TraceableItem(TraceableBaseClass):
             bool: True if given item is related through the given relationships, False otherwise.
         '''
         for relation in relations:
-            if target_id in self.yield_targets(relation, explicit=True, implicit=True):
+            if target_id in self.explicit_relations.get(relation, ()) or \
+                    target_id in self.implicit_relations.get(relation, ()):
                 return True
         return False
 
@@ -415,6 +449,20 @@ class TraceableItem(TraceableBaseClass):
         '''
         return set(relations).issubset(self.iter_relations(sort=False))
 
+    def get_digests(self):
+        ''' Gets digests of the item that are stable across Python processes, to detect changes between builds
+
+        Returns:
+            str: Digest of the name, caption, location, content, attributes and placeholder state
+            str: Digest of the explicit and implicit relations
+        '''
+        content = [self.name, self.caption, self.docname, self.content, self.is_placeholder, self.attributes,
+                   self.attribute_order]
+        relations = [{relation: sorted(targets) for relation, targets in database.items() if targets}
+                     for database in (self.explicit_relations, self.implicit_relations)]
+        return tuple(hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+                     for data in (content, relations))
+
     def to_dict(self):
         ''' Exports item to a dictionary.
 
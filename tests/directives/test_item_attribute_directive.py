@@ -109,6 +109,7 @@ class TestItemAttributeDirective(TestCase):
         self.directive.state.document.settings = Mock()
         self.directive.state.document.settings.env = Mock()
         self.directive.state.document.settings.env.docname = 'test_document'
+        self.directive.state.document.settings.env.traceability_attribute_descriptions = {}
 
         # Mock get_source_info to return a tuple
         self.directive.get_source_info = Mock(return_value=('test.rst', 10))
@@ -1,11 +1,28 @@
+import json
+import tempfile
 from collections import namedtuple
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import Mock
 
-from docutils import nodes
-from mlx.traceability.directives.item_matrix_directive import ItemMatrix
+from mlx.traceability.directives.item_matrix_directive import ExternalRef, ItemMatrix, MatrixRow, \
+    create_html_translator, node_to_html
+from mlx.traceability.traceable_collection import TraceableCollection
+from mlx.traceability.traceable_item import TraceableItem
 
+from docutils import nodes
+from docutils.frontend import get_default_settings
+from docutils.writers.html5_polyglot import HTMLTranslator, Writer
 from parameterized import parameterized
 
+EXT_REF = ExternalRef('ext_x', 'X-1')
+
+
+def create_app(outdir=None):
+    """Creates a mock of the Sphinx application with an HTML builder that uses the translator of docutils"""
+    return Mock(outdir=outdir, builder=Mock(docsettings=get_default_settings(Writer),
+                                            create_translator=lambda document, builder: HTMLTranslator(document)))
+
 
 class TestItemMatrix(TestCase):
     Rows = namedtuple('Rows', "sorted covered uncovered counters")
@@ -21,15 +38,137 @@ class TestItemMatrix(TestCase):
         dut['targetcolumns'] = ['attr'] * attributes[1]
         dut['splittargets'] = splittargets
         rows = self.Rows([], [], [], [0, 0])
-        left = nodes.entry('left')
-        target1 = [nodes.entry('right1')]
-        target2 = [nodes.entry('right2')]
-        dut._store_data(rows, left, [target1, target2], covered, None)
+        dut._store_data(rows, 'SRC-1', [['TGT-1'], ['TGT-2']], covered)
 
         self.assertEqual([len(attr) for attr in rows[:3]], expected_lengths)
-        my_row = nodes.row()
-        my_row += left
-        my_row += target1
-        my_row += target2
-        for idx, rows_per_type in enumerate(rows[:3]):  # verify that rows contain the three entries
-            self.assertEqual(str(rows_per_type), str([my_row] * expected_lengths[idx]))
+        my_row = MatrixRow('SRC-1', None, (('TGT-1',), ('TGT-2',)), None)
+        for idx, rows_per_type in enumerate(rows[:3]):  # verify that rows contain the plain data of the row
+            self.assertEqual(rows_per_type, [my_row] * expected_lengths[idx])
+
+    @parameterized.expand([
+        (False, [MatrixRow('SRC-1', ('INT-1',), (('TGT-2', 'TGT-10'), (EXT_REF,)), EXT_REF)]),
+        (True, [MatrixRow('SRC-1', ('INT-1',), (('TGT-10',), (EXT_REF,)), EXT_REF),
+                MatrixRow('SRC-1', ('INT-1',), (('TGT-2',), ()), None)]),
+    ])
+    def test_store_data_targetcolumns(self, splittargets, expected_rows):
+        dut = ItemMatrix()
+        dut['intermediate'] = 'INT'
+        dut['targetcolumns'] = ['attr']
+        dut['splittargets'] = splittargets
+        rows = self.Rows([], [], [], [0, 0])
+        dut._store_data(rows, 'SRC-1', [['INT-1'], ['TGT-10', 'TGT-2'], [EXT_REF]], True)
+        self.assertEqual(expected_rows, rows.covered)
+
+    def test_add_internal_targets(self):
+        collection = TraceableCollection()
+        collection.add_relation_pair('validates', 'validated_by')
+        for item_id in ('RQT-1', 'TEST-10', 'TEST-2', 'TEST-1', 'UTEST-1'):
+            collection.add_item(TraceableItem(item_id))
+        for target_id in ('TEST-10', 'TEST-2', 'UTEST-1', 'TEST-99'):
+            collection.add_relation(target_id, 'validates', 'RQT-1')
+        targets_with_ids = []
+        for regex in ('TEST', 'UTEST', 'ITEST'):
+            target_ids = collection.get_items(regex)
+            targets_with_ids.append({target_id: index for index, target_id in enumerate(target_ids)})
+        right_cells = [[], [], []]
+        self.assertTrue(ItemMatrix.add_internal_targets(right_cells, 'RQT-1', targets_with_ids, ['validated_by'],
+                                                        collection))
+        self.assertEqual([['TEST-2', 'TEST-10'], ['UTEST-1'], []], right_cells)
+        self.assertFalse(ItemMatrix.add_internal_targets([[], [], []], 'TEST-1', targets_with_ids, ['validates'],
+                                                         collection))
+
+    def test_is_covered(self):
+        collection = TraceableCollection()
+        collection.add_relation_pair('validates', 'validated_by')
+        collection.add_relation_pair('ext_toolname')
+        for item_id in ('RQT-1', 'RQT-2', 'RQT-3', 'TEST-1', 'UTEST-1'):
+            collection.add_item(TraceableItem(item_id))
+        collection.add_relation('TEST-1', 'validates', 'RQT-1')
+        collection.add_relation('UTEST-1', 'validates', 'RQT-2')
+        collection.add_relation('RQT-3', 'ext_toolname', 'tool:1')
+        adjacency_matrix = collection.get_adjacency_matrix()
+        target_mask = adjacency_matrix.mask(collection.get_items('TEST'))
+        dut = ItemMatrix()
+        covered = [dut._is_covered(collection.get_item(source_id), {}, ['validated_by'], ['ext_toolname'],
+                                   adjacency_matrix, target_mask) for source_id in ('RQT-1', 'RQT-2', 'RQT-3')]
+        self.assertEqual([True, False, True], covered)
+        self.assertFalse(dut._is_covered(collection.get_item('RQT-1'), {}, [], [], adjacency_matrix, target_mask))
+
+    @parameterized.expand([
+        (False, {'INT-1': [{'TGT-1'}], 'INT-2': [set()]}, True),
+        (True, {'INT-1': [{'TGT-1'}], 'INT-2': [set()]}, False),
+        (False, {}, False),
+    ])
+    def test_is_covered_via_intermediate(self, coveredintermediates, intermediates, expected):
+        dut = ItemMatrix()
+        dut['coveredintermediates'] = coveredintermediates
+        self.assertEqual(expected, dut._is_covered(TraceableItem('SRC-1'), {'SRC-1': intermediates}, [], [], None, 0))
+
+    def test_set_rowspan(self):
+        keys = [('SRC-1', 'SRC-1', ('INT-1',)), ('SRC-1', 'SRC-1', ('INT-1',)), ('SRC-1', 'SRC-1', ('INT-2',)),
+                ('SRC-2', 'SRC-2', ('INT-2',)), (EXT_REF, EXT_REF, ())]
+        tbody = nodes.tbody()
+        tbody += [nodes.row('', *[nodes.entry('') for _ in range(4)]) for _ in keys]
+        cells_to_remove = ItemMatrix._set_rowspan(tbody, keys)
+        self.assertEqual({0: [], 1: [0, 1, 2], 2: [0, 1], 3: [], 4: []}, cells_to_remove)
+        self.assertEqual([2, 2, 1], [tbody[0][idx].get('morerows') for idx in range(3)])
+        self.assertEqual(['item-group-0', 'item-group-0', 'item-group-0', 'item-group-1', 'item-group-2'],
+                         [row['classes'][0] for row in tbody])
+
+    def test_node_to_html(self):
+        paragraph = nodes.paragraph(classes=['item-link'])
+        reference = nodes.reference('', '', refuri='doc.html#ITEM-1')
+        reference += nodes.emphasis('', 'ITEM-1', nodes.inline('', 'a < b', classes=['popup_caption']),
+                                    classes=['has_hidden_caption'])
+        paragraph += reference
+        nodes.entry('', paragraph)
+        translator = create_html_translator(create_app())
+        self.assertEqual('<p class="item-link"><a class="reference external" href="doc.html#ITEM-1">'
+                         '<em class="has_hidden_caption">ITEM-1<span class="popup_caption">a &lt; b</span></em>'
+                         '</a></p>',
+                         node_to_html(translator, paragraph))
+        # the HTML writer renders a paragraph depending on its siblings
+        entry = nodes.entry('', nodes.paragraph('', 'TGT'), nodes.paragraph('', 'SRC'))
+        self.assertEqual(['<p>TGT</p>\n', '<p>SRC</p>\n'], [node_to_html(translator, child) for child in entry])
+
+    def test_virtualize_table(self):
+        dut = ItemMatrix()
+        dut['document'] = 'sub/doc'
+        dut['line'] = 12
+        tbody = nodes.tbody()
+        for group_nr, morerows in ((0, 1), (0, None), (1, 0)):
+            row = nodes.row(classes=[f'item-group-{group_nr}'])
+            if morerows is not None:
+                row += nodes.entry('', nodes.paragraph('', 'SRC'), morerows=morerows)
+            row += nodes.entry('', nodes.paragraph('', 'TGT'), nodes.paragraph('', 'SRC'))
+            tbody += row
+        table = nodes.table('', nodes.tgroup('', tbody))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            app = create_app(tmp_dir)
+            container = dut._virtualize_table(table, tbody, app)
+            data_file = Path(tmp_dir, '_static', 'traceability-matrices', 'sub', 'doc-12.js')
+            function_name, data = data_file.read_text().split(', ', 1)
+            data = json.loads(data[:-2])
+        self.assertEqual('traceabilityMatrixData("traceability-matrices/sub/doc-12.js"', function_name)
+        # a paragraph renders differently without siblings
+        self.assertEqual(['<p>SRC</p>', '<p>TGT</p>\n', '<p>SRC</p>\n'], data['paragraphs'])
+        self.assertEqual([[0, [2, 0], [1, 1, 2]], [0, [1, 1, 2]], [1, [1, 0], [1, 1, 2]]], data['rows'])
+        self.assertEqual(0, len(tbody))
+        self.assertIs(table, container[0])
+        self.assertIn('data-src="traceability-matrices/sub/doc-12.js"', container[1].astext())
+
+    def test_remove_data_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir, '_static', 'traceability-matrices')
+            file_names = ('doc-12.js', 'doc-30.js', 'doc-b-4.js', 'sub/doc-12.js')
+            for file_name in file_names:
+                data_dir.joinpath(file_name).parent.mkdir(parents=True, exist_ok=True)
+                data_dir.joinpath(file_name).write_text('')
+            app = create_app(tmp_dir)
+            ItemMatrix.remove_data_files(app, 'doc')
+            self.assertEqual(['doc-b-4.js', 'sub/doc-12.js'],
+                             sorted(str(path.relative_to(data_dir).as_posix())
+                                    for path in data_dir.rglob('*.js')))
+            ItemMatrix.remove_data_files(app, 'other/doc')
+            ItemMatrix.remove_data_files(app)
+            self.assertFalse(data_dir.exists())
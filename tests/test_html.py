@@ -1,3 +1,4 @@
+import json
 import shutil
 import tempfile
 import textwrap
@@ -111,3 +112,63 @@ class TestSphinx(unittest.TestCase):
         content = self.make_doc_with_rst(rst_content)
         assert 'My relation' not in content
         assert 'My reverse relation' not in content
+
+
+class TestParallelRead(unittest.TestCase):
+
+    def setUp(self):
+        self.doc_dir = Path(tempfile.mkdtemp())
+        self.src_dir = self.doc_dir / "src"
+        self.src_dir.mkdir()
+        (self.src_dir / "conf.py").write_text(textwrap.dedent(r"""
+            extensions = ['mlx.traceability']
+            traceability_relationships = {'my_relation': 'my_reverse_relation'}
+            traceability_relationship_to_string = {'my_relation': 'My relation',
+                                                   'my_reverse_relation': 'My reverse relation'}
+            traceability_attributes = {}
+            traceability_warnings_max_repeats = 2
+            """))
+        docnames = [f"doc{nr}" for nr in range(8)]  # Sphinx only reads in parallel when there are more than 5
+        (self.src_dir / "index.rst").write_text("Index\n=====\n\n.. toctree::\n\n" +
+                                                "".join(f"   {docname}\n" for docname in docnames))
+        for nr, docname in enumerate(docnames):
+            (self.src_dir / f"{docname}.rst").write_text(textwrap.dedent(f"""
+                Document {nr}
+                ==========
+
+                .. item:: ITEM-{nr} First definition
+
+                .. item:: ITEM-{nr} Second definition
+
+                .. item:: SHARED Defined in every document
+                """))
+
+    def tearDown(self):
+        shutil.rmtree(self.doc_dir)
+
+    def build(self, jobs):
+        out_dir = self.doc_dir / f"out{jobs}"
+        warnings_json = self.doc_dir / f"warnings{jobs}.json"
+        warnings_log = self.doc_dir / f"warnings{jobs}.log"
+        retcode = sphinx.cmd.build.main([
+            "-q",
+            "-j", str(jobs),
+            "-b", "html",
+            "-w", str(warnings_log),
+            "-D", f"traceability_warnings_json_path={warnings_json}",
+            str(self.src_dir),
+            str(out_dir),
+        ])
+        self.assertEqual(retcode, 0)
+        warnings = sorted(json.dumps(warning, sort_keys=True) for warning in json.loads(warnings_json.read_text()))
+        return warnings, warnings_log.read_text()
+
+    def test_warnings_of_parallel_read(self):
+        serial_warnings, serial_log = self.build(1)
+        parallel_warnings, parallel_log = self.build(4)
+        self.assertEqual(8 + 7, len(serial_warnings))
+        self.assertEqual(serial_warnings, parallel_warnings)
+        # the warnings about the same item are capped across the parallel processes
+        self.assertEqual(2, serial_log.count('duplicating SHARED'))
+        self.assertEqual(2, parallel_log.count('duplicating SHARED'))
+        self.assertEqual(8, parallel_log.count('duplicating ITEM-'))
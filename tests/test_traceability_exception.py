@@ -0,0 +1,106 @@
+import json
+import logging
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlx.traceability import traceability_exception as dut
+
+LOGGER = logging.getLogger('sphinx.mlx.traceability.traceability_exception')
+
+
+class TestWarningCollector(TestCase):
+
+    def test_report_immediately(self):
+        collector = dut.WarningCollector()
+        with self.assertLogs(LOGGER, logging.WARNING) as c_m:
+            collector.report('some warning', 'doc', 5)
+        self.assertEqual(['WARNING:sphinx.mlx.traceability.traceability_exception:some warning'], c_m.output)
+
+    def test_collect(self):
+        collector = dut.WarningCollector()
+        collector.start(max_repeats=2)
+        for docname in ('doc1', 'doc2', 'doc1', 'doc3'):
+            collector.report("cannot link to 'X'", docname, 7)
+        collector.report('other warning', 'doc1')
+        with self.assertNoLogs(LOGGER, logging.WARNING):
+            collector.report('other warning', 'doc1')
+        with self.assertLogs(LOGGER, logging.WARNING) as c_m:
+            collector.flush()
+        self.assertEqual(3, len(c_m.output))
+        self.assertEqual(1, collector.suppressed)
+        with self.assertLogs(LOGGER, logging.INFO) as c_m:
+            collector.stop()
+        self.assertEqual(['INFO:sphinx.mlx.traceability.traceability_exception:traceability: 1 repeated warning(s) '
+                          'have been suppressed'], c_m.output)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = Path(tmp_dir, 'out', 'warnings.json')
+            collector.export(fname)
+            warnings = json.loads(fname.read_text())
+        self.assertEqual([
+            {'message': "cannot link to 'X'", 'document': 'doc1', 'line': 7, 'count': 2},
+            {'message': "cannot link to 'X'", 'document': 'doc2', 'line': 7, 'count': 1},
+            {'message': "cannot link to 'X'", 'document': 'doc3', 'line': 7, 'count': 1},
+            {'message': 'other warning', 'document': 'doc1', 'line': None, 'count': 2},
+        ], warnings)
+        # no longer collecting
+        with self.assertLogs(LOGGER, logging.WARNING):
+            collector.report('other warning', 'doc1')
+
+    def test_collect_per_item(self):
+        collector = dut.WarningCollector()
+        collector.start(max_repeats=1)
+        for docname in ('doc1', 'doc2'):
+            for lineno, item_id in ((7, 'X'), (8, 'Y')):
+                collector.report("cannot link to '{}'".format(item_id), docname, lineno, item_id)
+                collector.report('item is not defined', docname, lineno, item_id)
+        with self.assertLogs(LOGGER, logging.WARNING) as c_m:
+            collector.flush()
+        self.assertEqual([
+            "WARNING:sphinx.mlx.traceability.traceability_exception:cannot link to 'X'",
+            'WARNING:sphinx.mlx.traceability.traceability_exception:item is not defined',
+            "WARNING:sphinx.mlx.traceability.traceability_exception:cannot link to 'Y'",
+            'WARNING:sphinx.mlx.traceability.traceability_exception:item is not defined',
+        ], c_m.output)
+        self.assertEqual(4, collector.suppressed)
+
+    def test_merge_forked(self):
+        collector = dut.WarningCollector()
+        collector.start(max_repeats=1)
+        collector.report('duplicating X', 'doc1', 3, 'X')
+        self.assertIsNone(collector.get_state())
+        with patch('os.getpid', return_value=-1):  # in a forked process
+            collector.report('duplicating X', 'doc2', 3, 'X')
+            collector.report('duplicating X', 'doc2', 3, 'X')
+            with self.assertNoLogs(LOGGER, logging.WARNING):
+                collector.flush()
+            state = collector.get_state()
+        # the forked process only keeps its own warnings
+        self.assertEqual([(('duplicating X', 'doc2', 3), 'X')], state[0])
+        self.assertEqual({('duplicating X', 'doc2', 3): 2}, state[1])
+        main = dut.WarningCollector()
+        main.start(max_repeats=1)
+        main.report('duplicating X', 'doc1', 3, 'X')
+        main.merge(state)
+        with self.assertLogs(LOGGER, logging.WARNING) as c_m:
+            main.flush()
+        self.assertEqual(['WARNING:sphinx.mlx.traceability.traceability_exception:duplicating X'], c_m.output)
+        self.assertEqual(1, main.suppressed)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = Path(tmp_dir, 'warnings.json')
+            main.export(fname)
+            self.assertEqual([1, 2], [warning['count'] for warning in json.loads(fname.read_text())])
+
+    def test_recording(self):
+        collector = dut.WarningCollector()
+        collector.start()
+        with collector.recording() as outer:
+            collector.report('first warning', 'doc', 1)
+            with collector.recording() as inner:
+                collector.report('second warning', 'doc', 2)
+            with collector.muted():
+                collector.report('muted warning', 'doc', 3)
+        collector.report('third warning', 'doc', 4)
+        self.assertEqual([('second warning', 'doc', 2, None)], inner)
+        self.assertEqual([('first warning', 'doc', 1, None), ('second warning', 'doc', 2, None)], outer)
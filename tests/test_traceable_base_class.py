@@ -29,3 +29,16 @@ class TestTraceableBaseClass(TestCase):
         data = item.to_dict()
         self.assertEqual("b787a17fc91c9cf37b5bf0665f13c8b1", data['content-hash'])
         item.self_test()
+
+    def test_lazy_content_node(self):
+        document_ids = {}
+        directive = type('Directive', (), {})()
+        directive.state = type('State', (), {})()
+        directive.state.document = type('Document', (), {'ids': document_ids})()
+        item = dut.TraceableBaseClass(self.identification, directive=directive)
+        self.assertFalse(hasattr(item, '__dict__'))
+        self.assertIsNone(item._content_node)
+        self.assertEqual({}, document_ids)
+        content_node = item.content_node
+        self.assertIs(content_node, item.content_node)
+        self.assertEqual({f'content-{self.identification}': content_node}, document_ids)
@@ -1,3 +1,6 @@
+import pickle
+import random
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch, mock_open
 
@@ -7,6 +10,10 @@ from mlx.traceability import traceable_item as item
 from mlx.traceability import traceable_attribute as attribute
 from mlx.traceability import traceability_exception as exception
 from mlx.traceability import traceable_collection as dut
+from mlx.traceability.directives.attribute_link_directive import AttributeLink
+from mlx.traceability.directives.checkbox_result_directive import CheckboxResult
+from mlx.traceability.directives.item_link_directive import ItemLink
+from mlx.traceability.directives.item_relink_directive import ItemRelink
 
 
 class TestTraceableCollection(TestCase):
@@ -428,3 +435,576 @@ class TestTraceableCollection(TestCase):
         self.assertEqual(attributes_item2, ['small', 'large', 'attr2', 'number'])
         self.assertEqual(ignored1, [])
         self.assertEqual(ignored2, [item1])
+
+    def test_literal_prefix(self):
+        self.assertEqual('SWRQT-', dut._literal_prefix('^SWRQT-', 0))
+        self.assertEqual('RQT-', dut._literal_prefix('RQT-.*', 0))
+        self.assertEqual('RQT', dut._literal_prefix(r'RQT-?\d', 0))
+        self.assertEqual('SWRQT', dut._literal_prefix('(SW)RQT', 0))
+        self.assertEqual('', dut._literal_prefix('(SW|HW)RQT', 0))
+        self.assertEqual('', dut._literal_prefix('(?i)RQT', 0))
+        self.assertEqual('', dut._literal_prefix('RQT', dut.re.IGNORECASE))
+        self.assertEqual('', dut._literal_prefix('', 0))
+        self.assertEqual('', dut._literal_prefix('RQT-[', 0))
+
+    def test_get_items_prefix_index(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id in ('RQT-10', 'TST-1', 'RQT-2', 'RQT', 'RQTS-1', 'QRQT-1'):
+            coll.add_item(item.TraceableItem(item_id))
+        coll.add_relation('TST-1', self.fwd_relation, 'RQT-3')  # placeholder should be excluded
+        self.assertEqual(['RQT-2', 'RQT-10'], coll.get_items('RQT-'))
+        self.assertEqual(['RQT-2', 'RQT-10'], coll.get_items(dut.re.compile(r'^RQT-\d+$')))
+        self.assertEqual(['RQT', 'RQT-2', 'RQT-10', 'RQTS-1'], coll.get_items('RQT'))
+        # unsorted results keep the order in which the items have been added
+        self.assertEqual(['RQT-10', 'RQT-2'], coll.get_items('RQT-', sort=False))
+        self.assertEqual(['RQT-10', 'RQT-2'], [i.identifier for i in coll.get_item_objects('RQT-')])
+        # patterns without literal prefix fall back to a full scan
+        self.assertEqual(['QRQT-1', 'RQT-2', 'RQT-10'], coll.get_items(r'\w*RQT-'))
+        # index follows additions and removals
+        coll.add_item(item.TraceableItem('RQT-3'))
+        coll.remove_item('RQT-10')
+        self.assertEqual(['RQT-2', 'RQT-3'], coll.get_items('RQT-'))
+
+    def test_natural_order_index(self):
+        coll = dut.TraceableCollection()
+        for item_id in ('z11', 'z2', 'a10', 'a9'):
+            coll.add_item(item.TraceableItem(item_id))
+        self.assertEqual(['a9', 'a10', 'z2', 'z11'], coll.iter_items())
+        self.assertEqual(['z11', 'z2', 'a10', 'a9'], coll.get_items('', reverse=True))
+        self.assertEqual(['z11', 'z2'], coll.get_items('z', reverse=True))
+        # removed and added items are merged into the existing order
+        coll.remove_item('a10')
+        coll.add_item(item.TraceableItem('z3'))
+        coll.add_item(item.TraceableItem('a10'))
+        self.assertEqual(['a9', 'a10', 'z2', 'z3', 'z11'], coll.iter_items())
+        self.assertEqual(natsorted(coll.items), coll.get_items(''))
+        # modifying the items directly triggers a rebuild of the index
+        coll.items['b1'] = item.TraceableItem('b1')
+        self.assertEqual(['a9', 'a10', 'b1', 'z2', 'z3', 'z11'], coll.iter_items())
+
+    def test_get_items_query_cache(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        item1 = item.TraceableItem('RQT-1')
+        coll.add_item(item1)
+        self.assertEqual(['RQT-1'], coll.get_items('RQT'))
+        self.assertEqual(['RQT-1'], coll.get_items('RQT'))
+        self.assertEqual((1, 1, 1), coll.query_cache_info())
+        # returned lists are copies
+        coll.get_items('RQT').append('RQT-9')
+        self.assertEqual(['RQT-1'], coll.get_items('RQT'))
+        self.assertEqual(['RQT-1'], coll.get_items('RQT', sort=False))
+        self.assertEqual((3, 2, 2), coll.query_cache_info())
+        # any modification of the collection or its items invalidates the cache
+        coll.add_item(item.TraceableItem('RQT-2'))
+        self.assertEqual(['RQT-1', 'RQT-2'], coll.get_items('RQT'))
+        self.assertEqual((3, 3, 1), coll.query_cache_info())
+        generation = coll.generation
+        item1.add_attribute(self.attribute_key, self.attribute_value_src)
+        self.assertGreater(coll.generation, generation)
+        generation = coll.generation
+        coll.add_relation('RQT-1', self.fwd_relation, 'RQT-2')
+        self.assertGreater(coll.generation, generation)
+        generation = coll.generation
+        item1.remove_targets('RQT-2')
+        self.assertGreater(coll.generation, generation)
+        coll.remove_item('RQT-1')
+        self.assertEqual(['RQT-2'], coll.get_items('RQT'))
+        # items that are no longer part of the collection do not affect it
+        generation = coll.generation
+        item1.add_attribute(self.attribute_key, self.attribute_value_tgt)
+        self.assertEqual(generation, coll.generation)
+
+    def test_attribute_index(self):
+        coll = dut.TraceableCollection()
+        items = [item.TraceableItem(f'RQT-{index}') for index in range(4)]
+        for index, item_obj in enumerate(items[:3]):
+            item_obj.add_attribute(self.attribute_key, self.attribute_value_src if index else self.attribute_value_tgt)
+            coll.add_item(item_obj)
+        coll.add_item(items[3])
+        src_filter = {self.attribute_key: dut.re.compile(r'.*value1')}
+        self.assertEqual({'RQT-1', 'RQT-2'}, coll._get_ids_matching_attributes(src_filter))
+        self.assertEqual({'RQT-0', 'RQT-1', 'RQT-2'}, coll._get_ids_matching_attributes({self.attribute_key: ''}))
+        self.assertEqual(set(), coll._get_ids_matching_attributes({'unknown-attribute': ''}))
+        # index follows changes of attributes and items
+        items[1].remove_attribute(self.attribute_key)
+        items[3].add_attribute(self.attribute_key, self.attribute_value_src)
+        coll.remove_item('RQT-2')
+        self.assertEqual(['RQT-3'], coll.get_items('', src_filter))
+        self.assertEqual(['RQT-3'], [item_obj.identifier for item_obj in coll.get_item_objects('', src_filter)])
+        for item_obj in coll.items.values():
+            self.assertEqual(item_obj.attributes_match(src_filter), item_obj.identifier in
+                             coll._get_ids_matching_attributes(src_filter))
+
+    def test_adjacency_matrix(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        coll.add_relation_pair(self.unidir_relation)
+        for item_id in ('SRC-1', 'SRC-2', 'TGT-10', 'TGT-2', 'TGT-3'):
+            coll.add_item(item.TraceableItem(item_id))
+        coll.add_relation('SRC-1', self.fwd_relation, 'TGT-10')
+        coll.add_relation('SRC-1', self.unidir_relation, 'TGT-2')
+        coll.add_relation('SRC-1', self.fwd_relation, 'TGT-4')  # placeholder
+        coll.add_relation('SRC-2', self.fwd_relation, 'TGT-3')
+        matrix = coll.get_adjacency_matrix()
+        self.assertIs(matrix, coll.get_adjacency_matrix())
+        target_ids = coll.get_items('TGT')
+        self.assertEqual(['TGT-2', 'TGT-10'], matrix.related_ids('SRC-1', [], target_ids))
+        self.assertEqual(['TGT-10'], matrix.related_ids('SRC-1', [self.fwd_relation], target_ids))
+        self.assertEqual(['TGT-10'], matrix.related_ids('SRC-1', [self.fwd_relation, 'unknown'], ['TGT-10', 'TGT-3']))
+        self.assertEqual(['SRC-1'], matrix.related_ids('TGT-10', [self.rev_relation], coll.get_items('SRC')))
+        self.assertEqual([], matrix.related_ids('TGT-4', [], coll.iter_items()))
+        for source_id in coll.iter_items():
+            for target_id in coll.iter_items():
+                for relations in ([], [self.fwd_relation], [self.unidir_relation, self.rev_relation]):
+                    self.assertEqual(coll.are_related(source_id, relations, target_id),
+                                     matrix.are_related(source_id, relations, target_id))
+        # the matrix gets rebuilt after the collection has been modified
+        coll.add_relation('SRC-2', self.fwd_relation, 'TGT-2')
+        matrix = coll.get_adjacency_matrix()
+        self.assertEqual(['TGT-2', 'TGT-3'], matrix.related_ids('SRC-2', [self.fwd_relation], target_ids))
+
+    def test_path_index(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        coll.add_relation_pair(self.unidir_relation)
+        for item_id in ('INT-1', 'INT-2', 'INT-3', 'INT-4', 'OTHER-1', 'TGT-1', 'TGT-2', 'TGT-3'):
+            coll.add_item(item.TraceableItem(item_id))
+        coll.add_relation('INT-1', self.fwd_relation, 'TGT-1')
+        coll.add_relation('INT-1', self.unidir_relation, 'INT-2')
+        coll.add_relation('INT-2', self.unidir_relation, 'INT-3')
+        coll.add_relation('INT-3', self.unidir_relation, 'INT-2')  # cycle
+        coll.add_relation('INT-3', self.fwd_relation, 'TGT-2')
+        coll.add_relation('INT-1', self.unidir_relation, 'INT-4')  # without targets
+        coll.add_relation('INT-1', self.unidir_relation, 'OTHER-1')  # no intermediate
+        coll.add_relation('OTHER-1', self.fwd_relation, 'TGT-3')
+        path_index = coll.get_path_index([self.fwd_relation], recursive_relation=self.unidir_relation,
+                                         intermediate_regex='INT')
+        self.assertIs(path_index, coll.get_path_index((self.fwd_relation,), '', self.unidir_relation, 'INT'))
+        self.assertEqual(((self.fwd_relation, 'TGT-1'),), path_index.links('INT-1'))
+        self.assertEqual({'TGT-1', 'TGT-2'}, path_index.reachable('INT-1'))
+        self.assertEqual({'TGT-2'}, path_index.reachable('INT-2'))
+        self.assertEqual({'TGT-2'}, path_index.reachable('INT-3'))
+        self.assertEqual(['INT-4'], path_index.uncovered_ids('INT-1'))
+        self.assertEqual(set(), path_index.reachable('UNKNOWN'))
+        filtered_index = coll.get_path_index([self.fwd_relation, self.unidir_relation], 'INT')
+        self.assertEqual(((self.unidir_relation, 'INT-2'), (self.unidir_relation, 'INT-4')),
+                         filtered_index.links('INT-1'))
+        # the index gets rebuilt after the collection has been modified
+        coll.add_relation('INT-4', self.fwd_relation, 'TGT-3')
+        path_index = coll.get_path_index([self.fwd_relation], recursive_relation=self.unidir_relation,
+                                         intermediate_regex='INT')
+        self.assertEqual({'TGT-1', 'TGT-2', 'TGT-3'}, path_index.reachable('INT-1'))
+        self.assertEqual([], path_index.uncovered_ids('INT-1'))
+
+    def test_remove_items_from_document(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id, docname in (('A-1', 'doc1'), ('A-2', 'doc2'), ('A-3', 'doc1'), ('A-4', 'doc3')):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location(docname)
+            coll.add_item(item_obj)
+        coll.add_relation('A-1', self.fwd_relation, 'B-1')  # placeholder without document
+        coll.remove_items_from_document('doc1')
+        self.assertEqual(['A-2', 'A-4', 'B-1'], coll.iter_items())
+        # index follows changes of location of items in the collection
+        coll.get_item('A-4').set_location('doc2')
+        coll.add_item(item.TraceableItem('A-5'))
+        coll.get_item('A-5').set_location(dut.Path('doc2.rst'))
+        coll.remove_items_from_document('doc3')
+        self.assertEqual(['A-2', 'A-4', 'A-5', 'B-1'], coll.iter_items())
+        coll.remove_items_from_document('doc2')
+        self.assertEqual(['B-1'], coll.iter_items())
+
+    def _intermediate_nodes(self, docname):
+        link = ItemLink('', document=docname, line=1, sources=['A-1'], targets=['B-1'], type=self.fwd_relation,
+                        nooverwrite=False)
+        relink = ItemRelink('', document=docname, line=2, remap='C-1', target='', type=self.fwd_relation,
+                            nooverwrite=False)
+        return [link, relink]
+
+    def test_remove_intermediate_nodes(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id in ('A-1', 'B-1'):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location('doc1')
+            coll.add_item(item_obj)
+        coll.add_relation('A-1', self.fwd_relation, 'C-1')
+        for node in self._intermediate_nodes('doc2'):
+            coll.add_intermediate_node(node)
+        # the environment is stored before the consistency check, i.e. without the effects of the intermediate nodes
+        stored = pickle.dumps(coll)
+        coll.process_intermediate_nodes()
+        ItemRelink.remove_placeholders(coll)
+        self.assertEqual(['B-1'], coll.get_item('A-1').iter_targets(self.fwd_relation))
+        self.assertFalse(coll.has_item('C-1'))
+
+        # incremental build that reads doc2 again
+        coll = pickle.loads(stored)
+        coll.remove_intermediate_nodes('doc2')
+        new_nodes = self._intermediate_nodes('doc2')
+        for node in new_nodes:
+            coll.add_intermediate_node(node)
+        self.assertEqual(new_nodes, list(coll.iter_intermediate_nodes()))
+        with self.assertNoLogs('sphinx.mlx.traceability.traceability_exception', 'WARNING'):
+            coll.process_intermediate_nodes()
+        ItemRelink.remove_placeholders(coll)
+        self.assertEqual(['B-1'], coll.get_item('A-1').iter_targets(self.fwd_relation))
+        self.assertFalse(coll.has_item('C-1'))
+
+        # incremental build in which doc2 has been removed
+        coll = pickle.loads(stored)
+        coll.remove_intermediate_nodes('doc2')
+        self.assertEqual([], list(coll.iter_intermediate_nodes()))
+        coll.process_intermediate_nodes()
+        ItemRelink.remove_placeholders(coll)
+        self.assertEqual(['C-1'], coll.get_item('A-1').iter_targets(self.fwd_relation))
+
+    def test_checkbox_result_before_attribute_link(self):
+        coll = dut.TraceableCollection()
+        item_obj = item.TraceableItem('A-1')
+        item_obj.set_location('doc1')
+        coll.add_item(item_obj)
+        # the checkbox-result in the document that sorts last gets applied first, like it was while reading
+        attributes = {self.attribute_key: self.attribute_value_tgt}
+        coll.add_intermediate_node(AttributeLink('', document='doc1', line=1, filter='A-1', nooverwrite=False,
+                                                 **{'filter-attributes': attributes}))
+        coll.add_intermediate_node(CheckboxResult('', document='doc2', line=1, target='A-1',
+                                                  attribute=self.attribute_key, value=self.attribute_value_src))
+        coll.process_intermediate_nodes()
+        self.assertEqual(self.attribute_value_tgt, coll.get_item('A-1').get_attribute(self.attribute_key))
+
+    def test_snapshot_file(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id in ('A-1', 'B-1'):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location('doc1')
+            coll.add_item(item_obj)
+        coll.add_relation('A-1', self.fwd_relation, 'C-1')
+        for node in self._intermediate_nodes('doc2'):
+            coll.add_intermediate_node(node)
+        stored = pickle.dumps(coll)
+        digest = coll.get_digest()
+        coll.process_intermediate_nodes()
+        coll.update_implicit_relations()
+        ItemRelink.remove_placeholders(coll)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = dut.Path(tmp_dir, 'out', 'snapshot.json')
+            self.assertFalse(coll.load_snapshot(fname))
+            coll.save_snapshot(fname, digest, [('some warning', 'doc2', 1)])
+
+            # the snapshot gets applied to the collection it has been derived from
+            copy = pickle.loads(stored)
+            self.assertEqual(digest, copy.get_digest())
+            self.assertTrue(copy.load_snapshot(fname))
+            self.assertEqual([('some warning', 'doc2', 1)], copy.apply_loaded_snapshot())
+            self.assertEqual(['A-1', 'B-1'], copy.iter_items())
+            self.assertEqual(['B-1'], copy.get_item('A-1').iter_targets(self.fwd_relation))
+            self.assertEqual(['A-1'], copy.get_item('B-1').iter_targets(self.rev_relation))
+            self.assertEqual([], list(copy.get_items('C-1')))
+
+            # but not to a modified one
+            modified = pickle.loads(stored)
+            modified.get_item('B-1').set_location('doc3')
+            self.assertTrue(modified.load_snapshot(fname))
+            self.assertIsNone(modified.apply_loaded_snapshot())
+            self.assertEqual(['C-1'], modified.get_item('A-1').iter_targets(self.fwd_relation))
+
+    @staticmethod
+    def _implicit_relations(coll):
+        return {itemid: {relation: set(targets) for relation, targets in item_obj.implicit_relations.items() if targets}
+                for itemid, item_obj in coll.items.items()}
+
+    def test_update_implicit_relations(self):
+        rng = random.Random(42)
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        coll.add_relation_pair(self.unidir_relation)
+        item_ids = ['ITEM-{}'.format(index) for index in range(30)]
+
+        def add_item(item_id):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location('doc{}'.format(rng.randrange(5)))
+            coll.add_item(item_obj)
+            for target_id in rng.sample(item_ids, 3):
+                relation = rng.choice([self.fwd_relation, self.rev_relation, self.unidir_relation])
+                try:
+                    coll.add_relation(item_id, relation, target_id)
+                except exception.TraceabilityException:
+                    pass
+
+        for item_id in item_ids:
+            if item_id not in coll.items:
+                add_item(item_id)
+        coll.update_implicit_relations()
+        for _ in range(40):
+            purged_doc = 'doc{}'.format(rng.randrange(5))
+            purged_ids = [itemid for itemid, item_obj in coll.items.items() if item_obj.docname == purged_doc]
+            coll.remove_items_from_document(purged_doc)
+            # some items get removed for good, some items that were removed earlier get re-added
+            for item_id in purged_ids + rng.sample(item_ids, 2):
+                if (item_id not in coll.items or coll.items[item_id].is_placeholder) and rng.random() < 0.7:
+                    add_item(item_id)
+            source = coll.get_item(rng.choice(item_ids))
+            explicit_targets = source.iter_targets(self.fwd_relation, implicit=False) if source else []
+            if explicit_targets:
+                source.remove_targets(rng.choice(explicit_targets), explicit=True, implicit=False)
+            coll.update_implicit_relations()
+            reference = pickle.loads(pickle.dumps(coll))
+            reference.rebuild_implicit_relations()
+            self.assertEqual(self._implicit_relations(reference), self._implicit_relations(coll))
+
+    def test_update_implicit_relations_after_pickle(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id, docname in (('A', 'doc1'), ('B', 'doc2'), ('C', 'doc2')):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location(docname)
+            coll.add_item(item_obj)
+        coll.add_relation('A', self.fwd_relation, 'B')
+        coll.add_relation('C', self.fwd_relation, 'A')
+        # the implicit relations are updated before the environment gets stored
+        coll.update_implicit_relations()
+        coll = pickle.loads(pickle.dumps(coll))
+        # incremental build that reads doc2 again
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        coll.remove_items_from_document('doc2')
+        item_obj = item.TraceableItem('B')
+        item_obj.set_location('doc2')
+        coll.add_item(item_obj)
+        coll.add_relation('B', self.fwd_relation, 'A')
+        with patch.object(coll, 'rebuild_implicit_relations') as rebuild:
+            coll.update_implicit_relations()
+        rebuild.assert_not_called()
+        self.assertEqual(['B'], coll.get_item('A').iter_targets(self.rev_relation))
+        self.assertEqual(['A'], coll.get_item('B').iter_targets(self.rev_relation))
+        self.assertEqual([], coll.get_item('A').iter_targets(self.fwd_relation, explicit=False))
+
+    def test_rebuild_implicit_relations_explicit_both_ways(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        coll.add_item(item.TraceableItem('A'))
+        coll.add_item(item.TraceableItem('B'))
+        coll.add_relation('A', self.fwd_relation, 'B')
+        with self.assertRaises(exception.TraceabilityException):
+            coll.add_relation('B', self.rev_relation, 'A')
+        coll.rebuild_implicit_relations()
+        self.assertEqual(['A'], coll.get_item('B').iter_targets(self.rev_relation))
+        self.assertEqual([], coll.get_item('B').iter_targets(self.rev_relation, explicit=False))
+
+    @staticmethod
+    def _self_test_errors(coll, docname=None):
+        try:
+            coll.self_test(None, docname)
+        except exception.MultipleTraceabilityExceptions as errors:
+            return sorted((str(err), err.docname) for err in errors)
+        return []
+
+    def test_self_test_incremental(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id, docname in (('A', 'doc1'), ('B', 'doc1'), ('C', 'doc2'), ('D', 'doc3')):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location(docname)
+            coll.add_item(item_obj)
+        coll.add_relation('A', self.fwd_relation, 'B')
+        coll.add_relation('C', self.fwd_relation, 'X')  # X is a placeholder
+        coll.add_relation('D', self.fwd_relation, 'C')
+        coll.update_implicit_relations()
+
+        def check():
+            reference = pickle.loads(pickle.dumps(coll))
+            reference._self_test_cache = None
+            expected = self._self_test_errors(reference)
+            self.assertEqual(expected, self._self_test_errors(coll))
+            return expected
+
+        self.assertEqual(1, len(check()))
+        cached_errors = coll._self_test_cache['C']
+        # unrelated changes in another document reuse the results of C
+        coll.remove_items_from_document('doc1')
+        coll.update_implicit_relations()
+        check()
+        self.assertIs(cached_errors, coll._self_test_cache['C'])
+        # defining the missing target re-tests its neighbours
+        item_obj = item.TraceableItem('X')
+        item_obj.set_location('doc1')
+        coll.add_item(item_obj)
+        coll.update_implicit_relations()
+        self.assertEqual([], check())
+        # removing the item that D relates to re-tests D
+        coll.remove_items_from_document('doc2')
+        coll.update_implicit_relations()
+        errors = check()
+        self.assertEqual([(f'D {self.fwd_relation} C, but C is not known', 'doc3')], errors)
+        self.assertEqual([], self._self_test_errors(coll, 'doc1'))
+
+    def test_self_test_results_after_pickle(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id, docname in (('A', 'doc1'), ('B', 'doc1'), ('C', 'doc2'), ('D', 'doc4'), ('E', 'doc4')):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location(docname)
+            coll.add_item(item_obj)
+        coll.add_relation('C', self.fwd_relation, 'X')  # X is a placeholder
+        coll.add_relation('D', self.fwd_relation, 'E')
+        coll.add_intermediate_node(ItemLink('', document='doc3', line=1, sources=['A'], targets=['B'],
+                                            type=self.fwd_relation, nooverwrite=False))
+        coll.update_implicit_relations()
+        # the environment is stored before the consistency check, the results of the self test after it
+        stored = pickle.dumps(coll)
+        coll.process_intermediate_nodes()
+        self.assertEqual(1, len(self._self_test_errors(coll)))
+        results = pickle.loads(pickle.dumps(coll.get_self_test_results()))
+
+        # incremental build that reads doc2 again, in which C no longer relates to X
+        coll = pickle.loads(stored)
+        coll.set_self_test_results(results)
+        coll.remove_items_from_document('doc2')
+        item_obj = item.TraceableItem('C')
+        item_obj.set_location('doc2')
+        coll.add_item(item_obj)
+        coll.update_implicit_relations()
+        coll.process_intermediate_nodes()
+        expected = self._self_test_errors(pickle.loads(pickle.dumps(coll)))
+        with patch.object(coll, '_self_test_item', wraps=coll._self_test_item) as self_test_item:
+            self.assertEqual(expected, self._self_test_errors(coll))
+        # the items that the item-link modifies get tested again, and so do C and X, but D and E do not
+        self.assertEqual(['A', 'B', 'C', 'X'], sorted(call.args[0] for call in self_test_item.call_args_list))
+
+    def test_self_test_workers(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        attr = attribute.TraceableAttribute(self.attribute_key, self.attribute_value_src)
+        item.TraceableItem.define_attribute(attr)
+        for index in range(40):
+            item_obj = item.TraceableItem('ITEM-{}'.format(index))
+            item_obj.set_location('doc{}'.format(index % 3))
+            coll.add_item(item_obj)
+            coll.add_relation(item_obj.identifier, self.fwd_relation, 'ITEM-{}'.format((index * 7 + 1) % 45))
+            if index % 5 == 0:
+                item_obj.attributes[self.attribute_key] = 'invalid'
+        coll.update_implicit_relations()
+        expected = self._self_test_errors(pickle.loads(pickle.dumps(coll)))
+        self.assertTrue(expected)
+        coll.SELF_TEST_MIN_SHARD_SIZE = 10
+        with self.assertRaises(exception.MultipleTraceabilityExceptions) as context:
+            coll.self_test(None, workers=4)
+        self.assertEqual(expected, sorted((str(err), err.docname) for err in context.exception))
+        self.assertEqual(45, len(coll._self_test_cache))  # including placeholders
+        copy = dut.TraceableCollection.from_snapshot(coll.snapshot())
+        self.assertEqual(expected, self._self_test_errors(copy))
+
+    def test_merge(self):
+        fwd = self.fwd_relation
+        documents = {
+            'doc1': [('A', [('B', fwd)]), ('C', [])],
+            'doc2': [('B', []), ('D', [('A', fwd), ('X', fwd)])],
+            'doc3': [('C', []), ('E', [('D', fwd)])],
+        }
+
+        def read(coll, docnames):
+            for docname in docnames:
+                for lineno, (item_id, relations) in enumerate(documents[docname]):
+                    item_obj = item.TraceableItem(item_id)
+                    item_obj.set_location(docname, lineno)
+                    try:
+                        coll.add_item(item_obj)
+                    except exception.TraceabilityException as err:
+                        warnings.append((str(err), docname, lineno))
+                        continue
+                    for target_id, relation in relations:
+                        coll.add_relation(item_id, relation, target_id)
+
+        serial = dut.TraceableCollection()
+        serial.add_relation_pair(self.fwd_relation, self.rev_relation)
+        warnings = []
+        read(serial, sorted(documents))
+        serial_warnings = warnings
+        serial.update_implicit_relations()
+
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        children = []
+        for docnames in (['doc1'], ['doc2', 'doc3']):
+            child = pickle.loads(pickle.dumps(coll))
+            warnings = []
+            read(child, docnames)
+            children.append((docnames, child))
+        self.assertEqual([], warnings)
+        # the process that reads doc2 and doc3 finishes first
+        for docnames, child in reversed(children):
+            for err, item_obj in coll.merge(child, docnames):
+                warnings.append((str(err), item_obj.docname, item_obj.lineno))
+        self.assertEqual(serial_warnings, warnings)
+        self.assertEqual([('duplicating C', 'doc3', 0)], warnings)
+        coll.apply_read_order()
+        coll.update_implicit_relations()
+        self.assertEqual(list(serial.items), list(coll.items))
+        self.assertEqual(self._implicit_relations(serial), self._implicit_relations(coll))
+        self.assertEqual('doc1', coll.get_item('C').docname)
+        self.assertTrue(coll.get_item('X').is_placeholder)
+        self.assertEqual(['A', 'B', 'C'], coll.get_items('^[A-C]$', sort=False))
+
+    def _circular_relationship_errors(self, coll, docname=None):
+        try:
+            coll.self_test(None, docname)
+        except exception.MultipleTraceabilityExceptions as errors:
+            return sorted(str(err) for err in errors if 'Circular' in str(err))
+        return []
+
+    def test_self_test_circular_relationships(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair(self.fwd_relation, self.rev_relation)
+        for item_id in ('A', 'B', 'C', 'D', 'E', 'F'):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location(self.docname if item_id != 'F' else 'other')
+            coll.add_item(item_obj)
+        self.assertEqual([], self._circular_relationship_errors(coll))
+        # cycle of length 3
+        coll.add_relation('A', self.fwd_relation, 'B')
+        coll.add_relation('B', self.fwd_relation, 'C')
+        coll.add_relation('C', self.fwd_relation, 'A')
+        fwd, rev = self.fwd_relation, self.rev_relation
+        self.assertEqual([
+            f'Circular relationship found: A {fwd} B {fwd} C {fwd} A',
+            f'Circular relationship found: A {rev} C {rev} B {rev} A',
+            f'Circular relationship found: B {fwd} C {fwd} A {fwd} B',
+            f'Circular relationship found: B {rev} A {rev} C {rev} B',
+            f'Circular relationship found: C {fwd} A {fwd} B {fwd} C',
+            f'Circular relationship found: C {rev} B {rev} A {rev} C',
+        ], self._circular_relationship_errors(coll))
+        # cycle of length 4, reported for items in the given document only
+        coll.add_relation('A', self.fwd_relation, 'D')
+        coll.add_relation('D', self.fwd_relation, 'E')
+        coll.add_relation('E', self.fwd_relation, 'F')
+        coll.add_relation('F', self.fwd_relation, 'A')
+        errors = self._circular_relationship_errors(coll, 'other')
+        self.assertEqual([f'Circular relationship found: F {fwd} A {fwd} D {fwd} E {fwd} F',
+                          f'Circular relationship found: F {rev} E {rev} D {rev} A {rev} F'], errors)
+        self.assertEqual(12, len(self._circular_relationship_errors(coll)))
+
+    def test_self_test_symmetric_relation(self):
+        coll = dut.TraceableCollection()
+        coll.add_relation_pair('relates', 'relates')
+        for item_id in ('A', 'B', 'C'):
+            item_obj = item.TraceableItem(item_id)
+            item_obj.set_location(self.docname)
+            coll.add_item(item_obj)
+        coll.add_relation('A', 'relates', 'B')
+        coll.add_relation('B', 'relates', 'C')
+        coll.add_relation('C', 'relates', 'A')
+        self.assertEqual([], self._circular_relationship_errors(coll))
+
+    def test_strongly_connected_components(self):
+        successors = {'A': ['B'], 'B': ['C', 'D'], 'C': ['A'], 'D': ['E'], 'E': ['D'], 'F': ['A']}
+        components = dut._strongly_connected_components(successors)
+        self.assertEqual([['D', 'E'], ['A', 'B', 'C']], [sorted(component) for component in components])
+        self.assertEqual(['B', 'C', 'A', 'B'], dut._shortest_cycle('B', successors, {'A', 'B', 'C'}))
+        # long chains do not hit the recursion limit
+        successors = {index: [index + 1] for index in range(5000)}
+        successors[5000] = [0]
+        self.assertEqual(5001, len(dut._strongly_connected_components(successors)[0]))
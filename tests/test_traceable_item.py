@@ -1,4 +1,5 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from mlx.traceability import traceability_exception as exception
 from mlx.traceability import traceable_attribute as attribute
@@ -298,6 +299,22 @@ class TestTraceableItem(TestCase):
         # Self test should pass
         item.self_test()
 
+    def test_targets_keep_insertion_order(self):
+        item = dut.TraceableItem(self.identification)
+        targets = ['item-{}'.format(index) for index in (3, 1, 20, 2)]
+        for target in targets:
+            item.add_target(self.fwd_relation, target)
+        item.add_target(self.fwd_relation, 'item-0', implicit=True)
+        self.assertEqual(targets + ['item-0'], item.iter_targets(self.fwd_relation, sort=False))
+        self.assertEqual(['item-0', 'item-1', 'item-2', 'item-3', 'item-20'], item.iter_targets(self.fwd_relation))
+        # moving an implicit relation to the explicit ones appends it
+        item.add_target(self.fwd_relation, 'item-0')
+        self.assertEqual(targets + ['item-0'], list(item.yield_targets(self.fwd_relation, implicit=False)))
+        item.remove_targets('item-1', explicit=True)
+        self.assertFalse(item.is_related([self.fwd_relation], 'item-1'))
+        self.assertTrue(item.is_related([self.fwd_relation], 'item-20'))
+        self.assertEqual(['item-3', 'item-20', 'item-2', 'item-0'], item.iter_targets(self.fwd_relation, sort=False))
+
     def test_stringify(self):
         item = dut.TraceableItem(self.identification)
         item.set_location(self.docname)
@@ -346,8 +363,8 @@ class TestTraceableItem(TestCase):
         # Add same target (fails as it is not allowed)
         with self.assertRaises(exception.TraceabilityException):
             item.add_target(self.fwd_relation, self.identification_tgt)
-        # Hack into class and add same relation anyway
-        item.explicit_relations[self.fwd_relation].append(self.identification_tgt)
+        # Hack into class and add same relation anyway, as implicit relation
+        item.implicit_relations[self.fwd_relation] = {self.identification_tgt: None}
         # Self test should fail
         with self.assertRaises(exception.TraceabilityException):
             item.self_test()
@@ -377,3 +394,32 @@ class TestTraceableItem(TestCase):
         self.assertEqual(item.has_relations([self.rev_relation]), False)
         self.assertEqual(item.has_relations([self.fwd_relation, self.rev_relation]), False)
         self.assertEqual(item.has_relations([self.rev_relation, self.fwd_relation]), False)
+
+    def test_attribute_ids_per_document(self):
+        attr = attribute.TraceableAttribute('some-located-attribute', '.*')
+        attr.set_location('folder/attributes')
+        attr.set_location('folder/other_attributes')
+        self.assertNotIn('some-located-attribute',
+                         attribute.TraceableAttribute.pop_ids_of_document('folder/attributes'))
+        self.assertIn('some-located-attribute',
+                      attribute.TraceableAttribute.pop_ids_of_document('folder/other_attributes'))
+        self.assertEqual(set(), attribute.TraceableAttribute.pop_ids_of_document('folder/other_attributes'))
+
+    def test_attribute_validation_cache(self):
+        attr = attribute.TraceableAttribute('some-cached-attribute', '^(draft|approved)$')
+        self.assertTrue(attr.can_accept('draft'))
+        self.assertTrue(attr.can_accept('draft'))
+        self.assertFalse(attr.can_accept('rejected'))
+        self.assertFalse(attr.can_accept('rejected'))
+        self.assertEqual((2, 2, 2), attr.validation_cache_info())
+        # a new regex invalidates the remembered results
+        attr.value = '^rejected$'
+        self.assertFalse(attr.can_accept('draft'))
+        self.assertTrue(attr.can_accept('rejected'))
+        self.assertEqual((2, 4, 2), attr.validation_cache_info())
+        # the number of remembered results is bounded
+        with patch.object(attribute.TraceableAttribute, 'VALIDATION_CACHE_SIZE', 3):
+            for value in ('a', 'b', 'c', 'rejected'):
+                attr.can_accept(value)
+        self.assertEqual(3, attr.validation_cache_info().currsize)
+        self.assertTrue(attr.can_accept('rejected'))
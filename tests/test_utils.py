@@ -1,8 +1,19 @@
 """Tests for utility functions."""
+import pickle
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from mlx.traceability.traceability import get_sort_function
+from docutils import nodes
+
+from mlx.traceability.directives.attribute_sort_directive import AttributeSort
+from mlx.traceability.directives.item_directive import Item
+from mlx.traceability.directives.item_list_directive import ItemList
+from mlx.traceability.directives.item_matrix_directive import ItemMatrix
+from mlx.traceability.traceable_attribute import TraceableAttribute
+from mlx.traceability.traceable_collection import TraceableCollection
+from mlx.traceability.traceable_item import TraceableItem
+from mlx.traceability.traceability import apply_attribute_descriptions, get_sort_function, get_updated_documents, \
+    mark_traceable_document, process_item_nodes, PendingItemXref
 
 
 class TestGetSortFunction(TestCase):
@@ -51,3 +62,173 @@ class TestGetSortFunction(TestCase):
         """Test handling of empty string"""
         with self.assertRaises(ValueError):
             get_sort_function('')
+
+
+class TestProcessItemNodes(TestCase):
+    """Test the replacement of traceability nodes in resolved doctrees"""
+
+    def setUp(self):
+        self.app = MagicMock()
+        self.app.builder.env.traceability_documents = {}
+        self.app.builder.env.traceability_effects_pending = False
+        self.app.builder.env.docname = 'doc'
+        self.doctree = nodes.document(None, None)
+        section = nodes.section()
+        section += Item('')
+        section += PendingItemXref('')
+        section += AttributeSort('')
+        self.doctree += section
+        self.doctree += Item('')
+
+    def test_replacement_order(self):
+        """Test that all nodes are replaced in order of their class, with item cross-references last"""
+        mark_traceable_document(self.app, self.doctree)
+        self.assertEqual(['doc'], list(self.app.builder.env.traceability_documents))
+        replaced = []
+        record = lambda node, *_: replaced.append(type(node).__name__)  # noqa: E731
+        with patch.object(Item, 'perform_replacement', record), \
+                patch.object(AttributeSort, 'perform_replacement', record), \
+                patch.object(PendingItemXref, 'perform_replacement', record):
+            process_item_nodes(self.app, self.doctree, 'doc')
+        self.assertEqual(['AttributeSort', 'Item', 'Item', 'PendingItemXref'], replaced)
+
+    def test_skip_document_without_nodes(self):
+        """Test that a document without traceability nodes is skipped"""
+        mark_traceable_document(self.app, nodes.document(None, None))
+        self.assertEqual({}, self.app.builder.env.traceability_documents)
+        self.app.builder.env.traceability_effects_pending = True
+        process_item_nodes(self.app, nodes.document(None, None), 'doc')
+        self.assertTrue(self.app.builder.env.traceability_effects_pending)
+
+    def test_assembled_document(self):
+        """Test that the nodes of a doctree that combines documents get replaced, e.g. by the latex builder"""
+        mark_traceable_document(self.app, self.doctree)
+        replaced = []
+        record = lambda node, *_: replaced.append(type(node).__name__)  # noqa: E731
+        with patch.object(Item, 'perform_replacement', record), \
+                patch.object(AttributeSort, 'perform_replacement', record), \
+                patch.object(PendingItemXref, 'perform_replacement', record):
+            process_item_nodes(self.app, self.doctree, 'index')
+        self.assertEqual(4, len(replaced))
+
+
+class TestApplyAttributeDescriptions(TestCase):
+    """Test the restoration of attribute descriptions from documents that are not read again"""
+
+    def setUp(self):
+        self.defined_attributes = TraceableItem.defined_attributes
+        TraceableItem.defined_attributes = {}
+        TraceableItem.define_attribute(TraceableAttribute('asil', '^[ABCD]$'))
+        TraceableItem.define_attribute(TraceableAttribute('status', '^.*$'))
+
+    def tearDown(self):
+        TraceableItem.defined_attributes = self.defined_attributes
+
+    def test_last_document_wins(self):
+        descriptions = {
+            'b': {'asil': ('ASIL in b', 3)},
+            'a': {'asil': ('ASIL in a', 5), 'status': ('Status', 7), 'undefined': ('Undefined', 9)},
+        }
+        apply_attribute_descriptions(descriptions)
+        asil = TraceableItem.defined_attributes['asil']
+        self.assertEqual(('ASIL in b', 'b', 3), (asil.caption, asil.docname, asil.lineno))
+        status = TraceableItem.defined_attributes['status']
+        self.assertEqual(('Status', 'a', 7), (status.caption, status.docname, status.lineno))
+        self.assertNotIn('undefined', TraceableItem.defined_attributes)
+
+    def test_selected_attributes(self):
+        apply_attribute_descriptions({'a': {'asil': ('ASIL', 1), 'status': ('Status', 2)}}, {'status'})
+        self.assertIsNone(TraceableItem.defined_attributes['asil'].docname)
+        self.assertEqual('a', TraceableItem.defined_attributes['status'].docname)
+
+
+class TestGetUpdatedDocuments(TestCase):
+    """Test the detection of documents to write again because items they depend on have changed"""
+
+    def setUp(self):
+        self.collection = TraceableCollection()
+        self.collection.add_relation_pair('validates', 'validated_by')
+        for item_id, docname in (('A1', 'a'), ('A2', 'a'), ('C1', 'c')):
+            item = TraceableItem(item_id)
+            item.set_location(docname)
+            self.collection.add_item(item)
+        self.app = MagicMock()
+        self.app.config.traceability_snapshot_path = False
+        self.env = MagicMock()
+        self.env.traceability_collection = self.collection
+        self.env.traceability_documents_read = True
+        self.env.traceability_item_digests = None
+        self.env.traceability_effect_ids = set()
+        self.env.traceability_documents = {
+            'a': [Item('', id='A1'), Item('', id='A2')],
+            'c': [Item('', id='C1'), ItemList('', filter='C')],
+            'x': [PendingItemXref('', reftarget='A2')],
+        }
+
+    def build(self):
+        """Gets the documents to write again and mimics the rest of the build, up to the storage of the environment"""
+        updated_docnames = get_updated_documents(self.app, self.env)
+        processed_copy = self.collection.processed_copy
+        self.assertEqual(self.env.traceability_item_digests is None, processed_copy is None)
+        if processed_copy is not None:
+            collection = processed_copy[0]
+        else:
+            collection = self.collection
+            self.env.traceability_item_digests = {itemid: item.get_digests()
+                                                  for itemid, item in collection.items.items()}
+        self.env.traceability_effect_ids = collection.get_effect_ids()
+        self.collection = self.env.traceability_collection = pickle.loads(pickle.dumps(self.collection))
+        return updated_docnames
+
+    def reread(self, item_id, caption=None):
+        """Mimics reading the document of an item again, with the given caption for the item"""
+        item = self.collection.get_item(item_id)
+        relations = {relation: list(targets) for relation, targets in item.explicit_relations.items()}
+        self.collection.remove_item(item_id)
+        item = TraceableItem(item_id)
+        item.set_location(item_id[0].lower())
+        item.caption = caption
+        self.collection.add_item(item)
+        for relation, targets in relations.items():
+            for target_id in targets:
+                self.collection.add_relation(item_id, relation, target_id)
+        self.collection.update_implicit_relations()
+        return item
+
+    def test_updated_documents(self):
+        self.assertEqual(['a', 'c', 'x'], self.build())  # first build
+        self.assertIsNone(self.collection.processed_copy)
+        self.assertEqual([], self.build())
+        self.reread('C1', 'new caption')
+        self.assertEqual(['c'], self.build())
+        # the implicit relation of A2 changes as well, but references to A2 only show its caption and location
+        self.reread('C1', 'new caption')
+        self.collection.add_relation('C1', 'validates', 'A2')
+        self.collection.update_implicit_relations()
+        self.assertEqual(['a', 'c'], self.build())
+        self.reread('A2', 'new caption')
+        self.assertEqual(['a', 'c', 'x'], self.build())
+        item = TraceableItem('C2')
+        item.set_location('d')
+        self.collection.add_item(item)
+        self.assertEqual(['c'], self.build())
+
+    def test_relation_column_of_matrix(self):
+        item = TraceableItem('D1')
+        item.set_location('d')
+        self.collection.add_item(item)
+        self.collection.add_relation('C1', 'validates', 'D1')
+        self.collection.update_implicit_relations()
+        self.env.traceability_documents['m'] = [ItemMatrix('', source='C', target=['A'], intermediate='',
+                                                           sourcecolumns=['validates'], targetcolumns=[])]
+        self.build()
+        # the matrix shows the caption of D1 in the cell of the relation column of C1
+        self.reread('D1', 'new caption')
+        self.assertIn('m', self.build())
+
+    def test_nothing_read(self):
+        self.build()
+        self.env.traceability_documents_read = False
+        self.assertEqual([], get_updated_documents(self.app, self.env))
+        self.assertIsNone(self.collection.processed_copy)
+        self.assertTrue(self.env.traceability_effects_pending)